@@ -10,10 +10,14 @@ migrate = Migrate()
 jwt = JWTManager()
 
 
-def create_app(config_name='development'):
+def create_app(config_name='development', config_overrides=None):
     """Create and configure Flask application"""
     app = Flask(__name__)
 
+    # Encode JSON responses with orjson when it is installed
+    from app.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
     # Load configuration
     if config_name == 'testing':
         from app.config import TestingConfig
@@ -25,23 +29,60 @@ def create_app(config_name='development'):
         from app.config import DevelopmentConfig
         app.config.from_object(DevelopmentConfig)
 
+    if config_overrides:
+        app.config.update(config_overrides)
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
-    CORS(app)
+    # Let browser clients read the pagination cursor
+    CORS(app, expose_headers=['X-Next-Cursor'])
     jwt.init_app(app)
 
+    # Role claims in tokens, revoked per user by token version
+    from app.services.tokens import init_tokens
+    init_tokens(app, jwt)
+
+    # Optional per-shift admission queue for signup writes
+    from app.services.admission import init_admission
+    init_admission(app)
+
+    # Request, SQL and notification metrics served at /metrics
+    from app.services.metrics import init_metrics
+    init_metrics(app)
+
+    # Slow-query log with query plans
+    from app.services.query_profiler import init_query_profiler
+    init_query_profiler(app)
+
+    # Snapshot cache for coordinator dashboards
+    from app.services.snapshot_cache import init_snapshot_cache
+    init_snapshot_cache(app)
+
     # Register blueprints
     with app.app_context():
-        from app.routes import auth_bp, volunteers_bp, shifts_bp, signups_bp, coordinator_bp
+        from app.routes import auth_bp, volunteers_bp, shifts_bp, signups_bp, coordinator_bp, metrics_bp
         app.register_blueprint(auth_bp)
         app.register_blueprint(volunteers_bp)
         app.register_blueprint(shifts_bp)
         app.register_blueprint(signups_bp)
         app.register_blueprint(coordinator_bp)
+        app.register_blueprint(metrics_bp)
+
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
 
     # Create tables
     with app.app_context():
         db.create_all()
 
+    # Load the scheduling rules, seeding the defaults on first run
+    from app.services.rules import init_rules
+    init_rules(app)
+
+    # Start notification delivery workers once the outbox table exists
+    from app.services.outbox import init_outbox
+    init_outbox(app)
+
     return app
@@ -0,0 +1,212 @@
+"""Flask CLI commands for maintenance tasks"""
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('reconcile-counters')
+@click.option('--check', is_flag=True, help='Only report drift, do not correct it.')
+@with_appcontext
+def reconcile_counters_command(check):
+    """Rebuild denormalized signup counters from the signups table."""
+    from app.services.counters import CounterService
+
+    shifts = CounterService.rebuild_shift_counts(check_only=check)
+    quotas = CounterService.rebuild_volunteer_quotas(check_only=check)
+
+    verb = 'out of sync' if check else 'corrected'
+    click.echo(f'Shift counters {verb}: {shifts}')
+    click.echo(f'Volunteer quotas {verb}: {quotas}')
+
+    if check and (shifts or quotas):
+        raise SystemExit(1)
+
+
+@click.command('notifications-drain')
+@with_appcontext
+def notifications_drain_command():
+    """Deliver all due outbox messages, then exit."""
+    from app.services.outbox import get_dispatcher
+
+    processed = get_dispatcher().drain()
+    click.echo(f'Outbox messages processed: {processed}')
+
+
+@click.command('notifications-worker')
+@click.option('--workers', type=int, default=None, help='Number of delivery threads.')
+@with_appcontext
+def notifications_worker_command(workers):
+    """Run outbox delivery workers in the foreground."""
+    import time
+    from flask import current_app
+    from app.services.outbox import OutboxDispatcher
+
+    dispatcher = OutboxDispatcher(current_app._get_current_object())
+    if workers is not None:
+        dispatcher.workers = workers
+    dispatcher.workers = max(dispatcher.workers, 1)
+    dispatcher.start()
+    click.echo(f'Outbox workers running: {dispatcher.workers} (Ctrl+C to stop)')
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        dispatcher.stop()
+
+
+@click.command('send-reminders')
+@click.option('--date', 'shift_date', default=None, help='Shift date (YYYY-MM-DD); defaults to tomorrow.')
+@click.option('--deliver/--no-deliver', default=True, help='Deliver queued messages before exiting.')
+@with_appcontext
+def send_reminders_command(shift_date, deliver):
+    """Queue reminders for the next day's shifts and deliver them."""
+    from datetime import date
+    from app.services.outbox import get_dispatcher
+    from app.services.reminders import ReminderService
+
+    shift_date = date.fromisoformat(shift_date) if shift_date else None
+    queued, total = ReminderService.queue_reminders(shift_date)
+    click.echo(f'Reminders queued: {queued} (already queued: {total - queued})')
+
+    if deliver and queued:
+        processed = get_dispatcher().drain_concurrently()
+        click.echo(f'Outbox messages processed: {processed}')
+
+
+@click.command('set-role')
+@click.argument('username')
+@click.argument('role', type=click.Choice(['volunteer', 'coordinator']))
+@with_appcontext
+def set_role_command(username, role):
+    """Change a user's role and invalidate their existing tokens."""
+    from app import db
+    from app.models import User
+    from app.services.tokens import TokenService
+
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        raise click.ClickException(f'Unknown user: {username}')
+
+    user.role = role
+    TokenService.bump_version(user)
+    db.session.commit()
+    click.echo(f'{username} is now {role}; existing tokens are no longer accepted')
+
+
+@click.command('prune-revoked-tokens')
+@with_appcontext
+def prune_revoked_tokens_command():
+    """Delete revocations of tokens that have expired anyway."""
+    from app.services.tokens import TokenService
+
+    pruned = TokenService.prune_revocations()
+    click.echo(f'Expired revocations deleted: {pruned}')
+
+
+@click.command('scheduling-rules')
+@click.option('--load', 'path', type=click.Path(exists=True, dir_okay=False),
+              help='Replace the rules with the JSON list in this file.')
+@with_appcontext
+def scheduling_rules_command(path):
+    """Show the scheduling rules, or replace them from a JSON file."""
+    import json
+    from app.models import SchedulingRule
+    from app.services.rules import RuleService
+
+    if path:
+        with open(path) as f:
+            definitions = json.load(f)
+        try:
+            corrected = RuleService.replace_rules(definitions)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f'Rules loaded: {len(definitions)}; volunteer counters rebuilt: {corrected}')
+
+    for rule in SchedulingRule.query.order_by(SchedulingRule.position, SchedulingRule.id):
+        predicate = ', '.join(
+            f'{field}={value}' for field, value in rule.to_dict().items()
+            if field in ('shift_type', 'day_name', 'week_of_month') and value is not None
+        ) or 'all shifts'
+        click.echo(f'{rule.key}: max {rule.max_signups} ({predicate})')
+
+
+@click.command('seed-data')
+@click.option('--volunteers', type=int, default=10000, show_default=True)
+@click.option('--days', type=int, default=730, show_default=True, help='Days of Kakad and Robes shifts.')
+@click.option('--signups', type=int, default=200000, show_default=True)
+@click.option('--start', 'start_date', default=None, help='First shift date (YYYY-MM-DD); defaults to half the range ago.')
+@click.option('--seed', type=int, default=42, show_default=True, help='Random seed.')
+@click.option('--users', type=int, default=1000, show_default=True, help='Volunteer logins to create.')
+@click.option('--password', default='password123', show_default=True, help='Password of every seeded user.')
+@with_appcontext
+def seed_data_command(volunteers, days, signups, start_date, seed, users, password):
+    """Fill an empty database with a synthetic dataset."""
+    from datetime import date
+    from app.services.seeding import SeedService
+
+    try:
+        summary = SeedService.generate(
+            volunteers=volunteers,
+            days=days,
+            signups=signups,
+            start=date.fromisoformat(start_date) if start_date else None,
+            seed=seed,
+            users=users,
+            password=password
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for key, value in summary.items():
+        click.echo(f'{key}: {value}')
+
+
+@click.command('slow-queries')
+@click.option('--top', type=int, default=10, show_default=True, help='Number of statement shapes to show.')
+@click.option('--file', 'path', default=None, help='Log file; defaults to the configured slow-query log.')
+@click.option('--plans/--no-plans', default=True, help='Show the captured query plans.')
+@with_appcontext
+def slow_queries_command(top, path, plans):
+    """Summarize the slow-query log by statement shape, by total time."""
+    import os
+    from flask import current_app
+    from app.services.query_profiler import summarize_slow_queries
+
+    path = path or current_app.config.get('SLOW_QUERY_LOG_FILE') or os.path.join(
+        current_app.instance_path, 'slow_queries.jsonl'
+    )
+    if not os.path.exists(path):
+        raise click.ClickException(f'No slow-query log at {path}')
+
+    shapes = summarize_slow_queries(path, top)
+    if not shapes:
+        click.echo('No slow queries logged.')
+        return
+
+    for rank, shape in enumerate(shapes, 1):
+        click.echo(
+            f"{rank}. {shape['count']} x, total {shape['total_ms']} ms, "
+            f"mean {shape['mean_ms']} ms, max {shape['max_ms']} ms"
+        )
+        click.echo(f"   {shape['shape']}")
+        origins = ', '.join(f'{origin} ({count})' for origin, count in shape['origins'].items())
+        click.echo(f'   from: {origins}')
+        click.echo(f"   slowest parameters: {shape['slowest_parameters']}")
+        if plans and shape['plan']:
+            click.echo('   plan:')
+            for line in shape['plan']:
+                click.echo(f'     {line}')
+        click.echo()
+
+
+def register_commands(app):
+    """Register CLI commands on the application"""
+    app.cli.add_command(reconcile_counters_command)
+    app.cli.add_command(notifications_drain_command)
+    app.cli.add_command(notifications_worker_command)
+    app.cli.add_command(send_reminders_command)
+    app.cli.add_command(set_role_command)
+    app.cli.add_command(prune_revoked_tokens_command)
+    app.cli.add_command(scheduling_rules_command)
+    app.cli.add_command(seed_data_command)
+    app.cli.add_command(slow_queries_command)
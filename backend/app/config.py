@@ -11,6 +11,41 @@ class Config:
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'change-this-secret-key-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=30)
+    # How often each process re-reads user token versions
+    TOKEN_VERSION_REFRESH_SECONDS = int(os.getenv('TOKEN_VERSION_REFRESH_SECONDS', '30'))
+    # How often each process picks up tokens revoked elsewhere, and drops expired ones
+    TOKEN_REVOCATION_SYNC_SECONDS = int(os.getenv('TOKEN_REVOCATION_SYNC_SECONDS', '5'))
+    TOKEN_REVOCATION_RELOAD_SECONDS = int(os.getenv('TOKEN_REVOCATION_RELOAD_SECONDS', '3600'))
+
+    # How often each process checks the scheduling_rules table for changes
+    SCHEDULING_RULES_REFRESH_SECONDS = int(os.getenv('SCHEDULING_RULES_REFRESH_SECONDS', '30'))
+
+    # Maximum number of rows accepted by the batch signup endpoints
+    SIGNUP_BATCH_LIMIT = int(os.getenv('SIGNUP_BATCH_LIMIT', '1000'))
+    # Page size of list endpoints when the client sends no limit, and the largest allowed
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', '100'))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', '500'))
+
+    # Longest date range accepted by recurring shift generation
+    SHIFT_GENERATION_MAX_DAYS = int(os.getenv('SHIFT_GENERATION_MAX_DAYS', '366'))
+
+    # Serialize signup writes per shift through an admission queue (opt-in)
+    SIGNUP_ADMISSION_QUEUE = os.getenv('SIGNUP_ADMISSION_QUEUE', 'false').lower() == 'true'
+    SIGNUP_ADMISSION_MAX_PENDING = int(os.getenv('SIGNUP_ADMISSION_MAX_PENDING', '200'))
+    SIGNUP_ADMISSION_TIMEOUT = float(os.getenv('SIGNUP_ADMISSION_TIMEOUT', '5'))
+
+    # Coordinator dashboard: days ahead covered and snapshot cache lifetime
+    DASHBOARD_WINDOW_DAYS = int(os.getenv('DASHBOARD_WINDOW_DAYS', '14'))
+    SNAPSHOT_CACHE_TTL = float(os.getenv('SNAPSHOT_CACHE_TTL', '30'))
+
+    # Log statements slower than the threshold, with their query plans
+    SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'false').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '100'))
+    SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+    SLOW_QUERY_LOG_FILE = os.getenv('SLOW_QUERY_LOG_FILE', '')  # default: instance/slow_queries.jsonl
+
+    # Per-request timing, SQL and notification metrics served at /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
 
     # CORS
     CORS_HEADERS = 'Content-Type'
@@ -19,13 +54,32 @@ class Config:
     TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID', '')
     TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', '')
     TWILIO_WHATSAPP_NUMBER = os.getenv('TWILIO_WHATSAPP_NUMBER', '')
+    TWILIO_POOL_SIZE = int(os.getenv('TWILIO_POOL_SIZE', '10'))
+    TWILIO_TIMEOUT = float(os.getenv('TWILIO_TIMEOUT', '10'))
+    TWILIO_MAX_RETRIES = int(os.getenv('TWILIO_MAX_RETRIES', '0'))
+    # Override the Twilio API host, e.g. to point at a local stub server
+    TWILIO_API_BASE_URL = os.getenv('TWILIO_API_BASE_URL', '')
+
+    # Notification outbox delivery
+    NOTIFICATION_SENDER = os.getenv('NOTIFICATION_SENDER', 'auto')  # 'auto', 'twilio', 'console' or 'fake'
+    NOTIFICATION_WORKERS = int(os.getenv('NOTIFICATION_WORKERS', '2'))
+    # Start the workers with the app; run.py does when serving, WSGI servers need it set
+    NOTIFICATION_START_WORKERS = os.getenv('NOTIFICATION_START_WORKERS', 'false').lower() == 'true'
+    NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', '20'))
+    NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', '5'))
+    NOTIFICATION_BACKOFF_SECONDS = float(os.getenv('NOTIFICATION_BACKOFF_SECONDS', '30'))
+    NOTIFICATION_POLL_INTERVAL = float(os.getenv('NOTIFICATION_POLL_INTERVAL', '5'))
+    NOTIFICATION_LEASE_SECONDS = float(os.getenv('NOTIFICATION_LEASE_SECONDS', '300'))
+    NOTIFICATION_RATE_LIMIT = float(os.getenv('NOTIFICATION_RATE_LIMIT', '10'))  # messages per second across all processes, 0 = unlimited
 
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     TESTING = False
-    SQLALCHEMY_ECHO = True
+    # Echoing every statement buries the slow ones; the slow-query log is on instead
+    SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO', 'false').lower() == 'true'
+    SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'true').lower() == 'true'
 
     # Use SQLite for local development
     database_url = os.getenv('DATABASE_URL', 'sqlite:///volunsched.db')
@@ -41,6 +95,10 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
 
+    # Deliver notifications explicitly via the dispatcher in tests
+    NOTIFICATION_SENDER = 'fake'
+    NOTIFICATION_WORKERS = 0
+
 
 class ProductionConfig(Config):
     """Production configuration"""
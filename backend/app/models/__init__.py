@@ -3,5 +3,9 @@ from app.models.volunteer import Volunteer
 from app.models.shift import Shift
 from app.models.signup import Signup
 from app.models.user import User
+from app.models.volunteer_rule_count import VolunteerRuleCount
+from app.models.scheduling_rule import SchedulingRule
+from app.models.outbox import OutboxMessage, NotificationJob, NotificationSendBudget
+from app.models.revoked_token import RevokedToken
 
-__all__ = ['Volunteer', 'Shift', 'Signup', 'User']
+__all__ = ['Volunteer', 'Shift', 'Signup', 'User', 'VolunteerRuleCount', 'SchedulingRule', 'OutboxMessage', 'NotificationJob', 'NotificationSendBudget', 'RevokedToken']
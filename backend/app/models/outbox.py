@@ -0,0 +1,70 @@
+"""Notification outbox models"""
+from app import db
+from datetime import datetime
+
+
+class NotificationJob(db.Model):
+    """Bulk messaging job created by a coordinator; its messages live in the outbox"""
+    __tablename__ = 'notification_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    message = db.Column(db.Text, nullable=False)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    missing_volunteer_ids = db.Column(db.JSON, default=list)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<NotificationJob {self.id} total={self.total}>'
+
+
+class OutboxMessage(db.Model):
+    """Outgoing notification written in the same transaction as the change it reports"""
+    __tablename__ = 'notification_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    phone = db.Column(db.String(20), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    kind = db.Column(db.String(20), nullable=False, default='custom')  # 'confirmation', 'cancellation', 'reminder', 'custom'
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'sending', 'sent', 'dead'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = db.Column(db.String(32))
+    job_id = db.Column(db.Integer, db.ForeignKey('notification_jobs.id'), index=True)
+    # Set for messages that must be queued at most once, e.g. 'reminder:<signup_id>'
+    dedupe_key = db.Column(db.String(64), unique=True)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'id': self.id,
+            'phone': self.phone,
+            'kind': self.kind,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat(),
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
+
+    def __repr__(self):
+        return f'<OutboxMessage {self.id} {self.status}>'
+
+
+class NotificationSendBudget(db.Model):
+    """Single row pacing outbox sends across every process sharing the database"""
+    __tablename__ = 'notification_send_budget'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Earliest time the next message may go out, in microseconds since the epoch
+    next_send_at = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<NotificationSendBudget next_send_at={self.next_send_at}>'
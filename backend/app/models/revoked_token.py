@@ -0,0 +1,21 @@
+"""Revoked access tokens"""
+from app import db
+from datetime import datetime
+
+
+class RevokedToken(db.Model):
+    """
+    Access token revoked before its expiry, keyed by its jti claim
+
+    Rows are only needed until the token would have expired anyway and are
+    pruned after that.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'))
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
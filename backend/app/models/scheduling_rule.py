@@ -0,0 +1,38 @@
+"""Scheduling rule model"""
+from app import db
+from datetime import datetime
+
+
+class SchedulingRule(db.Model):
+    """
+    Limit on how many matching confirmed signups a volunteer may hold
+
+    A shift matches when it equals every predicate column that is set;
+    a rule without predicates counts all shifts.
+    """
+    __tablename__ = 'scheduling_rules'
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(50), unique=True, nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    shift_type = db.Column(db.String(10))
+    day_name = db.Column(db.String(10))
+    week_of_month = db.Column(db.Integer)
+    max_signups = db.Column(db.Integer, nullable=False)
+    message = db.Column(db.String(255))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'key': self.key,
+            'position': self.position,
+            'shift_type': self.shift_type,
+            'day_name': self.day_name,
+            'week_of_month': self.week_of_month,
+            'max_signups': self.max_signups,
+            'message': self.message
+        }
+
+    def __repr__(self):
+        return f'<SchedulingRule {self.key} max={self.max_signups}>'
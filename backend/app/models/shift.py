@@ -13,13 +13,19 @@ class Shift(db.Model):
     week_of_month = db.Column(db.Integer)
     shift_type = db.Column(db.String(10), nullable=False)  # 'Kakad' or 'Robes'
     capacity = db.Column(db.Integer, nullable=False, default=1)
+    # Number of confirmed signups, maintained by CounterService
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    # Relationships
-    signups = db.relationship('Signup', back_populates='shift', cascade='all, delete-orphan')
+    # Relationships; the database deletes a shift's signups (ON DELETE CASCADE)
+    signups = db.relationship(
+        'Signup', back_populates='shift', cascade='all, delete-orphan', passive_deletes=True
+    )
 
     __table_args__ = (
         db.UniqueConstraint('date', 'shift_type', name='unique_date_shifttype'),
+        # Keyset pagination order of shift lists
+        db.Index('ix_shifts_date_id', 'date', 'id'),
     )
 
     def to_dict(self, include_signups=False):
@@ -32,10 +38,11 @@ class Shift(db.Model):
             'shift_type': self.shift_type,
             'capacity': self.capacity,
             'created_at': self.created_at.isoformat(),
-            'current_signups': len([s for s in self.signups if s.status == 'confirmed'])
+            'current_signups': self.confirmed_count
         }
         if include_signups:
-            data['signups'] = [s.to_dict() for s in self.signups]
+            # The parent shift is this object, so don't serialize it again
+            data['signups'] = [s.to_dict(include_shift=False) for s in self.signups]
         return data
 
     def __repr__(self):
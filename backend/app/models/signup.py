@@ -1,6 +1,7 @@
 """Signup model"""
 from app import db
 from datetime import datetime
+from sqlalchemy import text
 
 
 class Signup(db.Model):
@@ -9,7 +10,7 @@ class Signup(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     volunteer_id = db.Column(db.Integer, db.ForeignKey('volunteers.id'), nullable=False)
-    shift_id = db.Column(db.Integer, db.ForeignKey('shifts.id'), nullable=False)
+    shift_id = db.Column(db.Integer, db.ForeignKey('shifts.id', ondelete='CASCADE'), nullable=False)
     status = db.Column(db.String(20), default='confirmed')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -19,19 +20,32 @@ class Signup(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('volunteer_id', 'shift_id', name='unique_volunteer_shift'),
+        # Signups of a shift by status: capacity checks, shift detail, reminders,
+        # counter rebuilds and ON DELETE CASCADE; covering for volunteer_id
+        db.Index('ix_signups_shift_status_volunteer', 'shift_id', 'status', 'volunteer_id'),
+        # Confirmed signups of a volunteer, covering for the quota ledger;
+        # partial where the database supports it, a plain index elsewhere
+        db.Index(
+            'ix_signups_confirmed_volunteer_shift', 'volunteer_id', 'shift_id',
+            postgresql_where=text("status = 'confirmed'"),
+            sqlite_where=text("status = 'confirmed'")
+        ),
     )
 
-    def to_dict(self):
+    def to_dict(self, include_shift=True, include_volunteer=True):
         """Convert model to dictionary"""
-        return {
+        data = {
             'id': self.id,
             'volunteer_id': self.volunteer_id,
             'shift_id': self.shift_id,
             'status': self.status,
-            'created_at': self.created_at.isoformat(),
-            'volunteer': self.volunteer.to_dict() if self.volunteer else None,
-            'shift': self.shift.to_dict() if self.shift else None
+            'created_at': self.created_at.isoformat()
         }
+        if include_volunteer:
+            data['volunteer'] = self.volunteer.to_dict() if self.volunteer else None
+        if include_shift:
+            data['shift'] = self.shift.to_dict() if self.shift else None
+        return data
 
     def __repr__(self):
         return f'<Signup volunteer_id={self.volunteer_id} shift_id={self.shift_id}>'
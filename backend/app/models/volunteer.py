@@ -11,13 +11,19 @@ class Volunteer(db.Model):
     name = db.Column(db.String(255), nullable=False)
     phone = db.Column(db.String(20), unique=True, nullable=False)
     email = db.Column(db.String(255), unique=True)
-    reliability_score = db.Column(db.Integer, default=100)
+    reliability_score = db.Column(db.Integer, nullable=False, default=100, server_default='100')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     signups = db.relationship('Signup', back_populates='volunteer', cascade='all, delete-orphan')
     user = db.relationship('User', back_populates='volunteer', uselist=False)
+    rule_counts = db.relationship('VolunteerRuleCount', back_populates='volunteer', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # Keyset pagination order of the reliability list
+        db.Index('ix_volunteers_reliability_id', 'reliability_score', 'id'),
+    )
 
     def to_dict(self):
         """Convert model to dictionary"""
@@ -0,0 +1,19 @@
+"""Volunteer rule count ledger model"""
+from app import db
+from datetime import datetime
+
+
+class VolunteerRuleCount(db.Model):
+    """Running count of a volunteer's confirmed signups matching one scheduling rule"""
+    __tablename__ = 'volunteer_rule_counts'
+
+    volunteer_id = db.Column(db.Integer, db.ForeignKey('volunteers.id', ondelete='CASCADE'), primary_key=True)
+    rule_key = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    volunteer = db.relationship('Volunteer', back_populates='rule_counts')
+
+    def __repr__(self):
+        return f'<VolunteerRuleCount volunteer_id={self.volunteer_id} {self.rule_key}={self.count}>'
@@ -1,8 +1,9 @@
 """Authentication routes"""
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from app import db
 from app.models import User, Volunteer
+from app.services.tokens import TokenService
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -45,8 +46,8 @@ def register():
         db.session.add(user)
         db.session.commit()
 
-        # Create access token
-        access_token = create_access_token(identity=user.id)
+        # Create access token carrying the role claims
+        access_token = TokenService.issue(user)
 
         return jsonify({
             'message': 'User registered successfully',
@@ -79,8 +80,8 @@ def login():
     if not user or not user.check_password(password):
         return jsonify({'error': 'Invalid username or password'}), 401
 
-    # Create access token (identity must be a string)
-    access_token = create_access_token(identity=str(user.id))
+    # Create access token carrying the role claims
+    access_token = TokenService.issue(user)
 
     return jsonify({
         'message': 'Login successful',
@@ -109,5 +110,11 @@ def get_current_user():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    """Logout user (token blacklisting would be implemented here)"""
-    return jsonify({'message': 'Logout successful'}), 200
+    """Logout user by revoking the current token"""
+    try:
+        TokenService.revoke(get_jwt())
+        return jsonify({'message': 'Logout successful'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Logout failed: {str(e)}'}), 500
@@ -1,71 +1,80 @@
 """Coordinator-specific routes for dashboards and tools"""
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity
 from app import db
-from app.models import User, Volunteer, Shift, Signup
+from app.models import Volunteer, Shift, OutboxMessage, NotificationJob
+from app.routes.decorators import coordinator_required
+from app.routes.pagination import ListParams, page_response, paginate
+from app.serialization import SHIFT_ROWS, VOLUNTEER_ROWS, dumps, json_response
+from app.routes.signups import create_signups_batch
 from app.services.validation import ValidationService
-from app.services.notifications import NotificationService
-from sqlalchemy import func
+from app.services.outbox import OutboxService
+from app.services.snapshot_cache import get_snapshot_cache
+from app.services.roster import RosterService
+from sqlalchemy import func, select
+from datetime import date, datetime, timedelta
 
 coordinator_bp = Blueprint('coordinator', __name__, url_prefix='/api/coordinator')
 
 
 @coordinator_bp.route('/dashboard', methods=['GET'])
-@jwt_required()
+@coordinator_required
 def get_dashboard():
     """Get coordinator dashboard overview"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
-
-    # Get all metrics
-    total_volunteers = Volunteer.query.count()
-    total_signups = Signup.query.filter_by(status='confirmed').count()
-    total_shifts = Shift.query.count()
-
-    # Get upcoming shifts
-    upcoming_shifts = Shift.query.order_by(Shift.date).limit(10).all()
-
-    # Calculate understaffed shifts
-    understaffed = []
-    for shift in upcoming_shifts:
-        current_signups = Signup.query.filter(
-            Signup.shift_id == shift.id,
-            Signup.status == 'confirmed'
-        ).count()
-        if current_signups < shift.capacity:
-            understaffed.append({
-                'shift': shift.to_dict(),
-                'current_signups': current_signups,
-                'needed': shift.capacity - current_signups
-            })
-
-    # Get average reliability score
-    avg_reliability = db.session.query(
-        func.avg(Volunteer.reliability_score)
-    ).scalar() or 0
-
-    return jsonify({
+    start, end = _dashboard_window()
+    # The cache keeps the encoded body, so hits skip serialization
+    body = get_snapshot_cache().get_or_build(
+        ('dashboard', start, end),
+        lambda: dumps(_build_dashboard(start, end))
+    )
+    return json_response(body)
+
+
+def _dashboard_window():
+    """Return the (start, end) dates of the forward-looking dashboard window"""
+    start = date.today()
+    return start, start + timedelta(days=current_app.config['DASHBOARD_WINDOW_DAYS'])
+
+
+def _build_dashboard(start, end):
+    """Compute the dashboard snapshot for shifts between start and end"""
+    # All headline metrics in one statement
+    totals = db.session.query(
+        select(func.count(Volunteer.id)).scalar_subquery(),
+        select(func.avg(Volunteer.reliability_score)).scalar_subquery(),
+        select(func.count(Shift.id)).scalar_subquery(),
+        select(func.coalesce(func.sum(Shift.confirmed_count), 0)).scalar_subquery()
+    ).one()
+    total_volunteers, avg_reliability, total_shifts, total_signups = totals
+
+    # Understaffed shifts in the upcoming window only
+    understaffed_shifts = SHIFT_ROWS.rows(db.session.query(*SHIFT_ROWS.select_columns()).filter(
+        Shift.date >= start,
+        Shift.date < end,
+        Shift.confirmed_count < Shift.capacity
+    ).order_by(Shift.date, Shift.shift_type))
+
+    understaffed = [{
+        'shift': shift,
+        'current_signups': shift['current_signups'],
+        'needed': shift['capacity'] - shift['current_signups']
+    } for shift in understaffed_shifts]
+
+    return {
         'total_volunteers': total_volunteers,
-        'total_signups': total_signups,
+        'total_signups': int(total_signups),
         'total_shifts': total_shifts,
-        'average_reliability_score': round(float(avg_reliability), 2),
+        'average_reliability_score': round(float(avg_reliability or 0), 2),
+        'window_start': start.isoformat(),
+        'window_end': end.isoformat(),
         'understaffed_shifts': understaffed
-    }), 200
+    }
 
 
 @coordinator_bp.route('/substitutes', methods=['GET'])
-@jwt_required()
+@coordinator_required
 def find_substitutes():
     """Find available substitutes for a shift"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
-
     shift_id = request.args.get('shift_id', type=int)
 
     if not shift_id:
@@ -76,16 +85,14 @@ def find_substitutes():
     if not shift:
         return jsonify({'error': 'Shift not found'}), 404
 
-    # Find eligible volunteers
-    eligible_volunteers = ValidationService.find_eligible_volunteers(shift_id)
+    # Find eligible volunteers along with the counters used to check them
+    eligible = ValidationService.find_eligible_candidates(shift_id)
 
-    # Get their current stats
     candidates = []
-    for volunteer in eligible_volunteers:
-        stats = ValidationService.get_volunteer_stats(volunteer.id)
+    for volunteer, counters in eligible:
         candidates.append({
             'volunteer': volunteer.to_dict(),
-            'stats': stats
+            'stats': ValidationService.stats_from_counters(counters)
         })
 
     # Sort by reliability score (highest first)
@@ -101,15 +108,9 @@ def find_substitutes():
 
 
 @coordinator_bp.route('/notifications/send', methods=['POST'])
-@jwt_required()
+@coordinator_required
 def send_bulk_notification():
-    """Send notifications to multiple volunteers"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
-
+    """Queue a bulk notification job for multiple volunteers"""
     data = request.get_json()
 
     if not data:
@@ -121,79 +122,223 @@ def send_bulk_notification():
     if not volunteer_ids or not message:
         return jsonify({'error': 'Missing volunteer_ids or message'}), 400
 
-    if not isinstance(volunteer_ids, list):
-        return jsonify({'error': 'volunteer_ids must be a list'}), 400
+    if not isinstance(volunteer_ids, list) or not all(
+        isinstance(vol_id, int) and not isinstance(vol_id, bool) for vol_id in volunteer_ids
+    ):
+        return jsonify({'error': 'volunteer_ids must be a list of integers'}), 400
+
+    # Resolve every recipient's phone in one query
+    phones = dict(db.session.query(Volunteer.id, Volunteer.phone).filter(
+        Volunteer.id.in_(volunteer_ids)
+    ).all())
+    missing = [vol_id for vol_id in volunteer_ids if vol_id not in phones]
+    recipients = [phones[vol_id] for vol_id in dict.fromkeys(volunteer_ids) if vol_id in phones]
+
+    try:
+        job = NotificationJob(
+            created_by=int(get_jwt_identity()),
+            message=message,
+            total=len(recipients),
+            missing_volunteer_ids=missing
+        )
+        db.session.add(job)
+        db.session.flush()
+
+        # Messages are sent by the outbox workers under the configured rate limit
+        OutboxService.enqueue_many(
+            ((phone, message) for phone in recipients),
+            kind='custom',
+            job_id=job.id
+        )
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to queue notifications: {str(e)}'}), 500
+
+    return jsonify({
+        'message': f'Notifications queued for {len(recipients)} volunteers',
+        'job_id': job.id,
+        'queued': len(recipients),
+        'failed': missing
+    }), 202
 
-    # Send notifications
-    sent = 0
-    failed = []
 
-    for vol_id in volunteer_ids:
-        volunteer = Volunteer.query.get(vol_id)
-        if volunteer:
-            success = NotificationService.send_custom_message(volunteer.phone, message)
-            if success:
-                sent += 1
-            else:
-                failed.append(vol_id)
-        else:
-            failed.append(vol_id)
+@coordinator_bp.route('/notifications/jobs/<int:job_id>', methods=['GET'])
+@coordinator_required
+def get_notification_job(job_id):
+    """Get progress and failures of a bulk notification job"""
+    job = NotificationJob.query.get(job_id)
+
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    counts = dict(db.session.query(
+        OutboxMessage.status, func.count(OutboxMessage.id)
+    ).filter(
+        OutboxMessage.job_id == job_id
+    ).group_by(OutboxMessage.status).all())
+
+    failures = OutboxMessage.query.filter(
+        OutboxMessage.job_id == job_id,
+        OutboxMessage.status == 'dead'
+    ).order_by(OutboxMessage.id).all()
+
+    sent = counts.get('sent', 0)
+    dead = counts.get('dead', 0)
 
     return jsonify({
-        'message': f'Notifications sent to {sent} volunteers',
+        'job_id': job.id,
+        'created_at': job.created_at.isoformat(),
+        'total': job.total,
         'sent': sent,
-        'failed': failed
+        'pending': counts.get('pending', 0) + counts.get('sending', 0),
+        'failed': dead,
+        'is_complete': sent + dead == job.total,
+        'missing_volunteer_ids': job.missing_volunteer_ids or [],
+        'failures': [{
+            'phone': failure.phone,
+            'attempts': failure.attempts,
+            'error': failure.last_error
+        } for failure in failures]
     }), 200
 
 
 @coordinator_bp.route('/volunteers/reliability', methods=['GET'])
-@jwt_required()
+@coordinator_required
 def get_volunteers_by_reliability():
-    """Get volunteers sorted by reliability score"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
-
+    """Get a page of volunteers sorted by reliability score, highest first"""
     min_score = request.args.get('min_score', type=int, default=0)
 
-    volunteers = Volunteer.query.filter(
-        Volunteer.reliability_score >= min_score
-    ).order_by(
-        Volunteer.reliability_score.desc()
-    ).all()
+    try:
+        params = ListParams.parse(VOLUNTEER_ROWS)
+        serializer = VOLUNTEER_ROWS.only(params.fields)
+        rows, cursor = paginate(
+            db.session.query(*serializer.select_columns()).select_from(Volunteer).filter(
+                Volunteer.reliability_score >= min_score
+            ),
+            [(Volunteer.reliability_score, True), (Volunteer.id, True)],
+            params
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify([v.to_dict() for v in volunteers]), 200
+    return page_response(serializer.rows(rows), cursor)
 
 
 @coordinator_bp.route('/shifts/fill-status', methods=['GET'])
-@jwt_required()
+@coordinator_required
 def get_shifts_fill_status():
-    """Get all shifts with their fill status"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    """Get shifts in a date window with their fill status"""
+    # Defaults to the dashboard window; pass dates to look further ahead or back
+    start, end = _dashboard_window()
+    try:
+        if request.args.get('start_date'):
+            start = datetime.fromisoformat(request.args['start_date']).date()
+        if request.args.get('end_date'):
+            end = datetime.fromisoformat(request.args['end_date']).date() + timedelta(days=1)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use ISO format (YYYY-MM-DD)'}), 400
+
+    body = get_snapshot_cache().get_or_build(
+        ('fill-status', start, end),
+        lambda: dumps(_build_fill_status(start, end))
+    )
+    return json_response(body)
 
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
 
-    shifts = Shift.query.order_by(Shift.date).all()
+def _build_fill_status(start, end):
+    """Compute fill status for shifts between start and end"""
+    shifts = SHIFT_ROWS.iter_rows(db.session.query(*SHIFT_ROWS.select_columns()).filter(
+        Shift.date >= start,
+        Shift.date < end
+    ).order_by(Shift.date))
 
     shifts_with_status = []
     for shift in shifts:
-        current_signups = Signup.query.filter(
-            Signup.shift_id == shift.id,
-            Signup.status == 'confirmed'
-        ).count()
+        current_signups = shift['current_signups']
+        capacity = shift['capacity']
 
-        fill_percentage = (current_signups / shift.capacity * 100) if shift.capacity > 0 else 0
+        fill_percentage = (current_signups / capacity * 100) if capacity > 0 else 0
 
         shifts_with_status.append({
-            'shift': shift.to_dict(),
+            'shift': shift,
             'current_signups': current_signups,
             'fill_percentage': round(fill_percentage, 1),
-            'is_full': current_signups >= shift.capacity,
-            'is_understaffed': current_signups < shift.capacity
+            'is_full': current_signups >= capacity,
+            'is_understaffed': current_signups < capacity
         })
 
-    return jsonify(shifts_with_status), 200
+    return shifts_with_status
+
+
+@coordinator_bp.route('/roster/preview', methods=['POST'])
+@coordinator_required
+def preview_roster():
+    """
+    Propose volunteers for every open seat in a date range
+
+    Nothing is written; send the returned assignments to /roster/commit to
+    create them. Optional 'preferences' maps volunteer IDs to lists of shift
+    IDs they would like.
+    """
+    data = request.get_json() or {}
+
+    try:
+        start = datetime.fromisoformat(data['start_date']).date()
+        end = datetime.fromisoformat(data['end_date']).date() + timedelta(days=1)
+    except KeyError:
+        return jsonify({'error': 'Missing start_date or end_date'}), 400
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid date format. Use ISO format (YYYY-MM-DD)'}), 400
+
+    if end <= start:
+        return jsonify({'error': 'end_date must not be before start_date'}), 400
+
+    preferences = data.get('preferences') or {}
+    if not isinstance(preferences, dict) or not all(
+        isinstance(shift_ids, list) for shift_ids in preferences.values()
+    ):
+        return jsonify({'error': 'preferences must map volunteer IDs to lists of shift IDs'}), 400
+
+    try:
+        roster = RosterService.generate(start, end, preferences)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'preferences must map volunteer IDs to lists of shift IDs'}), 400
+
+    return jsonify(roster), 200
+
+
+@coordinator_bp.route('/roster/commit', methods=['POST'])
+@coordinator_required
+def commit_roster():
+    """
+    Create the signups of a previewed roster
+
+    Goes through the bulk signup path, so every assignment is validated
+    again against the current signups. Defaults to 'best_effort', creating
+    the assignments that are still valid and reporting the rest.
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    assignments = data.get('assignments')
+    mode = data.get('mode', 'best_effort')
+
+    if not isinstance(assignments, list) or not assignments:
+        return jsonify({'error': 'assignments must be a non-empty list'}), 400
+
+    if mode not in ['atomic', 'best_effort']:
+        return jsonify({'error': 'Invalid mode. Must be atomic or best_effort'}), 400
+
+    limit = current_app.config['SIGNUP_BATCH_LIMIT']
+    if len(assignments) > limit:
+        return jsonify({'error': f'Too many signups (maximum {limit})'}), 400
+
+    pairs = [
+        (row.get('volunteer_id'), row.get('shift_id')) if isinstance(row, dict) else (None, None)
+        for row in assignments
+    ]
+    return create_signups_batch(pairs, mode)
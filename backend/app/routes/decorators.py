@@ -0,0 +1,26 @@
+"""Authorization helpers reading the claims of the current access token"""
+from functools import wraps
+
+from flask import jsonify
+from flask_jwt_extended import get_jwt, jwt_required
+
+
+def coordinator_required(fn):
+    """Require a valid token issued to a coordinator"""
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not is_coordinator():
+            return jsonify({'error': 'Coordinator access required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def is_coordinator():
+    """Whether the current token carries the coordinator role"""
+    return get_jwt().get('role') == 'coordinator'
+
+
+def current_volunteer_id():
+    """Volunteer linked to the current token, or None"""
+    return get_jwt().get('volunteer_id')
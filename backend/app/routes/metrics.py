@@ -0,0 +1,19 @@
+"""Prometheus metrics route"""
+from flask import Blueprint, current_app, jsonify
+
+from app.routes.decorators import coordinator_required
+from app.services.metrics import CONTENT_TYPE, get_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+@coordinator_required
+def get_metrics_text():
+    """Request, SQL and notification metrics of this process in Prometheus text format"""
+    metrics = get_metrics()
+
+    if not metrics:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+
+    return current_app.response_class(metrics.render(), mimetype=CONTENT_TYPE), 200
@@ -0,0 +1,163 @@
+"""Keyset pagination and sparse fieldsets for list endpoints"""
+import base64
+import json
+from datetime import date, datetime
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+from app.serialization import json_response
+
+# Response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class ListParams:
+    """
+    Paging and field selection parsed from the query string
+
+    `limit` and `cursor` page through the results; `fields` (comma
+    separated) keeps only the listed top-level fields and `expand` (comma
+    separated) adds the listed nested objects.
+    """
+
+    def __init__(self, limit, cursor, fields, expand):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def parse(cls, serializer, expandable=()):
+        """
+        Read list parameters from the current request
+
+        Args:
+            serializer: RowSerializer of the endpoint's top-level fields
+            expandable: Nested objects the endpoint can add
+
+        Returns:
+            ListParams: The parsed parameters
+
+        Raises:
+            ValueError: With a message for the client if a parameter is invalid
+        """
+        default = current_app.config['PAGE_SIZE_DEFAULT']
+        maximum = current_app.config['PAGE_SIZE_MAX']
+        limit = request.args.get('limit', default)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError('limit must be an integer')
+        if not 1 <= limit <= maximum:
+            raise ValueError(f'limit must be between 1 and {maximum}')
+
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            except (ValueError, TypeError):
+                raise ValueError('Invalid cursor')
+            if not isinstance(cursor, list):
+                raise ValueError('Invalid cursor')
+
+        fields = _split(request.args.get('fields'))
+        unknown = fields - set(serializer.names) if fields else set()
+        if unknown:
+            raise ValueError(
+                f'Unknown fields: {", ".join(sorted(unknown))}. '
+                f'Allowed: {", ".join(serializer.names)}'
+            )
+
+        expand = _split(request.args.get('expand')) or set()
+        unknown = expand - set(expandable)
+        if unknown:
+            raise ValueError(
+                f'Cannot expand: {", ".join(sorted(unknown))}. '
+                f'Allowed: {", ".join(expandable) or "none"}'
+            )
+
+        return cls(limit, cursor or None, fields, expand)
+
+
+def _split(value):
+    if value is None:
+        return None
+    return {part.strip() for part in value.split(',') if part.strip()}
+
+
+def paginate(query, keys, params):
+    """
+    Fetch one page of a query ordered by unique sort keys
+
+    The next page starts after the last row's key values (keyset
+    pagination), so each page costs an index range scan of `limit` rows
+    however deep into the results it is. The key values are appended to
+    the selected columns, so they need not be among the requested fields.
+
+    Args:
+        query: Column query with filters applied and no ordering
+        keys: (column, descending) pairs ending in a unique column
+        params: ListParams of the request
+
+    Returns:
+        tuple: (result tuples, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor does not match the sort keys
+    """
+    if params.cursor is not None:
+        if len(params.cursor) != len(keys):
+            raise ValueError('Invalid cursor')
+        try:
+            values = [_decode(column, value) for (column, _), value in zip(keys, params.cursor)]
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+        query = query.filter(_after(keys, values))
+
+    query = query.add_columns(*(column for column, _ in keys)).order_by(*(
+        column.desc() if descending else column.asc() for column, descending in keys
+    ))
+    rows = query.limit(params.limit + 1).all()
+
+    if len(rows) <= params.limit:
+        return rows, None
+    rows = rows[:params.limit]
+    values = [_encode(value) for value in rows[-1][-len(keys):]]
+    cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+    return rows, cursor
+
+
+def _after(keys, values):
+    # (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ..., flipped for descending keys
+    clauses = []
+    for index, (column, descending) in enumerate(keys):
+        equal = [keys[i][0] == values[i] for i in range(index)]
+        beyond = column < values[index] if descending else column > values[index]
+        clauses.append(and_(*equal, beyond))
+    return or_(*clauses)
+
+
+def _encode(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decode(column, value):
+    python_type = column.type.python_type
+    if value is None:
+        raise ValueError('Invalid cursor')
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def page_response(items, cursor):
+    """JSON list response with the next page's cursor in a header"""
+    response = json_response(items)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return response, 200
@@ -1,9 +1,15 @@
 """Shift routes"""
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
 from app import db
-from app.models import Shift, User
-from datetime import datetime
+from app.models import Shift, Signup
+from app.routes.decorators import coordinator_required
+from app.services.recurrence import DEFAULT_SHIFT_TEMPLATE, SHIFT_TYPES, RecurrenceService, shift_fields
+from app.services.shift_removal import ShiftRemovalService
+from app.routes.pagination import ListParams, page_response, paginate
+from app.serialization import SHIFT_ROWS
+from sqlalchemy.orm import selectinload
+from datetime import datetime, timedelta
 
 shifts_bp = Blueprint('shifts', __name__, url_prefix='/api/shifts')
 
@@ -11,13 +17,19 @@ shifts_bp = Blueprint('shifts', __name__, url_prefix='/api/shifts')
 @shifts_bp.route('', methods=['GET'])
 @jwt_required()
 def get_shifts():
-    """Get list of shifts with optional filters"""
+    """Get a page of shifts ordered by date, with optional filters"""
+    try:
+        params = ListParams.parse(SHIFT_ROWS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    serializer = SHIFT_ROWS.only(params.fields)
+
     # Get query parameters
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     shift_type = request.args.get('shift_type')  # 'Kakad' or 'Robes'
 
-    query = Shift.query
+    query = db.session.query(*serializer.select_columns()).select_from(Shift)
 
     if start_date:
         try:
@@ -36,15 +48,21 @@ def get_shifts():
     if shift_type:
         query = query.filter(Shift.shift_type == shift_type)
 
-    shifts = query.order_by(Shift.date).all()
-    return jsonify([s.to_dict() for s in shifts]), 200
+    try:
+        rows, cursor = paginate(query, [(Shift.date, False), (Shift.id, False)], params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return page_response(serializer.rows(rows), cursor)
 
 
 @shifts_bp.route('/<int:shift_id>', methods=['GET'])
 @jwt_required()
 def get_shift(shift_id):
     """Get specific shift details with signups"""
-    shift = Shift.query.get(shift_id)
+    shift = Shift.query.options(
+        selectinload(Shift.signups).joinedload(Signup.volunteer)
+    ).filter(Shift.id == shift_id).first()
 
     if not shift:
         return jsonify({'error': 'Shift not found'}), 404
@@ -53,15 +71,9 @@ def get_shift(shift_id):
 
 
 @shifts_bp.route('', methods=['POST'])
-@jwt_required()
+@coordinator_required
 def create_shift():
     """Create a new shift (coordinator only)"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
-
     data = request.get_json()
 
     if not data:
@@ -74,7 +86,7 @@ def create_shift():
     if not date_str or not shift_type:
         return jsonify({'error': 'Missing required fields: date, shift_type'}), 400
 
-    if shift_type not in ['Kakad', 'Robes']:
+    if shift_type not in SHIFT_TYPES:
         return jsonify({'error': 'Invalid shift_type. Must be Kakad or Robes'}), 400
 
     try:
@@ -82,9 +94,6 @@ def create_shift():
     except ValueError:
         return jsonify({'error': 'Invalid date format. Use ISO format (YYYY-MM-DD)'}), 400
 
-    # Get day name
-    day_name = shift_date.strftime('%A')
-
     # Check if shift already exists for this date and type
     existing = Shift.query.filter_by(date=shift_date, shift_type=shift_type).first()
     if existing:
@@ -92,13 +101,13 @@ def create_shift():
 
     try:
         # Default capacity: Kakad=1, Robes=4
-        capacity = data.get('capacity', 1 if shift_type == 'Kakad' else 4)
+        capacity = data.get('capacity', SHIFT_TYPES[shift_type])
 
         shift = Shift(
             date=shift_date,
-            day_name=day_name,
             shift_type=shift_type,
-            capacity=capacity
+            capacity=capacity,
+            **shift_fields(shift_date)
         )
         db.session.add(shift)
         db.session.commit()
@@ -110,16 +119,62 @@ def create_shift():
         return jsonify({'error': f'Failed to create shift: {str(e)}'}), 500
 
 
+@shifts_bp.route('/generate', methods=['POST'])
+@coordinator_required
+def generate_shifts():
+    """
+    Create recurring shifts for a date range from a template (coordinator only)
+
+    Each template entry gives a shift_type, an optional capacity, and
+    optional 'days' (e.g. ["Thursday"]) and 'weeks' (weeks of the month)
+    limiting the dates it applies to. Without a template every shift type
+    is created every day. Shifts that already exist are skipped.
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    try:
+        start = datetime.fromisoformat(data['start_date']).date()
+        end = datetime.fromisoformat(data['end_date']).date() + timedelta(days=1)
+    except KeyError:
+        return jsonify({'error': 'Missing required fields: start_date, end_date'}), 400
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid date format. Use ISO format (YYYY-MM-DD)'}), 400
+
+    if end <= start:
+        return jsonify({'error': 'end_date must not be before start_date'}), 400
+
+    max_days = current_app.config['SHIFT_GENERATION_MAX_DAYS']
+    if (end - start).days > max_days:
+        return jsonify({'error': f'Date range too long (max {max_days} days)'}), 400
+
+    template = data.get('template', DEFAULT_SHIFT_TEMPLATE)
+    error = RecurrenceService.validate_template(template)
+    if error:
+        return jsonify({'error': error}), 400
+
+    try:
+        created, skipped = RecurrenceService.generate(template, start, end)
+        db.session.commit()
+
+        return jsonify({
+            'start_date': start.isoformat(),
+            'end_date': (end - timedelta(days=1)).isoformat(),
+            'created': created,
+            'skipped': skipped
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to generate shifts: {str(e)}'}), 500
+
+
 @shifts_bp.route('/<int:shift_id>', methods=['PUT'])
-@jwt_required()
+@coordinator_required
 def update_shift(shift_id):
     """Update shift details (coordinator only)"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
-
     shift = Shift.query.get(shift_id)
 
     if not shift:
@@ -143,27 +198,67 @@ def update_shift(shift_id):
 
 
 @shifts_bp.route('/<int:shift_id>', methods=['DELETE'])
-@jwt_required()
+@coordinator_required
 def delete_shift(shift_id):
     """Delete a shift (coordinator only)"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    try:
+        # Signups are deleted by the database, without loading them
+        removed = ShiftRemovalService.remove(Shift.id == shift_id, notify=False)
+        if not removed['deleted_shifts']:
+            db.session.rollback()
+            return jsonify({'error': 'Shift not found'}), 404
+        db.session.commit()
 
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
+        return jsonify({'message': 'Shift deleted successfully'}), 200
 
-    shift = Shift.query.get(shift_id)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to delete shift: {str(e)}'}), 500
 
-    if not shift:
-        return jsonify({'error': 'Shift not found'}), 404
+
+@shifts_bp.route('/delete-range', methods=['POST'])
+@coordinator_required
+def delete_shift_range():
+    """
+    Delete every shift in a date range with its signups (coordinator only)
+
+    Optional 'shift_type' limits the deletion to one type. Volunteers with
+    confirmed signups on upcoming shifts are sent a cancellation notice
+    unless 'notify' is false.
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
 
     try:
-        # Delete associated signups cascade
-        db.session.delete(shift)
+        start = datetime.fromisoformat(data['start_date']).date()
+        end = datetime.fromisoformat(data['end_date']).date()
+    except KeyError:
+        return jsonify({'error': 'Missing required fields: start_date, end_date'}), 400
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid date format. Use ISO format (YYYY-MM-DD)'}), 400
+
+    if end < start:
+        return jsonify({'error': 'end_date must not be before start_date'}), 400
+
+    conditions = [Shift.date >= start, Shift.date <= end]
+    shift_type = data.get('shift_type')
+    if shift_type is not None:
+        if shift_type not in SHIFT_TYPES:
+            return jsonify({'error': 'Invalid shift_type. Must be Kakad or Robes'}), 400
+        conditions.append(Shift.shift_type == shift_type)
+
+    try:
+        removed = ShiftRemovalService.remove(*conditions, notify=data.get('notify', True) is not False)
         db.session.commit()
 
-        return jsonify({'message': 'Shift deleted successfully'}), 200
+        return jsonify({
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            **removed
+        }), 200
 
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': f'Failed to delete shift: {str(e)}'}), 500
+        return jsonify({'error': f'Failed to delete shifts: {str(e)}'}), 500
@@ -1,10 +1,18 @@
 """Signup routes with validation"""
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
 from app import db
-from app.models import Signup, Shift, User, Volunteer
+from app.models import Signup, Shift, Volunteer
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from app.services.validation import ValidationService
 from app.services.notifications import NotificationService
+from app.services.outbox import OutboxService
+from app.services.counters import CounterService, quota_deltas
+from app.services.admission import AdmissionRejected
+from app.routes.decorators import coordinator_required, current_volunteer_id, is_coordinator
+from app.routes.pagination import ListParams, page_response, paginate
+from app.serialization import SHIFT_ROWS, SIGNUP_ROWS, STREAM_CHUNK_ROWS, VOLUNTEER_ROWS, stream_array
 
 signups_bp = Blueprint('signups', __name__, url_prefix='/api/signups')
 
@@ -12,20 +20,66 @@ signups_bp = Blueprint('signups', __name__, url_prefix='/api/signups')
 @signups_bp.route('', methods=['GET'])
 @jwt_required()
 def get_signups():
-    """Get list of signups with optional filters"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    """
+    Get a page of signups, newest first, with optional filters
+
+    Nested objects are only included when asked for with
+    ?expand=volunteer,shift.
+    """
+    try:
+        params = ListParams.parse(SIGNUP_ROWS, ('volunteer', 'shift'))
+        serializer, query = _signup_rows(params)
+        # IDs grow with creation time, so this is the created_at order
+        rows, cursor = paginate(query, [(Signup.id, True)], params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return page_response(serializer.rows(rows), cursor)
+
+
+@signups_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_signups():
+    """
+    Stream every signup matching the filters as one JSON array, newest first
+
+    Takes the same filters, fields and expand parameters as the list, but
+    no paging; rows are read and encoded in chunks as they are sent.
+    """
+    try:
+        params = ListParams.parse(SIGNUP_ROWS, ('volunteer', 'shift'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    serializer, query = _signup_rows(params)
+    result = query.order_by(Signup.id.desc()).yield_per(STREAM_CHUNK_ROWS)
+    return stream_array(serializer.iter_rows(result))
+
+
+def _signup_rows(params):
+    """Serializer and filtered column query for signup listings"""
+    nested = {}
+    if 'volunteer' in params.expand:
+        nested['volunteer'] = VOLUNTEER_ROWS
+    if 'shift' in params.expand:
+        nested['shift'] = SHIFT_ROWS
+    serializer = SIGNUP_ROWS.only(params.fields).expand(**nested)
+
+    # Join only the requested nested objects
+    query = db.session.query(*serializer.select_columns()).select_from(Signup)
+    if 'volunteer' in nested:
+        query = query.join(Volunteer, Signup.volunteer_id == Volunteer.id)
+    if 'shift' in nested:
+        query = query.join(Shift, Signup.shift_id == Shift.id)
 
     # Get query parameters
     volunteer_id = request.args.get('volunteer_id', type=int)
     shift_id = request.args.get('shift_id', type=int)
     status = request.args.get('status')
 
-    query = Signup.query
-
     # Non-coordinators can only see their own signups
-    if user.role != 'coordinator':
-        query = query.filter(Signup.volunteer_id == user.volunteer_id)
+    if not is_coordinator():
+        query = query.filter(Signup.volunteer_id == current_volunteer_id())
     elif volunteer_id:
         query = query.filter(Signup.volunteer_id == volunteer_id)
 
@@ -35,8 +89,7 @@ def get_signups():
     if status:
         query = query.filter(Signup.status == status)
 
-    signups = query.order_by(Signup.created_at.desc()).all()
-    return jsonify([s.to_dict() for s in signups]), 200
+    return serializer, query
 
 
 @signups_bp.route('/validate', methods=['POST'])
@@ -67,13 +120,81 @@ def validate_signup():
     }), 200
 
 
+def _pair_error(volunteer_id, shift_id):
+    """
+    Reject a batch row whose IDs are missing or not integers
+
+    Lists and objects cannot be looked up, and true would pass for 1.
+
+    Returns:
+        str or None: Error message, None if both IDs are integers
+    """
+    if not volunteer_id or not shift_id:
+        return 'Missing volunteer_id or shift_id'
+    for value in (volunteer_id, shift_id):
+        if not isinstance(value, int) or isinstance(value, bool):
+            return 'volunteer_id and shift_id must be integers'
+    return None
+
+
+@signups_bp.route('/validate/batch', methods=['POST'])
+@jwt_required()
+def validate_signups_batch():
+    """Pre-validate many signups at once without creating them"""
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    pairs = data.get('pairs')
+
+    if not isinstance(pairs, list) or not pairs:
+        return jsonify({'error': 'pairs must be a non-empty list'}), 400
+
+    limit = current_app.config['SIGNUP_BATCH_LIMIT']
+    if len(pairs) > limit:
+        return jsonify({'error': f'Too many pairs (maximum {limit})'}), 400
+
+    parsed = []
+    for pair in pairs:
+        if not isinstance(pair, dict):
+            pair = {}
+        volunteer_id, shift_id = pair.get('volunteer_id'), pair.get('shift_id')
+        parsed.append((volunteer_id, shift_id, _pair_error(volunteer_id, shift_id)))
+
+    verdicts, counters = ValidationService.validate_signups_batch(
+        [(volunteer_id, shift_id) for volunteer_id, shift_id, error_msg in parsed if not error_msg]
+    )
+    verdicts = iter(verdicts)
+
+    results = []
+    for volunteer_id, shift_id, error_msg in parsed:
+        if error_msg:
+            results.append({
+                'volunteer_id': volunteer_id,
+                'shift_id': shift_id,
+                'is_valid': False,
+                'error_message': error_msg,
+                'stats': None
+            })
+            continue
+
+        is_valid, error_msg = next(verdicts)
+        results.append({
+            'volunteer_id': volunteer_id,
+            'shift_id': shift_id,
+            'is_valid': is_valid,
+            'error_message': error_msg,
+            'stats': ValidationService.stats_from_counters(counters[volunteer_id])
+        })
+
+    return jsonify({'results': results}), 200
+
+
 @signups_bp.route('', methods=['POST'])
 @jwt_required()
 def create_signup():
     """Create a new signup with validation"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
     data = request.get_json()
 
     if not data:
@@ -86,7 +207,7 @@ def create_signup():
         return jsonify({'error': 'Missing volunteer_id or shift_id'}), 400
 
     # Check permissions: own volunteer or coordinator
-    if user.volunteer_id != volunteer_id and user.role != 'coordinator':
+    if current_volunteer_id() != volunteer_id and not is_coordinator():
         return jsonify({'error': 'Insufficient permissions'}), 403
 
     # Verify volunteer and shift exist
@@ -99,56 +220,263 @@ def create_signup():
     if not shift:
         return jsonify({'error': 'Shift not found'}), 404
 
+    # Validate and write the signup, serialized per shift when admission is enabled
+    admission = current_app.extensions.get('signup_admission')
+
+    try:
+        if admission:
+            signup_id, error_msg = admission.submit(shift_id, _admit_signup, volunteer_id, shift_id)
+        else:
+            signup_id, error_msg = _admit_signup(volunteer_id, shift_id)
+
+    except AdmissionRejected as e:
+        return jsonify({'error': str(e)}), 503
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to create signup: {str(e)}'}), 500
+
+    if error_msg:
+        return jsonify({'error': error_msg}), 400
+
+    signup = Signup.query.get(signup_id)
+
+    # Get updated stats
+    stats = ValidationService.get_volunteer_stats(volunteer_id)
+
+    return jsonify({
+        'message': 'Signup created successfully',
+        'signup': signup.to_dict(),
+        'stats': stats
+    }), 201
+
+
+def _admit_signup(volunteer_id, shift_id):
+    """
+    Validate a signup and commit it together with its counters
+
+    Args:
+        volunteer_id: ID of the volunteer
+        shift_id: ID of the shift
+
+    Returns:
+        tuple: (signup_id or None, error_message or None)
+    """
     # Validate the signup against rules
     is_valid, error_msg = ValidationService.validate_signup(volunteer_id, shift_id)
 
     if not is_valid:
-        return jsonify({'error': error_msg}), 400
+        return None, error_msg
+
+    # Claim the seat and quota in the same transaction as the insert
+    error_msg = CounterService.confirm_signup(volunteer_id, Shift.query.get(shift_id))
+    if error_msg:
+        db.session.rollback()
+        return None, error_msg
 
     try:
-        # Create the signup
         signup = Signup(volunteer_id=volunteer_id, shift_id=shift_id)
         db.session.add(signup)
+
+        # Confirmation is committed with the signup and delivered in the background
+        NotificationService.queue_confirmation(
+            Volunteer.query.get(volunteer_id), Shift.query.get(shift_id)
+        )
         db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None, "Already signed up for this shift"
+
+    return signup.id, None
 
-        # Send confirmation notification
-        NotificationService.send_confirmation(volunteer_id, shift_id)
 
-        # Get updated stats
-        stats = ValidationService.get_volunteer_stats(volunteer_id)
+@signups_bp.route('/bulk', methods=['POST'])
+@coordinator_required
+def create_signups_bulk():
+    """
+    Create many signups in one transaction (coordinator only)
 
+    Rows are validated in order, so earlier rows of the batch count towards
+    the limits of later ones. In 'atomic' mode (the default) nothing is
+    created unless every row is valid; in 'best_effort' mode the valid rows
+    are created and the rest are reported as rejected.
+
+    Either mode answers 201 with a per-row report once the batch has been
+    written, even if best_effort created no rows. A rejected atomic batch
+    answers 400 with the same report, and 409 means the signups changed
+    while the batch was processed.
+    """
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    rows = data.get('signups')
+    mode = data.get('mode', 'atomic')
+
+    if not isinstance(rows, list) or not rows:
+        return jsonify({'error': 'signups must be a non-empty list'}), 400
+
+    if mode not in ['atomic', 'best_effort']:
+        return jsonify({'error': 'Invalid mode. Must be atomic or best_effort'}), 400
+
+    limit = current_app.config['SIGNUP_BATCH_LIMIT']
+    if len(rows) > limit:
+        return jsonify({'error': f'Too many signups (maximum {limit})'}), 400
+
+    pairs = []
+    for row in rows:
+        if not isinstance(row, dict):
+            row = {}
+        pairs.append((row.get('volunteer_id'), row.get('shift_id')))
+
+    return create_signups_batch(pairs, mode)
+
+
+def create_signups_batch(pairs, mode):
+    """
+    Validate and create a batch of signups in one transaction
+
+    Shared by the bulk signup endpoint and the roster commit endpoint;
+    see create_signups_bulk for the status codes.
+
+    Args:
+        pairs: List of (volunteer_id, shift_id) tuples
+        mode: 'atomic' or 'best_effort'
+
+    Returns:
+        tuple: Flask response and status code
+    """
+    errors = [_pair_error(volunteer_id, shift_id) for volunteer_id, shift_id in pairs]
+    volunteer_ids = {volunteer_id for (volunteer_id, _), error in zip(pairs, errors) if not error}
+    volunteers = {
+        volunteer.id: volunteer
+        for volunteer in Volunteer.query.filter(Volunteer.id.in_(volunteer_ids)).all()
+    } if volunteer_ids else {}
+
+    # Only rows that reference a known volunteer take part in rule checks
+    checked = [
+        pair for pair, error in zip(pairs, errors)
+        if not error and pair[0] in volunteers
+    ]
+    verdicts, _ = ValidationService.validate_signups_batch(checked, cumulative=True)
+    verdicts = iter(verdicts)
+
+    results = []
+    accepted = []
+    for index, ((volunteer_id, shift_id), error) in enumerate(zip(pairs, errors)):
+        if error:
+            is_valid, error_msg = False, error
+        elif volunteer_id not in volunteers:
+            is_valid, error_msg = False, 'Volunteer not found'
+        else:
+            is_valid, error_msg = next(verdicts)
+
+        if is_valid:
+            accepted.append(index)
+        results.append({
+            'index': index,
+            'volunteer_id': volunteer_id,
+            'shift_id': shift_id,
+            'status': 'created' if is_valid else 'rejected',
+            'error': error_msg
+        })
+
+    if mode == 'atomic' and len(accepted) != len(pairs):
+        for result in results:
+            if result['status'] == 'created':
+                result['status'] = 'not_created'
         return jsonify({
-            'message': 'Signup created successfully',
-            'signup': signup.to_dict(),
-            'stats': stats
-        }), 201
+            'error': 'Batch rejected: some signups are invalid',
+            'created': 0,
+            'rejected': len(pairs) - len(accepted),
+            'results': results
+        }), 400
+
+    # Confirmations are committed with the signups and delivered in the background
+    shifts = {
+        shift.id: shift
+        for shift in Shift.query.filter(Shift.id.in_({pairs[index][1] for index in accepted})).all()
+    } if accepted else {}
+    messages = [
+        (volunteers[pairs[index][0]].phone,
+         NotificationService.confirmation_message(shifts[pairs[index][1]]))
+        for index in accepted
+    ]
+
+    seats = {}
+    quotas = {}
+    for index in accepted:
+        volunteer_id, shift_id = pairs[index]
+        seats[shift_id] = seats.get(shift_id, 0) + 1
+        deltas = quota_deltas(shifts[shift_id])
+        quotas[volunteer_id] = [
+            current + delta for current, delta in
+            zip(quotas.get(volunteer_id, [0] * len(deltas)), deltas)
+        ]
+
+    try:
+        claimed = all(
+            CounterService.reserve_seats(shift_id, count)
+            for shift_id, count in seats.items()
+        ) and all(
+            CounterService.claim_quota(volunteer_id, deltas)
+            for volunteer_id, deltas in quotas.items()
+        )
+        if not claimed:
+            db.session.rollback()
+            return jsonify({'error': 'Signups changed while the batch was processed, please retry'}), 409
+
+        if accepted:
+            signup_ids = db.session.scalars(
+                insert(Signup).returning(Signup.id, sort_by_parameter_order=True),
+                [
+                    {'volunteer_id': pairs[index][0], 'shift_id': pairs[index][1]}
+                    for index in accepted
+                ]
+            ).all()
+            OutboxService.enqueue_many(messages, kind='confirmation')
+            db.session.commit()
+
+            for index, signup_id in zip(accepted, signup_ids):
+                results[index]['signup_id'] = signup_id
+
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Signups changed while the batch was processed, please retry'}), 409
 
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': f'Failed to create signup: {str(e)}'}), 500
+        return jsonify({'error': f'Failed to create signups: {str(e)}'}), 500
+
+    return jsonify({
+        'message': f'{len(accepted)} signups created',
+        'created': len(accepted),
+        'rejected': len(pairs) - len(accepted),
+        'results': results
+    }), 201
 
 
 @signups_bp.route('/<int:signup_id>', methods=['DELETE'])
 @jwt_required()
 def cancel_signup(signup_id):
     """Cancel a signup"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
     signup = Signup.query.get(signup_id)
 
     if not signup:
         return jsonify({'error': 'Signup not found'}), 404
 
     # Check permissions: own signup or coordinator
-    if signup.volunteer_id != user.volunteer_id and user.role != 'coordinator':
+    if signup.volunteer_id != current_volunteer_id() and not is_coordinator():
         return jsonify({'error': 'Insufficient permissions'}), 403
 
     try:
-        # Send cancellation notification
-        NotificationService.send_cancellation(signup.volunteer_id, signup.shift_id)
+        # Cancellation notice is committed with the deletion
+        NotificationService.queue_cancellation(signup.volunteer, signup.shift)
 
-        # Delete the signup
+        # Delete the signup and give back its seat and quota
+        if signup.status == 'confirmed':
+            CounterService.unconfirm_signup(signup.volunteer_id, signup.shift)
         db.session.delete(signup)
         db.session.commit()
 
@@ -160,15 +488,9 @@ def cancel_signup(signup_id):
 
 
 @signups_bp.route('/<int:signup_id>/status', methods=['PUT'])
-@jwt_required()
+@coordinator_required
 def update_signup_status(signup_id):
     """Update signup status (coordinator only)"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
-
     signup = Signup.query.get(signup_id)
 
     if not signup:
@@ -186,6 +508,16 @@ def update_signup_status(signup_id):
 
     try:
         old_status = signup.status
+
+        # Keep the shift and quota counters in step with the status change
+        if new_status == 'confirmed' and old_status != 'confirmed':
+            error_msg = CounterService.confirm_signup(signup.volunteer_id, signup.shift)
+            if error_msg:
+                db.session.rollback()
+                return jsonify({'error': error_msg}), 400
+        elif old_status == 'confirmed' and new_status != 'confirmed':
+            CounterService.unconfirm_signup(signup.volunteer_id, signup.shift)
+
         signup.status = new_status
 
         db.session.commit()
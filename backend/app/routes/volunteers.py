@@ -1,25 +1,32 @@
 """Volunteer routes"""
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
-from app.models import Volunteer, User
+from app.models import Volunteer
 from app.services.validation import ValidationService
+from app.routes.decorators import coordinator_required, current_volunteer_id, is_coordinator
+from app.routes.pagination import ListParams, page_response, paginate
+from app.serialization import VOLUNTEER_ROWS
 
 volunteers_bp = Blueprint('volunteers', __name__, url_prefix='/api/volunteers')
 
 
 @volunteers_bp.route('', methods=['GET'])
-@jwt_required()
+@coordinator_required
 def get_volunteers():
-    """Get list of all volunteers (coordinator only)"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
+    """Get a page of volunteers ordered by ID (coordinator only)"""
+    try:
+        params = ListParams.parse(VOLUNTEER_ROWS)
+        serializer = VOLUNTEER_ROWS.only(params.fields)
+        rows, cursor = paginate(
+            db.session.query(*serializer.select_columns()).select_from(Volunteer),
+            [(Volunteer.id, False)],
+            params
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    volunteers = Volunteer.query.all()
-    return jsonify([v.to_dict() for v in volunteers]), 200
+    return page_response(serializer.rows(rows), cursor)
 
 
 @volunteers_bp.route('/<int:volunteer_id>', methods=['GET'])
@@ -35,15 +42,9 @@ def get_volunteer(volunteer_id):
 
 
 @volunteers_bp.route('', methods=['POST'])
-@jwt_required()
+@coordinator_required
 def create_volunteer():
     """Create a new volunteer (coordinator only)"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'coordinator':
-        return jsonify({'error': 'Coordinator access required'}), 403
-
     data = request.get_json()
 
     if not data:
@@ -57,6 +58,10 @@ def create_volunteer():
     if not name or not phone:
         return jsonify({'error': 'Missing required fields: name, phone'}), 400
 
+    reliability_score = data.get('reliability_score', 100)
+    if not _is_score(reliability_score):
+        return jsonify({'error': 'reliability_score must be an integer'}), 400
+
     # Check if phone exists
     if Volunteer.query.filter_by(phone=phone).first():
         return jsonify({'error': 'Phone number already registered'}), 400
@@ -66,7 +71,7 @@ def create_volunteer():
             name=name,
             phone=phone,
             email=email,
-            reliability_score=data.get('reliability_score', 100)
+            reliability_score=reliability_score
         )
         db.session.add(volunteer)
         db.session.commit()
@@ -78,20 +83,22 @@ def create_volunteer():
         return jsonify({'error': f'Failed to create volunteer: {str(e)}'}), 500
 
 
+def _is_score(value):
+    """Reliability scores are integers; null would break the reliability list order"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
 @volunteers_bp.route('/<int:volunteer_id>', methods=['PUT'])
 @jwt_required()
 def update_volunteer(volunteer_id):
     """Update volunteer details"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
     volunteer = Volunteer.query.get(volunteer_id)
 
     if not volunteer:
         return jsonify({'error': 'Volunteer not found'}), 404
 
     # Check permissions: own volunteer or coordinator
-    if user.volunteer_id != volunteer_id and user.role != 'coordinator':
+    if current_volunteer_id() != volunteer_id and not is_coordinator():
         return jsonify({'error': 'Insufficient permissions'}), 403
 
     data = request.get_json()
@@ -99,12 +106,15 @@ def update_volunteer(volunteer_id):
     if not data:
         return jsonify({'error': 'No data provided'}), 400
 
+    if 'reliability_score' in data and not _is_score(data['reliability_score']):
+        return jsonify({'error': 'reliability_score must be an integer'}), 400
+
     try:
         if 'name' in data:
             volunteer.name = data['name']
         if 'email' in data:
             volunteer.email = data['email']
-        if 'reliability_score' in data and user.role == 'coordinator':
+        if 'reliability_score' in data and is_coordinator():
             volunteer.reliability_score = data['reliability_score']
 
         db.session.commit()
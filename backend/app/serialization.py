@@ -0,0 +1,195 @@
+"""
+JSON serialization for API responses
+
+List endpoints select plain columns and turn the result tuples into dicts
+with a RowSerializer, skipping ORM object construction and per-field
+isoformat() calls; dates and datetimes are encoded by the JSON encoder.
+orjson is used when installed, the standard library encoder otherwise.
+"""
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+from app.models import Shift, Signup, Volunteer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Rows encoded per chunk of a streamed array
+STREAM_CHUNK_ROWS = 1000
+
+
+def _default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+_stdlib_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def _dumps_stdlib(value):
+    return _stdlib_encoder.encode(value).encode()
+
+
+# Available encoders by name, each returning UTF-8 bytes
+ENCODERS = {'json': _dumps_stdlib}
+if orjson is not None:
+    ENCODERS['orjson'] = lambda value: orjson.dumps(
+        value, default=_default, option=orjson.OPT_NON_STR_KEYS
+    )
+
+ENCODER = 'orjson' if 'orjson' in ENCODERS else 'json'
+dumps = ENCODERS[ENCODER]
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes responses with the fastest encoder available"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+class RowSerializer:
+    """
+    Build response dicts straight from SELECT result tuples
+
+    Args:
+        columns: Ordered mapping of output field name to column expression
+        nested: Optional mapping of field name to RowSerializer for joined
+            objects; their columns follow this serializer's in the select
+    """
+
+    def __init__(self, columns, nested=None):
+        self.columns = dict(columns)
+        self.nested = dict(nested or {})
+        self.names = tuple(self.columns)
+        # Number of result values this serializer consumes
+        self.width = len(self.names) + sum(serializer.width for serializer in self.nested.values())
+
+    def only(self, fields=None):
+        """Serializer restricted to some top-level fields, None for all"""
+        if fields is None:
+            return self
+        return RowSerializer(
+            {name: column for name, column in self.columns.items() if name in fields},
+            self.nested
+        )
+
+    def expand(self, **nested):
+        """Serializer that also builds the given nested objects"""
+        return RowSerializer(self.columns, {**self.nested, **nested})
+
+    def select_columns(self):
+        """Columns to select, in the order rows() expects them"""
+        columns = list(self.columns.values())
+        for serializer in self.nested.values():
+            columns.extend(serializer.select_columns())
+        return columns
+
+    def row(self, values):
+        """Turn one result tuple into a dict; extra trailing values are ignored"""
+        data = dict(zip(self.names, values))
+        offset = len(self.names)
+        for name, serializer in self.nested.items():
+            width = serializer.width
+            chunk = values[offset:offset + width]
+            # An outer join without a match yields only NULLs
+            data[name] = serializer.row(chunk) if any(value is not None for value in chunk) else None
+            offset += width
+        return data
+
+    def rows(self, result):
+        """Turn result tuples into a list of dicts"""
+        return list(self.iter_rows(result))
+
+    def iter_rows(self, result):
+        """Lazily turn result tuples into dicts, e.g. for stream_array"""
+        if not self.nested:
+            names = self.names
+            return (dict(zip(names, values)) for values in result)
+        return (self.row(values) for values in result)
+
+
+VOLUNTEER_ROWS = RowSerializer({
+    'id': Volunteer.id,
+    'name': Volunteer.name,
+    'phone': Volunteer.phone,
+    'email': Volunteer.email,
+    'reliability_score': Volunteer.reliability_score,
+    'created_at': Volunteer.created_at,
+    'updated_at': Volunteer.updated_at
+})
+
+SHIFT_ROWS = RowSerializer({
+    'id': Shift.id,
+    'date': Shift.date,
+    'day_name': Shift.day_name,
+    'week_of_month': Shift.week_of_month,
+    'shift_type': Shift.shift_type,
+    'capacity': Shift.capacity,
+    'created_at': Shift.created_at,
+    'current_signups': Shift.confirmed_count
+})
+
+SIGNUP_ROWS = RowSerializer({
+    'id': Signup.id,
+    'volunteer_id': Signup.volunteer_id,
+    'shift_id': Signup.shift_id,
+    'status': Signup.status,
+    'created_at': Signup.created_at
+})
+
+
+def json_response(payload, status=200):
+    """
+    Response for a payload, or for bytes it was already encoded to
+
+    Pre-encoded bytes let caches keep the encoded body, so cache hits skip
+    serialization entirely.
+    """
+    body = payload if isinstance(payload, bytes) else dumps(payload)
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+
+def stream_array(items, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Streaming response encoding an iterable of dicts as one JSON array
+
+    Items are encoded and sent in chunks as they are produced, so memory
+    use does not grow with the array when `items` is itself lazy, e.g. a
+    query iterated with yield_per.
+    """
+    def generate():
+        yield b'['
+        chunk = []
+        first = True
+        for item in items:
+            chunk.append(dumps(item))
+            if len(chunk) == chunk_rows:
+                yield (b'' if first else b',') + b','.join(chunk)
+                first = False
+                chunk = []
+        if chunk:
+            yield (b'' if first else b',') + b','.join(chunk)
+        yield b']'
+
+    return current_app.response_class(
+        stream_with_context(generate()), mimetype='application/json'
+    )
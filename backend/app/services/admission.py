@@ -0,0 +1,114 @@
+"""Admission queue serializing signup writes per shift"""
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from app import db
+
+
+class AdmissionRejected(Exception):
+    """Raised when a signup write is not admitted (queue full or wait exceeded)"""
+
+
+class AdmissionQueue:
+    """
+    Funnel signup writes for the same shift through one worker thread.
+
+    Each shift gets a FIFO queue drained by a dedicated worker, so writes for
+    one shift are applied strictly in arrival order and never contend with
+    each other for locks. Writes for different shifts still run in parallel.
+    A caller waits at most `timeout` seconds for its turn; if the job has not
+    started by then it is withdrawn and the caller is told to retry, so
+    every request gets a definite accept or reject.
+    """
+
+    def __init__(self, app, max_pending=200, timeout=5.0, idle_timeout=30.0):
+        self.app = app
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._queues = {}
+        self._lock = threading.Lock()
+
+    def submit(self, shift_id, fn, *args):
+        """
+        Run fn(*args) on the shift's worker and return its result.
+
+        The caller's session transaction is ended first, so objects it loaded
+        are expired and must be reloaded after the call.
+
+        Args:
+            shift_id: ID of the shift the write targets
+            fn: Callable performing the write; runs inside an app context
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            AdmissionRejected: If the shift's queue is full or the job did not
+                start within the configured wait
+        """
+        future = Future()
+
+        # Return the caller's pooled connection before waiting, otherwise
+        # waiting requests can starve the workers of connections
+        db.session.rollback()
+
+        with self._lock:
+            jobs = self._queues.get(shift_id)
+            if jobs is None:
+                jobs = queue.Queue(maxsize=self.max_pending)
+                self._queues[shift_id] = jobs
+                threading.Thread(
+                    target=self._work,
+                    args=(shift_id, jobs),
+                    name=f'signup-admission-{shift_id}',
+                    daemon=True
+                ).start()
+
+            try:
+                jobs.put_nowait((future, fn, args))
+            except queue.Full:
+                raise AdmissionRejected('Too many pending signups for this shift, please retry')
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Withdraw the job if it has not started; otherwise wait for it
+            if future.cancel():
+                raise AdmissionRejected('Signup queue wait exceeded, please retry')
+            return future.result()
+
+    def _work(self, shift_id, jobs):
+        """Worker loop applying one shift's jobs in order"""
+        while True:
+            try:
+                future, fn, args = jobs.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if jobs.empty():
+                        del self._queues[shift_id]
+                        return
+                continue
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            with self.app.app_context():
+                try:
+                    future.set_result(fn(*args))
+                except Exception as e:
+                    db.session.rollback()
+                    future.set_exception(e)
+                finally:
+                    db.session.remove()
+
+
+def init_admission(app):
+    """Attach a signup admission queue to the app when enabled in config"""
+    if app.config.get('SIGNUP_ADMISSION_QUEUE'):
+        app.extensions['signup_admission'] = AdmissionQueue(
+            app,
+            max_pending=app.config['SIGNUP_ADMISSION_MAX_PENDING'],
+            timeout=app.config['SIGNUP_ADMISSION_TIMEOUT']
+        )
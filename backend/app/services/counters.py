@@ -0,0 +1,314 @@
+"""Counter service keeping denormalized signup counts in sync"""
+from app import db
+from app.models import Shift, Signup, VolunteerRuleCount
+from app.services.rules import get_rule_set
+from app.services.sql import insert_ignore
+from sqlalchemy import case, delete, func, select, tuple_, update
+from sqlalchemy.orm import aliased
+
+
+def quota_deltas(shift, count=1):
+    """Return the counter vector increments `count` signups for a shift cause"""
+    return get_rule_set().deltas(shift, count)
+
+
+def _decrement(column, count):
+    return case((column > count, column - count), else_=0)
+
+
+def _by_key(rule_set, deltas):
+    """Map rule keys to their non-zero deltas"""
+    return {
+        key: delta for key, delta in zip(rule_set.keys, deltas) if delta
+    }
+
+
+class CounterService:
+    """
+    Service maintaining denormalized signup counters inside signup transactions
+
+    Shift.confirmed_count tracks confirmed signups per shift and the
+    volunteer_rule_counts ledger tracks, per volunteer and scheduling rule,
+    the confirmed signups matching that rule.
+    """
+
+    @staticmethod
+    def reserve_seats(shift_id, count=1):
+        """
+        Claim seats on a shift for new confirmed signups.
+
+        Uses a conditional UPDATE so the capacity check and the increment
+        happen in one statement; concurrent requests can never push a shift
+        past its capacity. Must run in the same transaction as the signup
+        change it accounts for.
+
+        Args:
+            shift_id: ID of the shift
+            count: Number of seats to claim
+
+        Returns:
+            bool: True if the seats were claimed, False if the shift is full
+        """
+        result = db.session.execute(
+            update(Shift).where(
+                Shift.id == shift_id,
+                Shift.confirmed_count + count <= Shift.capacity
+            ).values(
+                confirmed_count=Shift.confirmed_count + count
+            ).execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def release_seats(shift_id, count=1):
+        """
+        Give back seats when confirmed signups are cancelled or removed.
+
+        Args:
+            shift_id: ID of the shift
+            count: Number of seats to release
+        """
+        db.session.execute(
+            update(Shift).where(
+                Shift.id == shift_id
+            ).values(
+                confirmed_count=_decrement(Shift.confirmed_count, count)
+            ).execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def claim_quota(volunteer_id, deltas):
+        """
+        Add confirmed signups to a volunteer's rule counters.
+
+        Like reserve_seats this is a conditional UPDATE, so two concurrent
+        signups by the same volunteer cannot both slip under a limit. Every
+        affected rule row is updated by one statement, and none of them is
+        when any would exceed its limit. A claim racing another transaction
+        may still be applied in part, so on failure the caller must roll
+        back.
+
+        Args:
+            volunteer_id: ID of the volunteer
+            deltas: Counter vector increments, see quota_deltas
+
+        Returns:
+            bool: True if the quota was claimed, False if a limit would be exceeded
+        """
+        rule_set = get_rule_set()
+        by_key = _by_key(rule_set, deltas)
+        if not by_key:
+            return True
+
+        db.session.execute(insert_ignore(VolunteerRuleCount), [
+            {'volunteer_id': volunteer_id, 'rule_key': key} for key in by_key
+        ])
+        delta = case(by_key, value=VolunteerRuleCount.rule_key, else_=0)
+        # Nothing is incremented while any affected rule is at its limit
+        full = aliased(VolunteerRuleCount)
+        blocked = select(full.rule_key).where(
+            full.volunteer_id == volunteer_id,
+            full.rule_key.in_(by_key),
+            full.count + case(by_key, value=full.rule_key, else_=0) > rule_set.limit_case(full.rule_key)
+        ).exists()
+        result = db.session.execute(
+            update(VolunteerRuleCount).where(
+                VolunteerRuleCount.volunteer_id == volunteer_id,
+                VolunteerRuleCount.rule_key.in_(by_key),
+                VolunteerRuleCount.count + delta <= rule_set.limit_case(VolunteerRuleCount.rule_key),
+                ~blocked
+            ).values(
+                count=VolunteerRuleCount.count + delta
+            ).execution_options(synchronize_session=False)
+        )
+        return result.rowcount == len(by_key)
+
+    @staticmethod
+    def release_quota(volunteer_id, deltas):
+        """
+        Remove confirmed signups from a volunteer's rule counters.
+
+        Args:
+            volunteer_id: ID of the volunteer
+            deltas: Counter vector decrements, see quota_deltas
+        """
+        by_key = _by_key(get_rule_set(), deltas)
+        if not by_key:
+            return
+
+        db.session.execute(
+            update(VolunteerRuleCount).where(
+                VolunteerRuleCount.volunteer_id == volunteer_id,
+                VolunteerRuleCount.rule_key.in_(by_key)
+            ).values(
+                count=_decrement(
+                    VolunteerRuleCount.count,
+                    case(by_key, value=VolunteerRuleCount.rule_key, else_=0)
+                )
+            ).execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def release_quota_for_shifts(shift_ids):
+        """
+        Remove the confirmed signups of many shifts from the rule counters.
+
+        One UPDATE per scheduling rule subtracts, for every volunteer signed
+        up to the shifts, their matching confirmed signups there. Call it
+        before the signups are deleted.
+
+        Args:
+            shift_ids: Select of the IDs of the shifts being removed
+        """
+        affected = select(Signup.volunteer_id).where(
+            Signup.shift_id.in_(shift_ids),
+            Signup.status == 'confirmed'
+        )
+        for rule in get_rule_set().rules:
+            removed = select(func.count(Signup.id)).join(
+                Shift, Signup.shift_id == Shift.id
+            ).where(
+                Signup.volunteer_id == VolunteerRuleCount.volunteer_id,
+                Signup.shift_id.in_(shift_ids),
+                Signup.status == 'confirmed',
+                rule.condition(Shift)
+            ).scalar_subquery()
+            db.session.execute(
+                update(VolunteerRuleCount).where(
+                    VolunteerRuleCount.rule_key == rule.key,
+                    VolunteerRuleCount.volunteer_id.in_(affected)
+                ).values(
+                    count=_decrement(VolunteerRuleCount.count, removed)
+                ).execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def confirm_signup(volunteer_id, shift):
+        """
+        Account for one new confirmed signup on both counters.
+
+        Returns:
+            str or None: Error message if the shift or the volunteer's quota
+                is exhausted, None if both were claimed
+        """
+        if not CounterService.reserve_seats(shift.id):
+            return f"Shift is at full capacity ({shift.capacity})"
+
+        if not CounterService.claim_quota(volunteer_id, quota_deltas(shift)):
+            # Another signup of the volunteer got in first; name the rule it filled up
+            rule_set = get_rule_set()
+            counts = rule_set.vector(db.session.query(
+                VolunteerRuleCount.rule_key, VolunteerRuleCount.count
+            ).filter(VolunteerRuleCount.volunteer_id == volunteer_id))
+            return rule_set.check(shift, counts) or "Signup limits reached"
+
+        return None
+
+    @staticmethod
+    def unconfirm_signup(volunteer_id, shift):
+        """Account for one confirmed signup being cancelled or removed"""
+        CounterService.release_seats(shift.id)
+        CounterService.release_quota(volunteer_id, quota_deltas(shift))
+
+    @staticmethod
+    def rebuild_shift_counts(check_only=False):
+        """
+        Recompute every shift's confirmed_count from the signups table.
+
+        Args:
+            check_only: Report drift without correcting it
+
+        Returns:
+            int: Number of shifts whose counter was wrong
+        """
+        actual = select(func.count(Signup.id)).where(
+            Signup.shift_id == Shift.id,
+            Signup.status == 'confirmed'
+        ).scalar_subquery()
+
+        if check_only:
+            return db.session.query(func.count(Shift.id)).filter(
+                Shift.confirmed_count != actual
+            ).scalar()
+
+        result = db.session.execute(
+            update(Shift).where(
+                Shift.confirmed_count != actual
+            ).values(
+                confirmed_count=actual
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def rebuild_volunteer_quotas(check_only=False):
+        """
+        Recompute the rule counter ledger from the signups table.
+
+        The scheduling rules are compiled into one aggregate column each, so
+        every volunteer's counter vector comes from a single grouped query.
+        It is compared with the ledger and only rows that differ are written;
+        rows of rules that no longer exist are removed.
+
+        Args:
+            check_only: Report drift without correcting it
+
+        Returns:
+            int: Number of volunteers whose ledger rows were wrong or missing
+        """
+        rule_set = get_rule_set()
+        actual = {
+            volunteer_id: dict(zip(rule_set.keys, (int(count) for count in counts)))
+            for volunteer_id, *counts in db.session.query(
+                Signup.volunteer_id,
+                *rule_set.count_columns(Shift)
+            ).join(
+                Shift, Signup.shift_id == Shift.id
+            ).filter(
+                Signup.status == 'confirmed'
+            ).group_by(Signup.volunteer_id)
+        } if rule_set.keys else {}
+
+        ledger = {}
+        stale = []
+        for volunteer_id, rule_key, count in db.session.query(
+            VolunteerRuleCount.volunteer_id,
+            VolunteerRuleCount.rule_key,
+            VolunteerRuleCount.count
+        ):
+            if rule_key in rule_set.keys:
+                ledger.setdefault(volunteer_id, {})[rule_key] = count
+            else:
+                stale.append((volunteer_id, rule_key))
+
+        empty = dict.fromkeys(rule_set.keys, 0)
+        inserts = []
+        updates = []
+        drifted = set()
+        for volunteer_id in set(actual) | set(ledger):
+            expected = actual.get(volunteer_id, empty)
+            current = ledger.get(volunteer_id, {})
+            for key, count in expected.items():
+                if key not in current:
+                    if count:
+                        inserts.append({'volunteer_id': volunteer_id, 'rule_key': key, 'count': count})
+                        drifted.add(volunteer_id)
+                elif current[key] != count:
+                    updates.append({'volunteer_id': volunteer_id, 'rule_key': key, 'count': count})
+                    drifted.add(volunteer_id)
+        drifted.update(volunteer_id for volunteer_id, _ in stale)
+
+        if check_only:
+            return len(drifted)
+
+        if stale:
+            db.session.execute(delete(VolunteerRuleCount).where(
+                tuple_(VolunteerRuleCount.volunteer_id, VolunteerRuleCount.rule_key).in_(stale)
+            ))
+        if inserts:
+            db.session.execute(insert_ignore(VolunteerRuleCount), inserts)
+        if updates:
+            db.session.execute(update(VolunteerRuleCount), updates)
+        db.session.commit()
+        return len(drifted)
@@ -0,0 +1,229 @@
+"""In-process request, SQL and notification metrics in Prometheus text format"""
+import bisect
+import os
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+
+from flask import current_app, request
+from sqlalchemy import event
+
+from app import db
+
+# Upper bounds of the histogram buckets, in seconds and in statements
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Statements and DB time of the request handled by the current thread
+_request_state = ContextVar('request_metrics', default=None)
+
+
+class RequestState:
+    """Running totals of one request"""
+
+    __slots__ = ('started', 'statements', 'db_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+class Counter:
+    """Monotonic counter per label set; callers hold the registry lock"""
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.series = {}
+
+    def inc(self, label_values, amount=1):
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self, lines):
+        lines.append(f'# HELP {self.name} {self.description}')
+        lines.append(f'# TYPE {self.name} counter')
+        for label_values, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{_labels(self.labels, label_values)} {_number(value)}')
+
+
+class Histogram:
+    """Histogram with fixed buckets per label set; callers hold the registry lock"""
+
+    def __init__(self, name, description, labels, buckets):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            # Per-bucket (not cumulative) counts, the last one for +Inf, then the sum
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self, lines):
+        lines.append(f'# HELP {self.name} {self.description}')
+        lines.append(f'# TYPE {self.name} histogram')
+        bounds = [_number(bound) for bound in self.buckets] + ['+Inf']
+        for label_values, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _labels(self.labels + ('le',), label_values + (bound,))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {_number(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f'{{{pairs}}}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    Aggregates of this process, rendered in Prometheus text format
+
+    Recording a value is a dict lookup and a few additions under one lock,
+    so hot paths stay cheap. Each process (e.g. of a pre-forking server)
+    keeps its own aggregates, which start empty after a fork; Prometheus
+    must scrape every process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Time to handle a request, until its body is sent',
+            ('method', 'endpoint', 'status'), DURATION_BUCKETS
+        )
+        self.request_statements = Histogram(
+            'http_request_sql_statements', 'SQL statements executed per request',
+            ('endpoint',), STATEMENT_BUCKETS
+        )
+        self.request_db = Histogram(
+            'http_request_db_seconds', 'Time spent executing SQL per request',
+            ('endpoint',), DURATION_BUCKETS
+        )
+        self.statements = Counter('db_statements_total', 'SQL statements executed, including background work')
+        self.db_seconds = Counter('db_seconds_total', 'Time spent executing SQL, including background work')
+        self.notification_duration = Histogram(
+            'notification_send_seconds', 'Time to hand one notification to the sender, by outcome',
+            ('sender', 'outcome'), DURATION_BUCKETS
+        )
+        self._collectors = (
+            self.request_duration, self.request_statements, self.request_db,
+            self.statements, self.db_seconds, self.notification_duration
+        )
+        _registries.add(self)
+
+    def finish_request(self, state, method, endpoint, status):
+        """Record a finished request"""
+        elapsed = time.perf_counter() - state.started
+        with self._lock:
+            self.request_duration.observe((method, endpoint, str(status)), elapsed)
+            self.request_statements.observe((endpoint,), state.statements)
+            self.request_db.observe((endpoint,), state.db_seconds)
+
+    def observe_statement(self, elapsed):
+        """Record one SQL statement, adding it to the current request if any"""
+        state = _request_state.get()
+        if state is not None:
+            state.statements += 1
+            state.db_seconds += elapsed
+        with self._lock:
+            self.statements.inc((), 1)
+            self.db_seconds.inc((), elapsed)
+
+    def observe_notification(self, sender, outcome, elapsed):
+        """Record one notification send"""
+        with self._lock:
+            self.notification_duration.observe((sender, outcome), elapsed)
+
+    def render(self):
+        """All metrics in Prometheus text format"""
+        lines = []
+        with self._lock:
+            for collector in self._collectors:
+                collector.render(lines)
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Drop every recorded value"""
+        self._lock = threading.Lock()
+        for collector in self._collectors:
+            collector.series = {}
+
+
+_registries = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    # A child must not report what its parent recorded before forking
+    for metrics in list(_registries):
+        metrics.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def init_metrics(app):
+    """Record request, SQL and notification metrics when enabled in config"""
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    metrics = Metrics()
+    app.extensions['metrics'] = metrics
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics.observe_statement(time.perf_counter() - context._metrics_started)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
+
+    @app.before_request
+    def start_request_metrics():
+        _request_state.set(RequestState())
+
+    @app.after_request
+    def finish_request_metrics(response):
+        state = _request_state.get()
+        if state is not None:
+            rule = request.url_rule
+            # Unmatched paths share one label so clients cannot grow the series
+            endpoint = rule.rule if rule is not None else 'unmatched'
+            method = request.method
+            status = response.status_code
+            # Streamed bodies run their queries while being sent, so finish on close
+            response.call_on_close(lambda: metrics.finish_request(state, method, endpoint, status))
+        return response
+
+
+def get_metrics():
+    """Return the current app's metrics, or None when disabled"""
+    return current_app.extensions.get('metrics')
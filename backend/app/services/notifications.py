@@ -1,67 +1,64 @@
 """Notification service for WhatsApp/SMS communications"""
-import os
-from app.models import Volunteer, Shift
+from app.services.outbox import OutboxService, get_dispatcher
 
 
 class NotificationService:
-    """Service for sending notifications via Twilio WhatsApp/SMS"""
+    """
+    Service for notifying volunteers via Twilio WhatsApp/SMS
+
+    Signup-related notifications are written to the outbox in the caller's
+    transaction and delivered by background workers once it commits.
+    """
 
     @staticmethod
-    def send_confirmation(volunteer_id, shift_id):
+    def queue_confirmation(volunteer, shift):
         """
-        Send signup confirmation to volunteer via WhatsApp
+        Queue signup confirmation to volunteer via WhatsApp
 
         Args:
-            volunteer_id: ID of the volunteer
-            shift_id: ID of the shift
+            volunteer: Volunteer who signed up
+            shift: Shift signed up for
         """
-        volunteer = Volunteer.query.get(volunteer_id)
-        shift = Shift.query.get(shift_id)
-
-        if not volunteer or not shift:
-            return False
-
-        message = f"✓ Confirmed! You're signed up for {shift.shift_type} shift on {shift.date.strftime('%A, %B %d')}."
-
-        return NotificationService._send_whatsapp(volunteer.phone, message)
+        OutboxService.enqueue(
+            volunteer.phone,
+            NotificationService.confirmation_message(shift),
+            kind='confirmation'
+        )
 
     @staticmethod
-    def send_reminder(volunteer_id, shift_id):
+    def queue_cancellation(volunteer, shift):
         """
-        Send shift reminder to volunteer via WhatsApp
+        Queue cancellation notification to volunteer
 
         Args:
-            volunteer_id: ID of the volunteer
-            shift_id: ID of the shift
+            volunteer: Volunteer whose signup was cancelled
+            shift: Shift of the cancelled signup
         """
-        volunteer = Volunteer.query.get(volunteer_id)
-        shift = Shift.query.get(shift_id)
-
-        if not volunteer or not shift:
-            return False
-
-        message = f"📢 Reminder: You have a {shift.shift_type} shift tomorrow ({shift.date.strftime('%B %d')}). See you there!"
-
-        return NotificationService._send_whatsapp(volunteer.phone, message)
+        OutboxService.enqueue(
+            volunteer.phone,
+            NotificationService.cancellation_message(shift),
+            kind='cancellation'
+        )
 
     @staticmethod
-    def send_cancellation(volunteer_id, shift_id):
-        """
-        Send cancellation notification to volunteer
-
-        Args:
-            volunteer_id: ID of the volunteer
-            shift_id: ID of the shift
-        """
-        volunteer = Volunteer.query.get(volunteer_id)
-        shift = Shift.query.get(shift_id)
+    def confirmation_message(shift):
+        """Build the signup confirmation text for a shift"""
+        return f"✓ Confirmed! You're signed up for {shift.shift_type} shift on {shift.date.strftime('%A, %B %d')}."
 
-        if not volunteer or not shift:
-            return False
+    @staticmethod
+    def reminder_message(shift):
+        """Build the day-before reminder text for a shift"""
+        return f"📢 Reminder: You have a {shift.shift_type} shift tomorrow ({shift.date.strftime('%B %d')}). See you there!"
 
-        message = f"❌ Your signup for {shift.shift_type} shift on {shift.date.strftime('%A, %B %d')} has been cancelled."
+    @staticmethod
+    def cancellation_message(shift):
+        """Build the signup cancellation text for a shift"""
+        return f"❌ Your signup for {shift.shift_type} shift on {shift.date.strftime('%A, %B %d')} has been cancelled."
 
-        return NotificationService._send_whatsapp(volunteer.phone, message)
+    @staticmethod
+    def shift_cancelled_message(shift):
+        """Build the notice sent when a coordinator cancels a whole shift"""
+        return f"❌ The {shift.shift_type} shift on {shift.date.strftime('%A, %B %d')} has been cancelled. Your signup is removed."
 
     @staticmethod
     def send_custom_message(phone_number, message):
@@ -80,7 +77,10 @@ class NotificationService:
     @staticmethod
     def _send_whatsapp(phone_number, message):
         """
-        Internal method to send WhatsApp message via Twilio
+        Internal method to send a WhatsApp message right away
+
+        Uses the sender configured for the outbox workers (Twilio, or console
+        output when Twilio is not configured).
 
         Args:
             phone_number: Recipient phone number
@@ -89,26 +89,8 @@ class NotificationService:
         Returns:
             bool: True if successful, False otherwise
         """
-        # Check if Twilio credentials are configured
-        account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-        auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-        whatsapp_number = os.getenv('TWILIO_WHATSAPP_NUMBER')
-
-        if not all([account_sid, auth_token, whatsapp_number]):
-            # In development, just log the message
-            print(f"[NOTIFICATION] To {phone_number}: {message}")
-            return True
-
         try:
-            from twilio.rest import Client
-
-            client = Client(account_sid, auth_token)
-
-            client.messages.create(
-                from_=whatsapp_number,
-                body=message,
-                to=f'whatsapp:{phone_number}'
-            )
+            get_dispatcher().send(phone_number, message)
             return True
         except Exception as e:
             print(f"Error sending WhatsApp message: {str(e)}")
@@ -0,0 +1,458 @@
+"""Notification outbox: transactional enqueue and background delivery"""
+import os
+import threading
+import time
+import uuid
+import weakref
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, insert, literal, or_, update
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import NotificationSendBudget, OutboxMessage
+from app.services.senders import build_sender
+from app.services.sql import insert_ignore
+
+
+class RateLimiter:
+    """
+    Send budget shared by every process delivering from the same database
+
+    The earliest time the next message may go out is kept in a single
+    NotificationSendBudget row. A worker reserves the sends of a whole
+    claimed batch with one compare-and-swap UPDATE, moving that time
+    count/rate seconds on, and then spaces its sends 1/rate seconds apart.
+    The workers of all web and worker processes together thus stay under
+    `rate` messages per second, as the provider's account limit requires,
+    at one round trip per batch rather than per message.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+
+    def acquire(self, count=1):
+        """
+        Reserve `count` consecutive sends and block until the first may go out
+
+        Needs an app context.
+
+        Args:
+            count: Number of messages about to be sent
+
+        Returns:
+            float: Seconds to leave between the reserved sends, 0 when rate is 0
+        """
+        if not self.rate:
+            return 0
+        interval = int(1_000_000 / self.rate)
+        while True:
+            now = int(time.time() * 1_000_000)
+            current = db.session.query(NotificationSendBudget.next_send_at).filter_by(id=1).scalar()
+            if current is None:
+                db.session.execute(insert_ignore(NotificationSendBudget), [{'id': 1, 'next_send_at': 0}])
+                db.session.commit()
+                continue
+
+            send_at = max(current, now)
+            # Loses to any process that reserved the same time first; read again then
+            reserved = db.session.execute(
+                update(NotificationSendBudget).where(
+                    NotificationSendBudget.id == 1,
+                    NotificationSendBudget.next_send_at == current
+                ).values(next_send_at=send_at + interval * count).execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            if reserved:
+                break
+
+        wait = send_at / 1_000_000 - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        return interval / 1_000_000
+
+
+# Message kinds claimed ahead of everything else
+PRIORITY_KINDS = ('confirmation', 'cancellation')
+
+
+class OutboxService:
+    """Service writing notifications to the outbox"""
+
+    @staticmethod
+    def enqueue(phone_number, message, kind='custom'):
+        """
+        Add a message to the outbox in the current transaction.
+
+        Nothing is sent unless the caller commits; delivery then happens in
+        the background.
+
+        Args:
+            phone_number: Recipient phone number
+            message: Message content
+            kind: Message category, e.g. 'confirmation'
+        """
+        db.session.add(OutboxMessage(phone=phone_number, body=message, kind=kind))
+        db.session.info['outbox_pending'] = True
+
+    @staticmethod
+    def enqueue_many(messages, kind='custom', job_id=None):
+        """
+        Add many messages to the outbox with one bulk INSERT.
+
+        Args:
+            messages: Iterable of (phone_number, message) tuples
+            kind: Message category shared by all messages
+            job_id: Optional NotificationJob the messages belong to
+        """
+        rows = [
+            {'phone': phone_number, 'body': message, 'kind': kind, 'job_id': job_id}
+            for phone_number, message in messages
+        ]
+        if rows:
+            db.session.execute(insert(OutboxMessage), rows)
+            db.session.info['outbox_pending'] = True
+
+    @staticmethod
+    def enqueue_select(query, kind='custom'):
+        """
+        Add the messages a SELECT produces with one INSERT ... SELECT.
+
+        The rows never pass through Python, so memory does not grow with
+        the number of messages.
+
+        Args:
+            query: Select of two columns, phone number and message
+            kind: Message category shared by all messages
+
+        Returns:
+            int: Number of messages queued
+        """
+        now = datetime.utcnow()
+        query = query.add_columns(
+            literal(kind), literal('pending'), literal(0), literal(now), literal(now)
+        )
+        result = db.session.execute(insert(OutboxMessage).from_select(
+            ['phone', 'body', 'kind', 'status', 'attempts', 'next_attempt_at', 'created_at'],
+            query
+        ))
+        if result.rowcount:
+            db.session.info['outbox_pending'] = True
+        return result.rowcount
+
+    @staticmethod
+    def enqueue_once(messages, kind='custom'):
+        """
+        Add messages that must be queued at most once.
+
+        Messages whose dedupe key is already in the outbox, whatever their
+        status, are skipped, so re-running a job never repeats a message.
+
+        Args:
+            messages: Iterable of (dedupe_key, phone_number, message) tuples
+            kind: Message category shared by all messages
+
+        Returns:
+            int: Number of messages newly queued
+        """
+        messages = list(messages)
+        if not messages:
+            return 0
+
+        existing = {
+            key for key, in db.session.query(OutboxMessage.dedupe_key).filter(
+                OutboxMessage.dedupe_key.in_([key for key, _, _ in messages])
+            )
+        }
+        rows = [
+            {'dedupe_key': key, 'phone': phone_number, 'body': message, 'kind': kind}
+            for key, phone_number, message in messages
+            if key not in existing
+        ]
+        if rows:
+            # Concurrent runs may still race; the unique key settles them
+            db.session.execute(insert_ignore(OutboxMessage), rows)
+            db.session.info['outbox_pending'] = True
+        return len(rows)
+
+
+class OutboxDispatcher:
+    """
+    Pool of worker threads draining the outbox
+
+    Workers claim due messages by stamping them with a claim token, so
+    several processes can drain the same outbox without sending a message
+    twice. A claimed message that is not finished within `lease_seconds`
+    (e.g. because its process died) becomes due again. Failed sends are
+    retried with exponential backoff; after `max_attempts` the message is
+    dead-lettered with status 'dead'. Confirmations and cancellations are
+    claimed ahead of other messages.
+    """
+
+    def __init__(self, app, sender=None):
+        config = app.config
+        self.app = app
+        self.sender = sender or build_sender(config)
+        self.workers = config['NOTIFICATION_WORKERS']
+        self.batch_size = config['NOTIFICATION_BATCH_SIZE']
+        self.max_attempts = config['NOTIFICATION_MAX_ATTEMPTS']
+        self.backoff_seconds = config['NOTIFICATION_BACKOFF_SECONDS']
+        self.poll_interval = config['NOTIFICATION_POLL_INTERVAL']
+        self.lease_seconds = config['NOTIFICATION_LEASE_SECONDS']
+        self.rate_limiter = RateLimiter(config['NOTIFICATION_RATE_LIMIT'])
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        _dispatchers.add(self)
+
+    def start(self):
+        """Start the worker threads"""
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run,
+                name=f'outbox-worker-{index}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Ask workers to stop after their current message"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self):
+        """Tell idle workers that new messages were committed"""
+        self._wakeup.set()
+
+    def drain(self):
+        """
+        Deliver due messages on the calling thread until none are left.
+
+        Must run inside an app context.
+
+        Returns:
+            int: Number of messages processed
+        """
+        processed = 0
+        while True:
+            batch = self._claim_batch()
+            if not batch:
+                return processed
+            self._deliver_batch(batch)
+            processed += len(batch)
+
+    def drain_concurrently(self, workers=None):
+        """
+        Deliver all due messages using a temporary pool of threads.
+
+        Each thread claims its own batches, so messages are sent in parallel
+        while the shared rate limit still applies. Returns once the outbox
+        has no due messages left.
+
+        Args:
+            workers: Number of threads; defaults to NOTIFICATION_WORKERS
+
+        Returns:
+            int: Number of messages processed
+        """
+        totals = []
+
+        def work():
+            with self.app.app_context():
+                try:
+                    totals.append(self.drain())
+                finally:
+                    db.session.remove()
+
+        threads = [
+            threading.Thread(target=work, name=f'outbox-drain-{index}')
+            for index in range(max(workers or self.workers, 1))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(totals)
+
+    def _run(self):
+        """Worker loop"""
+        while not self._stopping.is_set():
+            with self.app.app_context():
+                try:
+                    processed = self.drain()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Outbox worker error: {str(e)}")
+                    processed = 0
+                finally:
+                    db.session.remove()
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim_batch(self):
+        """Claim up to batch_size due messages for this worker"""
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        due = or_(
+            OutboxMessage.status == 'pending',
+            OutboxMessage.status == 'sending'
+        ) & (OutboxMessage.next_attempt_at <= now)
+
+        # Replies to a volunteer's own signup go first, so a large broadcast
+        # already in the outbox cannot hold them back
+        ids = []
+        for kinds in (OutboxMessage.kind.in_(PRIORITY_KINDS), OutboxMessage.kind.notin_(PRIORITY_KINDS)):
+            ids.extend(
+                message_id for message_id, in db.session.query(OutboxMessage.id).filter(due, kinds).order_by(
+                    OutboxMessage.next_attempt_at, OutboxMessage.id
+                ).limit(self.batch_size - len(ids))
+            )
+            if len(ids) == self.batch_size:
+                break
+        if not ids:
+            db.session.rollback()
+            return []
+
+        # The due condition is re-checked so concurrent claimers cannot both win
+        db.session.execute(
+            update(OutboxMessage).where(
+                OutboxMessage.id.in_(ids), due
+            ).values(
+                status='sending',
+                claim_token=token,
+                next_attempt_at=now + timedelta(seconds=self.lease_seconds)
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        # Sent in the order they were picked, priority kinds first
+        position = {message_id: index for index, message_id in enumerate(ids)}
+        claimed = sorted(
+            (
+                (message.id, message.phone, message.body, message.attempts, token)
+                for message in OutboxMessage.query.filter_by(claim_token=token, status='sending')
+            ),
+            key=lambda message: position[message[0]]
+        )
+        db.session.commit()
+        return claimed
+
+    def send(self, phone_number, message):
+        """Send one message through the sender, timing it when metrics are enabled"""
+        metrics = self.app.extensions.get('metrics')
+        if metrics is None:
+            self.sender.send(phone_number, message)
+            return
+
+        started = time.perf_counter()
+        outcome = 'failed'
+        try:
+            self.sender.send(phone_number, message)
+            outcome = 'sent'
+        finally:
+            metrics.observe_notification(type(self.sender).__name__, outcome, time.perf_counter() - started)
+
+    def _deliver_batch(self, batch):
+        """Send claimed messages one by one within the shared rate limit"""
+        interval = self.rate_limiter.acquire(len(batch))
+        started = time.monotonic()
+        for index, message in enumerate(batch):
+            wait = started + index * interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._deliver(message)
+
+    def _deliver(self, message):
+        """Send one claimed message and record the outcome"""
+        message_id, phone_number, body, attempts, token = message
+
+        try:
+            self.send(phone_number, body)
+        except Exception as e:
+            attempts += 1
+            if attempts >= self.max_attempts:
+                values = {'status': 'dead'}
+            else:
+                delay = self.backoff_seconds * (2 ** (attempts - 1))
+                values = {
+                    'status': 'pending',
+                    'next_attempt_at': datetime.utcnow() + timedelta(seconds=delay)
+                }
+            values.update(attempts=attempts, last_error=str(e)[:1000], claim_token=None)
+        else:
+            values = {
+                'status': 'sent',
+                'attempts': attempts + 1,
+                'sent_at': datetime.utcnow(),
+                'claim_token': None
+            }
+
+        db.session.execute(
+            update(OutboxMessage).where(
+                OutboxMessage.id == message_id,
+                OutboxMessage.claim_token == token
+            ).values(**values).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_dispatcher(session):
+    if session.info.pop('outbox_pending', False) and has_app_context():
+        dispatcher = current_app.extensions.get('outbox_dispatcher')
+        if dispatcher:
+            dispatcher.wake()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_pending(session):
+    session.info.pop('outbox_pending', None)
+
+
+_dispatchers = weakref.WeakSet()
+
+
+def _restart_after_fork():
+    # Threads do not survive fork; give each child process its own workers
+    for dispatcher in list(_dispatchers):
+        running = bool(dispatcher._threads) and not dispatcher._stopping.is_set()
+        dispatcher._wakeup = threading.Event()
+        dispatcher._stopping = threading.Event()
+        dispatcher._threads = []
+        if running:
+            dispatcher.start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def init_outbox(app):
+    """
+    Create the outbox dispatcher, starting its workers if NOTIFICATION_START_WORKERS
+
+    The flag is off by default, so CLI commands and test apps never start
+    delivery threads; servers set it or call start_workers.
+    """
+    app.extensions['outbox_dispatcher'] = OutboxDispatcher(app)
+    if app.config['NOTIFICATION_START_WORKERS']:
+        start_workers(app)
+
+
+def start_workers(app):
+    """Start the app's delivery workers unless they run already or NOTIFICATION_WORKERS is 0"""
+    dispatcher = app.extensions['outbox_dispatcher']
+    if dispatcher.workers and not dispatcher._threads:
+        dispatcher.start()
+
+
+def get_dispatcher():
+    """Return the current app's outbox dispatcher"""
+    return current_app.extensions['outbox_dispatcher']
@@ -0,0 +1,221 @@
+"""Slow-query log with the query plans of offending statements"""
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from app import db
+
+# Longest parameter value kept in a log entry
+MAX_PARAMETER_LENGTH = 200
+
+# Statements whose plan can be captured
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+# Savepoint the plan query runs in
+PLAN_SAVEPOINT = 'slow_query_plan'
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_NAMED_PARAMETER = re.compile(r'%\(\w+\)s')
+# Runs of placeholders, e.g. an expanded IN list
+_PLACEHOLDERS = re.compile(r'\?(?:\s*,\s*\?)+')
+
+
+def normalize_sql(statement):
+    """
+    Reduce a statement to its shape
+
+    Literals and placeholders of every paramstyle become '?', runs of
+    placeholders (expanded IN lists, multi-row VALUES) collapse to one '?...'
+    and whitespace is squeezed, so statements differing only in values
+    share one shape.
+    """
+    shape = _STRING.sub('?', statement)
+    shape = _NAMED_PARAMETER.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    shape = _PLACEHOLDERS.sub('?...', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def _parameters(parameters, executemany):
+    if executemany:
+        return f'<{len(parameters)} parameter sets>'
+    if isinstance(parameters, dict):
+        return {key: _short(value) for key, value in parameters.items()}
+    return [_short(value) for value in parameters or ()]
+
+
+def _short(value):
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = str(value)
+    return text if len(text) <= MAX_PARAMETER_LENGTH else text[:MAX_PARAMETER_LENGTH] + '...'
+
+
+def _origin():
+    # Endpoint of the request being handled, or the thread for CLI and background work
+    if has_request_context():
+        rule = request.url_rule
+        return f'{request.method} {rule.rule if rule is not None else request.path}'
+    return threading.current_thread().name
+
+
+class QueryProfiler:
+    """
+    Log statements slower than a threshold, with their plan
+
+    Each slow statement is appended as one JSON line to `path` and printed.
+    The first time a statement shape is slow in this process, its plan is
+    captured with EXPLAIN (PostgreSQL) or EXPLAIN QUERY PLAN (SQLite), run
+    on the same connection and parameters without executing the statement,
+    inside a savepoint; a failed EXPLAIN is logged in place of the plan.
+    """
+
+    def __init__(self, path, threshold_ms=100.0, explain=True):
+        self.path = path
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self._explained = set()
+        self._lock = threading.Lock()
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._profiler_started
+        if elapsed < self.threshold:
+            return
+
+        shape = normalize_sql(statement)
+        plan = None
+        if self.explain and not executemany:
+            with self._lock:
+                first = shape not in self._explained
+                self._explained.add(shape)
+            if first:
+                plan = self._plan(conn, cursor, statement, parameters)
+
+        entry = {
+            'at': datetime.utcnow().isoformat(timespec='seconds'),
+            'duration_ms': round(elapsed * 1000, 2),
+            'origin': _origin(),
+            'shape': shape,
+            'statement': statement,
+            'parameters': _parameters(parameters, executemany),
+            'plan': plan
+        }
+        print(f"[SLOW QUERY] {entry['duration_ms']} ms in {entry['origin']}: {shape[:200]}")
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            with open(self.path, 'a') as handle:
+                handle.write(line + '\n')
+
+    def _plan(self, conn, cursor, statement, parameters):
+        """Plan lines of a statement, or None if it cannot be explained"""
+        dialect = conn.dialect.name
+        if dialect == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        elif dialect == 'postgresql':
+            prefix = 'EXPLAIN '
+        else:
+            return None
+        words = statement.split(None, 1)
+        if not words or words[0].upper() not in EXPLAINABLE:
+            return None
+
+        # A separate DBAPI cursor keeps the plan query out of SQLAlchemy's
+        # events, and a savepoint keeps a failing EXPLAIN from aborting the
+        # transaction of the request being profiled
+        explain_cursor = None
+        try:
+            explain_cursor = cursor.connection.cursor()
+            explain_cursor.execute(f'SAVEPOINT {PLAN_SAVEPOINT}')
+            try:
+                explain_cursor.execute(prefix + statement, parameters)
+                rows = explain_cursor.fetchall()
+            except Exception:
+                explain_cursor.execute(f'ROLLBACK TO SAVEPOINT {PLAN_SAVEPOINT}')
+                raise
+            finally:
+                explain_cursor.execute(f'RELEASE SAVEPOINT {PLAN_SAVEPOINT}')
+        except Exception as e:
+            return [f'EXPLAIN failed: {e}']
+        finally:
+            if explain_cursor is not None:
+                explain_cursor.close()
+        if dialect == 'sqlite':
+            # (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [row[0] for row in rows]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._profiler_started = time.perf_counter()
+
+
+def init_query_profiler(app):
+    """Log slow statements when enabled in config"""
+    if not app.config.get('SLOW_QUERY_LOG'):
+        return
+
+    path = app.config.get('SLOW_QUERY_LOG_FILE') or os.path.join(app.instance_path, 'slow_queries.jsonl')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    profiler = QueryProfiler(
+        path,
+        threshold_ms=app.config['SLOW_QUERY_THRESHOLD_MS'],
+        explain=app.config['SLOW_QUERY_EXPLAIN']
+    )
+    app.extensions['query_profiler'] = profiler
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', profiler.after_execute)
+
+
+def summarize_slow_queries(path, top=10):
+    """
+    Group a slow-query log by statement shape
+
+    Args:
+        path: JSON lines file written by QueryProfiler
+        top: Number of shapes to return
+
+    Returns:
+        list: Dicts per shape (count, total/mean/max ms, origins, plan),
+            by total time, slowest first
+    """
+    shapes = defaultdict(lambda: {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'origins': defaultdict(int), 'plan': None})
+    with open(path) as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            summary = shapes[entry['shape']]
+            summary['count'] += 1
+            summary['total_ms'] += entry['duration_ms']
+            if entry['duration_ms'] >= summary['max_ms']:
+                summary['max_ms'] = entry['duration_ms']
+                summary['slowest'] = entry
+            summary['origins'][entry['origin']] += 1
+            if entry.get('plan') and summary['plan'] is None:
+                summary['plan'] = entry['plan']
+
+    ranked = sorted(shapes.items(), key=lambda item: item[1]['total_ms'], reverse=True)[:top]
+    return [
+        {
+            'shape': shape,
+            'count': summary['count'],
+            'total_ms': round(summary['total_ms'], 1),
+            'mean_ms': round(summary['total_ms'] / summary['count'], 1),
+            'max_ms': summary['max_ms'],
+            'origins': dict(sorted(summary['origins'].items(), key=lambda item: -item[1])),
+            'slowest_parameters': summary['slowest']['parameters'],
+            'plan': summary['plan']
+        }
+        for shape, summary in ranked
+    ]
@@ -0,0 +1,156 @@
+"""Recurring shift generation from templates"""
+from datetime import timedelta
+
+from app import db
+from app.models import Shift
+from app.services.sql import insert_ignore
+
+# Shift types and the capacity a shift gets when none is given
+SHIFT_TYPES = {'Kakad': 1, 'Robes': 4}
+
+# Indexed by date.weekday(); independent of the process locale, unlike strftime('%A')
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Template used when a request does not send one: every shift type, every day
+DEFAULT_SHIFT_TEMPLATE = [
+    {'shift_type': 'Kakad', 'capacity': 1},
+    {'shift_type': 'Robes', 'capacity': 4}
+]
+
+
+def week_of_month(day):
+    """Week of the month a date falls in: days 1-7 are week 1, 8-14 week 2, ..."""
+    return (day.day - 1) // 7 + 1
+
+
+def shift_fields(day):
+    """Derived calendar fields stored on a shift for a date"""
+    return {'day_name': DAY_NAMES[day.weekday()], 'week_of_month': week_of_month(day)}
+
+
+class RecurrenceService:
+    """Service expanding shift templates over date ranges"""
+
+    @staticmethod
+    def validate_template(template):
+        """
+        Check a recurrence template before expanding it
+
+        A template is a list of entries with a shift_type, an optional
+        capacity, and optional 'days' (day names) and 'weeks' (weeks of the
+        month, 1-5) restricting which dates get the shift.
+
+        Args:
+            template: List of template entry dicts
+
+        Returns:
+            str or None: Error message, None if the template is valid
+        """
+        if not isinstance(template, list) or not template:
+            return 'template must be a non-empty list'
+
+        allowed = {'shift_type', 'capacity', 'days', 'weeks'}
+        for entry in template:
+            if not isinstance(entry, dict):
+                return 'Each template entry must be an object'
+            unknown = set(entry) - allowed
+            if unknown:
+                return f'Unknown template fields: {", ".join(sorted(unknown))}'
+            if entry.get('shift_type') not in SHIFT_TYPES:
+                return 'Invalid shift_type. Must be Kakad or Robes'
+            capacity = entry.get('capacity', 1)
+            if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity < 1:
+                return 'capacity must be a positive integer'
+            # Elements are type-checked one by one: a nested list is not
+            # hashable, and True == 1 would pass for week 1
+            days = entry.get('days')
+            if days is not None and (
+                not isinstance(days, list)
+                or not all(isinstance(day, str) and day in DAY_NAMES for day in days)
+            ):
+                return f'days must be a list of day names ({", ".join(DAY_NAMES)})'
+            weeks = entry.get('weeks')
+            if weeks is not None and (
+                not isinstance(weeks, list)
+                or not all(
+                    isinstance(week, int) and not isinstance(week, bool) and 1 <= week <= 5
+                    for week in weeks
+                )
+            ):
+                return 'weeks must be a list of weeks of the month (1-5)'
+
+        return None
+
+    @staticmethod
+    def expand(template, start, end):
+        """
+        Rows for every shift a template produces in [start, end)
+
+        Calendar fields are computed once per date, and each template entry
+        is then matched against them through precomputed day and week sets.
+
+        Args:
+            template: Validated template entries
+            start: First date
+            end: Day after the last date
+
+        Returns:
+            list: Shift row dicts ready for a bulk insert
+        """
+        dates = [start + timedelta(days=offset) for offset in range((end - start).days)]
+        calendar = [(day, DAY_NAMES[day.weekday()], week_of_month(day)) for day in dates]
+
+        rows = []
+        for entry in template:
+            shift_type = entry['shift_type']
+            capacity = entry.get('capacity', SHIFT_TYPES[shift_type])
+            days = set(entry.get('days') or DAY_NAMES)
+            weeks = set(entry.get('weeks') or range(1, 6))
+            rows.extend(
+                {
+                    'date': day,
+                    'day_name': day_name,
+                    'week_of_month': week,
+                    'shift_type': shift_type,
+                    'capacity': capacity
+                }
+                for day, day_name, week in calendar
+                if day_name in days and week in weeks
+            )
+        return rows
+
+    @staticmethod
+    def generate(template, start, end):
+        """
+        Create the shifts of a template in [start, end) with one bulk insert
+
+        Shifts that already exist for a (date, shift_type) are left untouched,
+        including any whose capacity differs from the template. Template
+        entries producing the same (date, shift_type) create one shift,
+        with the capacity of the first. The caller commits.
+
+        Args:
+            template: Validated template entries
+            start: First date
+            end: Day after the last date
+
+        Returns:
+            tuple: (created, skipped) shift counts
+        """
+        # Entries overlapping on a date and shift type give one shift; the first wins
+        rows = {}
+        for row in RecurrenceService.expand(template, start, end):
+            rows.setdefault((row['date'], row['shift_type']), row)
+        rows = list(rows.values())
+
+        existing = set(db.session.query(Shift.date, Shift.shift_type).filter(
+            Shift.date >= start,
+            Shift.date < end
+        ))
+        new_rows = [row for row in rows if (row['date'], row['shift_type']) not in existing]
+
+        if new_rows:
+            # Shifts created concurrently are skipped by the conflict clause
+            db.session.execute(insert_ignore(Shift), new_rows)
+
+        return len(new_rows), len(rows) - len(new_rows)
@@ -0,0 +1,50 @@
+"""Reminder service queuing next-day shift reminders"""
+from datetime import date, timedelta
+
+from app import db
+from app.models import Shift, Signup, Volunteer
+from app.services.notifications import NotificationService
+from app.services.outbox import OutboxService
+
+
+class ReminderService:
+    """Service building reminder messages for upcoming shifts"""
+
+    @staticmethod
+    def queue_reminders(shift_date=None):
+        """
+        Queue reminders for every confirmed signup on a date.
+
+        Shifts, signups and volunteer phones are read in one joined query and
+        all messages are inserted together. Each reminder is keyed by its
+        signup, so running this again for the same day queues nothing new.
+
+        Args:
+            shift_date: Date of the shifts to remind about; defaults to tomorrow
+
+        Returns:
+            tuple: (queued, total) number of newly queued and eligible reminders
+        """
+        shift_date = shift_date or date.today() + timedelta(days=1)
+
+        rows = db.session.query(
+            Signup.id,
+            Volunteer.phone,
+            Shift.shift_type,
+            Shift.date
+        ).join(
+            Shift, Signup.shift_id == Shift.id
+        ).join(
+            Volunteer, Signup.volunteer_id == Volunteer.id
+        ).filter(
+            Shift.date == shift_date,
+            Signup.status == 'confirmed'
+        ).all()
+
+        messages = [
+            (f'reminder:{row.id}', row.phone, NotificationService.reminder_message(row))
+            for row in rows
+        ]
+        queued = OutboxService.enqueue_once(messages, kind='reminder')
+        db.session.commit()
+        return queued, len(rows)
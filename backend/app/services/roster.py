@@ -0,0 +1,409 @@
+"""Roster generation: assign volunteers to open shifts with min-cost flow"""
+import heapq
+import time
+
+from app import db
+from app.models import Shift, Signup, Volunteer, VolunteerRuleCount
+from app.services.rules import get_rule_set
+
+# Weight of covering a seat; dominates reliability so coverage comes first
+COVERAGE_WEIGHT = 10000
+# Extra weight for a shift the volunteer asked for
+PREFERENCE_WEIGHT = 50
+# Candidates kept per open seat, and how many shifts a volunteer may be a
+# candidate for per signup they have left
+CANDIDATES_PER_SEAT = 4
+CANDIDATE_SPREAD = 3
+# Re-solves allowed to repair rules that cannot be encoded in the network
+MAX_REPAIR_ROUNDS = 5
+
+_INF = float('inf')
+
+
+class MinCostFlow:
+    """
+    Successive shortest paths with Johnson potentials
+
+    Nodes must be numbered so that every edge added goes from a lower to a
+    higher node id; the network is then a DAG and initial potentials come
+    from one forward pass, which allows negative edge costs.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.graph = [[] for _ in range(size)]
+
+    def add_edge(self, source, target, capacity, cost):
+        """Add an edge and return a handle for reading its flow"""
+        forward = [target, capacity, cost, len(self.graph[target])]
+        backward = [source, 0, -cost, len(self.graph[source])]
+        self.graph[source].append(forward)
+        self.graph[target].append(backward)
+        return forward, capacity
+
+    @staticmethod
+    def flow(handle):
+        """Flow sent through an edge returned by add_edge"""
+        edge, capacity = handle
+        return capacity - edge[1]
+
+    def solve(self, source, sink):
+        """
+        Send flow while it lowers the total cost
+
+        Stops at the cheapest flow of any size, i.e. once the next augmenting
+        path would cost zero or more.
+
+        Returns:
+            tuple: (flow, cost)
+        """
+        graph = self.graph
+        potential = [_INF] * self.size
+        potential[source] = 0
+        for node in range(self.size):
+            if potential[node] == _INF:
+                continue
+            for target, capacity, cost, _ in graph[node]:
+                if capacity and potential[node] + cost < potential[target]:
+                    potential[target] = potential[node] + cost
+        potential = [0 if value == _INF else value for value in potential]
+
+        total_flow = total_cost = 0
+        while True:
+            distance = [_INF] * self.size
+            previous = [None] * self.size
+            distance[source] = 0
+            heap = [(0, source)]
+            while heap:
+                dist, node = heapq.heappop(heap)
+                if dist > distance[node]:
+                    continue
+                base = dist + potential[node]
+                for index, (target, capacity, cost, _) in enumerate(graph[node]):
+                    if not capacity:
+                        continue
+                    candidate = base + cost - potential[target]
+                    if candidate < distance[target]:
+                        distance[target] = candidate
+                        previous[target] = (node, index)
+                        heapq.heappush(heap, (candidate, target))
+
+            if distance[sink] == _INF:
+                break
+            for node in range(self.size):
+                if distance[node] < _INF:
+                    potential[node] += distance[node]
+            path_cost = potential[sink] - potential[source]
+            if path_cost >= 0:
+                break
+
+            amount = _INF
+            node = sink
+            while node != source:
+                parent, index = previous[node]
+                amount = min(amount, graph[parent][index][1])
+                node = parent
+            node = sink
+            while node != source:
+                parent, index = previous[node]
+                edge = graph[parent][index]
+                edge[1] -= amount
+                graph[node][edge[3]][1] += amount
+                node = parent
+
+            total_flow += amount
+            total_cost += amount * path_cost
+
+        return total_flow, total_cost
+
+
+class RosterService:
+    """Service generating rosters for open shifts"""
+
+    @staticmethod
+    def generate(start, end, preferences=None):
+        """
+        Propose signups filling the open seats of shifts in [start, end)
+
+        The assignment maximizes the number of seats filled, then the summed
+        reliability score (plus a bonus for preferred shifts), subject to the
+        scheduling rules, shift capacities and existing signups. It is
+        solved as min-cost flow:
+
+            source -> volunteer -> [rule group] -> shift -> sink
+
+        The volunteer edge carries the allowance of rules matching every
+        shift. Rules whose shifts are disjoint from each other in the window
+        (e.g. Kakad) get a group node per volunteer carrying their
+        allowance. Remaining rules overlap a group (e.g. Thursday overlaps
+        Kakad) and are enforced by dropping their lowest-weight excess
+        assignments and re-solving.
+
+        Each shift only keeps the volunteers a greedy most-reliable-first
+        fill gives it plus its best CANDIDATES_PER_SEAT candidates per open
+        seat, and no volunteer is an extra candidate for more than
+        CANDIDATE_SPREAD shifts per signup they have left, so the network
+        stays small for thousands of volunteers.
+
+        Args:
+            start: First date of the range
+            end: Day after the last date of the range
+            preferences: Optional dict volunteer_id -> iterable of shift IDs
+
+        Returns:
+            dict: assignments, unfilled shifts and solver statistics
+        """
+        started = time.perf_counter()
+        preferences = {
+            int(volunteer_id): {int(shift_id) for shift_id in shift_ids}
+            for volunteer_id, shift_ids in (preferences or {}).items()
+        }
+        rule_set = get_rule_set()
+
+        shifts = Shift.query.filter(
+            Shift.date >= start,
+            Shift.date < end,
+            Shift.confirmed_count < Shift.capacity
+        ).order_by(Shift.date, Shift.shift_type).all()
+        if not shifts:
+            return RosterService._result([], [], {}, started, 0, 0)
+
+        shift_ids = [shift.id for shift in shifts]
+        volunteers = db.session.query(
+            Volunteer.id, Volunteer.name, Volunteer.reliability_score
+        ).order_by(Volunteer.reliability_score.desc(), Volunteer.id).all()
+
+        ledger = {}
+        for volunteer_id, rule_key, count in db.session.query(
+            VolunteerRuleCount.volunteer_id, VolunteerRuleCount.rule_key, VolunteerRuleCount.count
+        ):
+            ledger.setdefault(volunteer_id, []).append((rule_key, count))
+        counters = {
+            volunteer.id: rule_set.vector(ledger.get(volunteer.id, ()))
+            for volunteer in volunteers
+        }
+        taken = set(db.session.query(Signup.volunteer_id, Signup.shift_id).filter(
+            Signup.shift_id.in_(shift_ids)
+        ))
+
+        # Split rules into per-volunteer allowances, group nodes and repairs
+        masks = {shift.id: rule_set.deltas(shift) for shift in shifts}
+        universal, grouped, deferred = [], [], []
+        covered = set()
+        for index in range(len(rule_set.rules)):
+            members = {shift_id for shift_id, mask in masks.items() if mask[index]}
+            if len(members) == len(shifts):
+                universal.append(index)
+            elif members and not members & covered:
+                grouped.append(index)
+                covered |= members
+            elif members:
+                deferred.append(index)
+        group_of = {
+            shift_id: index for index in grouped
+            for shift_id, mask in masks.items() if mask[index]
+        }
+
+        def allowance(volunteer_id, indexes):
+            return min(
+                (rule_set.rules[index].limit - counters[volunteer_id][index] for index in indexes),
+                default=len(shifts)
+            )
+
+        # Candidate pruning. A greedy most-reliable-first fill seeds each
+        # shift's candidates, so the network never covers fewer seats than it.
+        greedy = dict(counters)
+        load = {}
+        spread = {
+            volunteer.id: max(allowance(volunteer.id, universal), 0) * CANDIDATE_SPREAD
+            for volunteer in volunteers
+        }
+        candidates = {}
+        for shift in shifts:
+            seats = shift.capacity - shift.confirmed_count
+            picked = [
+                volunteer_id for volunteer_id, shift_ids in preferences.items()
+                if shift.id in shift_ids and volunteer_id in counters
+                and (volunteer_id, shift.id) not in taken
+                and rule_set.check(shift, counters[volunteer_id]) is None
+            ]
+            chosen = set(picked)
+
+            filled = 0
+            for volunteer in volunteers:
+                if filled == seats:
+                    break
+                vector = greedy[volunteer.id]
+                if (volunteer.id, shift.id) in taken or rule_set.check(shift, vector):
+                    continue
+                greedy[volunteer.id] = [
+                    current + delta for current, delta in zip(vector, masks[shift.id])
+                ]
+                filled += 1
+                if volunteer.id not in chosen:
+                    picked.append(volunteer.id)
+                    chosen.add(volunteer.id)
+
+            wanted = len(picked) + seats * CANDIDATES_PER_SEAT
+            for volunteer in volunteers:
+                if len(picked) >= wanted:
+                    break
+                if volunteer.id in chosen or load.get(volunteer.id, 0) >= spread[volunteer.id]:
+                    continue
+                if (volunteer.id, shift.id) in taken:
+                    continue
+                if rule_set.check(shift, counters[volunteer.id]) is None:
+                    picked.append(volunteer.id)
+                    chosen.add(volunteer.id)
+            for volunteer_id in picked:
+                load[volunteer_id] = load.get(volunteer_id, 0) + 1
+            candidates[shift.id] = picked
+
+        scores = {volunteer.id: volunteer.reliability_score or 0 for volunteer in volunteers}
+
+        def weight(volunteer_id, shift_id):
+            bonus = PREFERENCE_WEIGHT if shift_id in preferences.get(volunteer_id, ()) else 0
+            return COVERAGE_WEIGHT + scores[volunteer_id] + bonus
+
+        # Solve, then repair rules the network could not encode
+        forbidden = set()
+        rounds = 0
+        while True:
+            assignment, edges = RosterService._solve(
+                shifts, candidates, forbidden, group_of, universal, allowance, weight
+            )
+            excess = RosterService._excess(
+                assignment, deferred, rule_set, counters, masks, weight
+            )
+            if not excess:
+                break
+            if rounds == MAX_REPAIR_ROUNDS:
+                assignment = [pair for pair in assignment if pair not in excess]
+                break
+            forbidden |= excess
+            rounds += 1
+
+        names = {volunteer.id: volunteer.name for volunteer in volunteers}
+        return RosterService._result(
+            shifts, assignment, names, started, edges, rounds, scores
+        )
+
+    @staticmethod
+    def _solve(shifts, candidates, forbidden, group_of, universal, allowance, weight):
+        """Build the flow network and return (assignment pairs, edge count)"""
+        volunteer_ids = sorted({
+            volunteer_id for picked in candidates.values() for volunteer_id in picked
+        })
+        groups = sorted({
+            (volunteer_id, group_of[shift_id])
+            for shift_id, picked in candidates.items() if shift_id in group_of
+            for volunteer_id in picked
+        })
+
+        # Node ids follow the topological order required by MinCostFlow
+        source = 0
+        volunteer_node = {volunteer_id: 1 + i for i, volunteer_id in enumerate(volunteer_ids)}
+        offset = 1 + len(volunteer_ids)
+        group_node = {group: offset + i for i, group in enumerate(groups)}
+        offset += len(groups)
+        shift_node = {shift.id: offset + i for i, shift in enumerate(shifts)}
+        sink = offset + len(shifts)
+
+        network = MinCostFlow(sink + 1)
+        for volunteer_id, node in volunteer_node.items():
+            network.add_edge(source, node, allowance(volunteer_id, universal), 0)
+        for (volunteer_id, index), node in group_node.items():
+            network.add_edge(volunteer_node[volunteer_id], node, allowance(volunteer_id, [index]), 0)
+        for shift in shifts:
+            network.add_edge(shift_node[shift.id], sink, shift.capacity - shift.confirmed_count, 0)
+
+        handles = []
+        for shift_id, picked in candidates.items():
+            index = group_of.get(shift_id)
+            for volunteer_id in picked:
+                if (volunteer_id, shift_id) in forbidden:
+                    continue
+                origin = (
+                    volunteer_node[volunteer_id] if index is None
+                    else group_node[(volunteer_id, index)]
+                )
+                handles.append((
+                    volunteer_id, shift_id,
+                    network.add_edge(origin, shift_node[shift_id], 1, -weight(volunteer_id, shift_id))
+                ))
+
+        network.solve(source, sink)
+        assignment = [
+            (volunteer_id, shift_id) for volunteer_id, shift_id, handle in handles
+            if MinCostFlow.flow(handle)
+        ]
+        return assignment, len(handles)
+
+    @staticmethod
+    def _excess(assignment, deferred, rule_set, counters, masks, weight):
+        """Lowest-weight assignments that break a rule left out of the network"""
+        excess = set()
+        if not deferred:
+            return excess
+
+        by_volunteer = {}
+        for volunteer_id, shift_id in assignment:
+            by_volunteer.setdefault(volunteer_id, []).append(shift_id)
+
+        for volunteer_id, shift_ids in by_volunteer.items():
+            for index in deferred:
+                matching = [shift_id for shift_id in shift_ids if masks[shift_id][index]]
+                room = rule_set.rules[index].limit - counters[volunteer_id][index]
+                if len(matching) > room:
+                    matching.sort(key=lambda shift_id: weight(volunteer_id, shift_id))
+                    excess.update(
+                        (volunteer_id, shift_id)
+                        for shift_id in matching[:len(matching) - max(room, 0)]
+                    )
+        return excess
+
+    @staticmethod
+    def _result(shifts, assignment, names, started, edges, rounds, scores=None):
+        """Shape the generated roster for the API"""
+        assigned = {}
+        for volunteer_id, shift_id in assignment:
+            assigned.setdefault(shift_id, []).append(volunteer_id)
+
+        assignments = []
+        unfilled = []
+        open_seats = 0
+        for shift in shifts:
+            seats = shift.capacity - shift.confirmed_count
+            open_seats += seats
+            volunteer_ids = sorted(
+                assigned.get(shift.id, []),
+                key=lambda volunteer_id: (-scores[volunteer_id], volunteer_id)
+            )
+            for volunteer_id in volunteer_ids:
+                assignments.append({
+                    'volunteer_id': volunteer_id,
+                    'volunteer_name': names[volunteer_id],
+                    'shift_id': shift.id,
+                    'date': shift.date.isoformat(),
+                    'shift_type': shift.shift_type
+                })
+            if len(volunteer_ids) < seats:
+                unfilled.append({
+                    'shift_id': shift.id,
+                    'date': shift.date.isoformat(),
+                    'shift_type': shift.shift_type,
+                    'missing': seats - len(volunteer_ids)
+                })
+
+        return {
+            'assignments': assignments,
+            'unfilled': unfilled,
+            'stats': {
+                'open_shifts': len(shifts),
+                'open_seats': open_seats,
+                'filled_seats': len(assignments),
+                'candidate_edges': edges,
+                'repair_rounds': rounds,
+                'solve_ms': round((time.perf_counter() - started) * 1000, 1)
+            }
+        }
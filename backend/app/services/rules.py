@@ -0,0 +1,318 @@
+"""Scheduling rules stored as data and compiled into counter vectors"""
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import and_, case, delete, func, select, true
+
+from app import db
+from app.models import SchedulingRule
+from app.services.sql import insert_ignore
+
+# Rules seeded into an empty scheduling_rules table
+DEFAULT_SCHEDULING_RULES = [
+    {
+        'key': 'kakad',
+        'shift_type': 'Kakad',
+        'max_signups': 2,
+        'message': 'Maximum Kakad signups ({limit}) reached'
+    },
+    {
+        'key': 'total',
+        'max_signups': 4,
+        'message': 'Maximum total signups ({limit}) reached'
+    },
+    {
+        # Thursday shifts include any shift on any Thursday date
+        'key': 'thursday',
+        'day_name': 'Thursday',
+        'max_signups': 2,
+        'message': 'Maximum Thursday signups ({limit}) reached'
+    }
+]
+
+# Shift attributes a rule can match on
+PREDICATE_FIELDS = ('shift_type', 'day_name', 'week_of_month')
+
+
+class CompiledRule:
+    """A scheduling rule ready for evaluation"""
+
+    __slots__ = ('key', 'predicate', 'limit', 'message')
+
+    def __init__(self, key, predicate, limit, message=None):
+        self.key = key
+        self.predicate = tuple(predicate)
+        self.limit = limit
+        self.message = message
+
+    def matches(self, shift):
+        """Whether signups for a shift count towards this rule"""
+        return all(getattr(shift, field) == value for field, value in self.predicate)
+
+    def condition(self, shift_table):
+        """The rule's predicate as a SQL expression over shift columns"""
+        if not self.predicate:
+            return true()
+        return and_(*(
+            getattr(shift_table, field) == value for field, value in self.predicate
+        ))
+
+    def error(self):
+        """Message returned when the rule blocks a signup"""
+        template = self.message or f'Maximum {self.key} signups ({{limit}}) reached'
+        return template.format(limit=self.limit)
+
+
+class RuleSet:
+    """
+    Scheduling rules compiled into a counter vector
+
+    Position i of a volunteer's counter vector holds their confirmed signups
+    matching rule i. The delta vector of a shift (which positions a signup
+    for it increments) only depends on the shift's predicate attributes and
+    is computed once per distinct combination, so checking a signup is one
+    pass over two vectors.
+    """
+
+    def __init__(self, rules, version=None):
+        self.rules = tuple(rules)
+        self.keys = tuple(rule.key for rule in self.rules)
+        self.version = version
+        self._index = {key: index for index, key in enumerate(self.keys)}
+        self._masks = {}
+
+    @classmethod
+    def compile(cls, definitions, version=None):
+        """
+        Compile rule definitions (dicts or SchedulingRule rows)
+
+        Args:
+            definitions: Rules in evaluation order
+            version: Opaque marker of the definitions the set was built from
+
+        Returns:
+            RuleSet: The compiled rules
+        """
+        rules = []
+        for definition in definitions:
+            if not isinstance(definition, dict):
+                definition = definition.to_dict()
+            predicate = [
+                (field, definition[field]) for field in PREDICATE_FIELDS
+                if definition.get(field) is not None
+            ]
+            rules.append(CompiledRule(
+                definition['key'], predicate, definition['max_signups'], definition.get('message')
+            ))
+        return cls(rules, version)
+
+    def empty(self):
+        """A counter vector with no signups"""
+        return [0] * len(self.rules)
+
+    def vector(self, counts):
+        """
+        Build a counter vector from (rule_key, count) pairs
+
+        Counts for keys that are not part of this rule set are ignored.
+        """
+        vector = self.empty()
+        for key, count in counts:
+            index = self._index.get(key)
+            if index is not None:
+                vector[index] = count
+        return vector
+
+    def deltas(self, shift, count=1):
+        """Increments `count` signups for a shift apply to a counter vector"""
+        signature = tuple(getattr(shift, field) for field in PREDICATE_FIELDS)
+        mask = self._masks.get(signature)
+        if mask is None:
+            mask = tuple(int(rule.matches(shift)) for rule in self.rules)
+            self._masks[signature] = mask
+        return [count * bit for bit in mask]
+
+    def check(self, shift, counts):
+        """
+        Check one more signup for a shift against every rule
+
+        Args:
+            shift: Shift the volunteer wants to sign up for
+            counts: The volunteer's counter vector
+
+        Returns:
+            str or None: Message of the first rule that blocks the signup
+        """
+        for rule, current, delta in zip(self.rules, counts, self.deltas(shift)):
+            if delta and current >= rule.limit:
+                return rule.error()
+        return None
+
+    def stats(self, counts):
+        """Signups and remaining allowance per rule"""
+        stats = {}
+        for rule, current in zip(self.rules, counts):
+            stats[f'{rule.key}_signups'] = current
+            stats[f'{rule.key}_remaining'] = rule.limit - current
+        return stats
+
+    def limit_case(self, key_column):
+        """SQL expression mapping a rule key column to the rule's limit"""
+        return case(
+            {rule.key: rule.limit for rule in self.rules},
+            value=key_column,
+            else_=0
+        )
+
+    def count_columns(self, shift_table):
+        """
+        One SQL aggregate per rule counting matching signups
+
+        Args:
+            shift_table: Shift entity joined to the counted signups
+
+        Returns:
+            list: Labeled SUM(CASE ...) columns in rule order
+        """
+        return [
+            func.sum(case((rule.condition(shift_table), 1), else_=0)).label(f'rule_{index}')
+            for index, rule in enumerate(self.rules)
+        ]
+
+
+class RuleSetCache:
+    """
+    Compiled scheduling rules, recompiled when the table changes
+
+    The table's row count and latest update time are compared at most once
+    per `refresh_seconds`, so rule edits reach every process within that
+    interval without a query per request.
+    """
+
+    def __init__(self, refresh_seconds):
+        self.refresh_seconds = refresh_seconds
+        self._rule_set = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the current compiled rule set"""
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.refresh_seconds:
+            version = tuple(db.session.execute(
+                select(func.count(SchedulingRule.id), func.max(SchedulingRule.updated_at))
+            ).one())
+            with self._lock:
+                if self._rule_set is None or self._rule_set.version != version:
+                    self._rule_set = RuleSet.compile(
+                        SchedulingRule.query.order_by(SchedulingRule.position, SchedulingRule.id).all(),
+                        version
+                    )
+                self._checked_at = now
+        return self._rule_set
+
+    def invalidate(self):
+        """Force a version check on the next use"""
+        with self._lock:
+            self._checked_at = None
+
+
+class RuleService:
+    """Service managing the stored scheduling rules"""
+
+    @staticmethod
+    def validate_definitions(definitions):
+        """
+        Check rule definitions before storing them
+
+        Args:
+            definitions: List of rule dicts
+
+        Returns:
+            str or None: Error message, None if the definitions are valid
+        """
+        if not isinstance(definitions, list):
+            return 'Rules must be a list'
+
+        allowed = {'key', 'max_signups', 'message', *PREDICATE_FIELDS}
+        keys = set()
+        for definition in definitions:
+            if not isinstance(definition, dict):
+                return 'Each rule must be an object'
+            key = definition.get('key')
+            if not key or not isinstance(key, str):
+                return 'Each rule needs a key'
+            if key in keys:
+                return f'Duplicate rule key: {key}'
+            keys.add(key)
+            unknown = set(definition) - allowed
+            if unknown:
+                return f'Unknown fields in rule {key}: {", ".join(sorted(unknown))}'
+            limit = definition.get('max_signups')
+            if not isinstance(limit, int) or isinstance(limit, bool) or limit < 0:
+                return f'Rule {key} needs a non-negative integer max_signups'
+
+        return None
+
+    @staticmethod
+    def replace_rules(definitions):
+        """
+        Replace all scheduling rules and rebuild the counter ledger
+
+        Runs in one transaction, so the ledger always matches the stored
+        rules. Other processes pick the new rules up within
+        SCHEDULING_RULES_REFRESH_SECONDS.
+
+        Args:
+            definitions: List of rule dicts, in evaluation order
+
+        Returns:
+            int: Number of volunteer counters corrected
+        """
+        from app.services.counters import CounterService
+
+        error = RuleService.validate_definitions(definitions)
+        if error:
+            raise ValueError(error)
+
+        db.session.execute(delete(SchedulingRule))
+        db.session.add_all([
+            SchedulingRule(position=position, **definition)
+            for position, definition in enumerate(definitions)
+        ])
+        db.session.flush()
+        get_rules_cache().invalidate()
+
+        return CounterService.rebuild_volunteer_quotas()
+
+
+def init_rules(app):
+    """Create the rule cache and seed the default rules into an empty table"""
+    app.extensions['scheduling_rules'] = RuleSetCache(
+        app.config['SCHEDULING_RULES_REFRESH_SECONDS']
+    )
+
+    with app.app_context():
+        if db.session.query(SchedulingRule.id).first() is not None:
+            return
+
+        db.session.execute(insert_ignore(SchedulingRule), [
+            {'position': position, **definition}
+            for position, definition in enumerate(DEFAULT_SCHEDULING_RULES)
+        ])
+        db.session.commit()
+
+        # A new rules table means the ledger has never been counted
+        from app.services.counters import CounterService
+        CounterService.rebuild_volunteer_quotas()
+
+
+def get_rules_cache():
+    """Return the current app's rule cache"""
+    return current_app.extensions['scheduling_rules']
+
+
+def get_rule_set():
+    """Return the compiled scheduling rules"""
+    return get_rules_cache().get()
@@ -0,0 +1,169 @@
+"""Synthetic dataset generation for local testing and benchmarks"""
+import bisect
+import itertools
+import math
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, update
+
+from app import db
+from app.models import Shift, Signup, User, Volunteer
+from app.services.counters import CounterService
+from app.services.recurrence import SHIFT_TYPES, RecurrenceService
+
+FIRST_NAMES = (
+    'Aarav', 'Aditi', 'Anika', 'Arjun', 'Deepa', 'Divya', 'Gita', 'Hari', 'Isha', 'Kavya',
+    'Kiran', 'Lakshmi', 'Maya', 'Meera', 'Nikhil', 'Priya', 'Rahul', 'Ravi', 'Sanjay', 'Tara'
+)
+LAST_NAMES = (
+    'Bhat', 'Desai', 'Gupta', 'Iyer', 'Joshi', 'Kulkarni', 'Menon', 'Nair', 'Patel', 'Rao',
+    'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma'
+)
+
+# Share of seats filled on average, and signup statuses for past and upcoming shifts
+FILL_RATIO = 0.8
+PAST_STATUSES = (('confirmed', 0.85), ('cancelled', 0.10), ('no-show', 0.05))
+UPCOMING_STATUSES = (('confirmed', 0.95), ('cancelled', 0.05))
+
+# Rows per INSERT statement
+INSERT_CHUNK_SIZE = 5000
+
+
+class SeedService:
+    """Service generating a synthetic dataset in an empty database"""
+
+    @staticmethod
+    def generate(volunteers=10000, days=730, signups=200000, start=None, seed=42,
+                 idle_share=0.1, users=1000, password='password123'):
+        """
+        Create volunteers, Kakad/Robes shifts, signups and users
+
+        Volunteers get skewed activity (a few sign up far more often than
+        most) and reliability scores clustered near 100. Shifts are created
+        daily from the default template, half of the range in the past.
+        Capacities are scaled up so the requested signups fit at about
+        FILL_RATIO of the seats. Past signups carry a mix of confirmed,
+        cancelled and no-show statuses. Scheduling rules are not applied to
+        the history, but `idle_share` of the volunteers get no signups so
+        new signups can still succeed. Shift counters are written as the
+        signups are generated and the rule ledger is rebuilt at the end.
+
+        Args:
+            volunteers: Number of volunteers
+            days: Number of days of shifts
+            signups: Number of signups
+            start: First shift date; defaults to half of `days` ago
+            seed: Random seed, the same seed gives the same dataset
+            idle_share: Share of volunteers without any signup
+            users: Number of volunteer logins, plus one coordinator
+            password: Password of every seeded user
+
+        Returns:
+            dict: Counts of created rows and the seeded usernames
+
+        Raises:
+            ValueError: If the database already has volunteers or shifts
+        """
+        if db.session.query(Volunteer.id).first() or db.session.query(Shift.id).first():
+            raise ValueError('The database already has volunteers or shifts; seed an empty database')
+
+        rng = random.Random(seed)
+        start = start or date.today() - timedelta(days=days // 2)
+        end = start + timedelta(days=days)
+
+        # Volunteers
+        rows = []
+        for index in range(volunteers):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            rows.append({
+                'name': f'{first} {last}',
+                'phone': f'+1555{index:07d}',
+                'email': f'{first.lower()}.{last.lower()}.{index}@example.org',
+                'reliability_score': max(0, 100 - int(rng.expovariate(1 / 8)))
+            })
+        SeedService._insert(Volunteer, rows)
+        volunteer_ids = [volunteer_id for volunteer_id, in db.session.query(Volunteer.id).order_by(Volunteer.id)]
+
+        # Shifts, with capacities scaled to hold the signups
+        default_seats = days * sum(SHIFT_TYPES.values())
+        factor = max(1, math.ceil(signups / (default_seats * FILL_RATIO)))
+        RecurrenceService.generate([
+            {'shift_type': shift_type, 'capacity': capacity * factor}
+            for shift_type, capacity in SHIFT_TYPES.items()
+        ], start, end)
+        shifts = db.session.query(Shift.id, Shift.date, Shift.capacity).order_by(Shift.id).all()
+
+        # Signups: shifts weighted by capacity, volunteers by activity
+        active = volunteer_ids[:len(volunteer_ids) - int(len(volunteer_ids) * idle_share)]
+        activity = list(itertools.accumulate(rng.paretovariate(1.5) for _ in active))
+        seats = list(itertools.accumulate(shift.capacity for shift in shifts))
+        signups = min(signups, int(seats[-1] * FILL_RATIO), len(active) * len(shifts)) if active else 0
+
+        today = date.today()
+        confirmed = [0] * len(shifts)
+        taken = set()
+        rows = []
+        while len(rows) < signups:
+            shift_index = bisect.bisect(seats, rng.random() * seats[-1])
+            volunteer_id = active[bisect.bisect(activity, rng.random() * activity[-1])]
+            shift = shifts[shift_index]
+            if (volunteer_id, shift.id) in taken:
+                continue
+            statuses = PAST_STATUSES if shift.date < today else UPCOMING_STATUSES
+            status = rng.choices([name for name, _ in statuses], [share for _, share in statuses])[0]
+            if status == 'confirmed':
+                if confirmed[shift_index] >= shift.capacity:
+                    continue
+                confirmed[shift_index] += 1
+            taken.add((volunteer_id, shift.id))
+            signed_up = datetime.combine(shift.date, datetime.min.time()) - timedelta(
+                days=rng.randint(1, 30), minutes=rng.randint(0, 1439)
+            )
+            rows.append({
+                'volunteer_id': volunteer_id,
+                'shift_id': shift.id,
+                'status': status,
+                'created_at': signed_up
+            })
+        # Insert in signup order, so IDs grow with created_at as in production
+        rows.sort(key=lambda row: row['created_at'])
+        SeedService._insert(Signup, rows)
+        db.session.execute(update(Shift), [
+            {'id': shift.id, 'confirmed_count': count}
+            for shift, count in zip(shifts, confirmed) if count
+        ])
+
+        # Users share one password hash; hashing is deliberately slow
+        template = User()
+        template.set_password(password)
+        usernames = ['coordinator'] + [f'volunteer{index}' for index in range(min(users, len(active)))]
+        SeedService._insert(User, [
+            {
+                'username': username,
+                'password_hash': template.password_hash,
+                'role': 'coordinator' if volunteer_id is None else 'volunteer',
+                'volunteer_id': volunteer_id
+            }
+            for username, volunteer_id in zip(usernames, [None] + active)
+        ])
+
+        db.session.commit()
+        CounterService.rebuild_volunteer_quotas()
+
+        return {
+            'volunteers': volunteers,
+            'idle_volunteers': volunteers - len(active),
+            'shifts': len(shifts),
+            'capacity_factor': factor,
+            'signups': len(rows),
+            'users': len(usernames),
+            'start_date': start.isoformat(),
+            'end_date': (end - timedelta(days=1)).isoformat(),
+            'coordinator': usernames[0]
+        }
+
+    @staticmethod
+    def _insert(model, rows):
+        for offset in range(0, len(rows), INSERT_CHUNK_SIZE):
+            db.session.execute(insert(model), rows[offset:offset + INSERT_CHUNK_SIZE])
@@ -0,0 +1,155 @@
+"""Message senders used to deliver notifications"""
+import os
+import threading
+import weakref
+
+
+class SendError(Exception):
+    """Raised by a sender when a message could not be delivered"""
+
+
+class ConsoleSender:
+    """Sender that prints messages, used when Twilio is not configured"""
+
+    def send(self, phone_number, message):
+        print(f"[NOTIFICATION] To {phone_number}: {message}")
+
+
+class FakeSender:
+    """
+    In-memory sender for tests and local benchmarks
+
+    Records every delivered message. Numbers listed in `failing_numbers`
+    raise SendError so retry and dead-letter handling can be exercised.
+    """
+
+    def __init__(self, failing_numbers=()):
+        self.failing_numbers = set(failing_numbers)
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, phone_number, message):
+        if phone_number in self.failing_numbers:
+            raise SendError(f'Fake delivery failure for {phone_number}')
+        with self._lock:
+            self.sent.append((phone_number, message))
+
+
+class TwilioSender:
+    """
+    Sender delivering WhatsApp messages through Twilio
+
+    One Twilio client is created lazily and shared by every thread of the
+    process. Its HTTP session keeps up to `pool_size` keep-alive connections
+    open, so messages after the first skip the TCP/TLS handshake. The client
+    is dropped in forked children (e.g. pre-forking servers) so processes
+    never share sockets.
+    """
+
+    _instances = weakref.WeakSet()
+
+    def __init__(self, account_sid, auth_token, whatsapp_number,
+                 pool_size=10, timeout=10.0, max_retries=0, api_base_url=None):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.whatsapp_number = whatsapp_number
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.api_base_url = api_base_url
+        self._client = None
+        self._lock = threading.Lock()
+        TwilioSender._instances.add(self)
+
+    def send(self, phone_number, message):
+        try:
+            self.client.messages.create(
+                from_=self.whatsapp_number,
+                body=message,
+                to=f'whatsapp:{phone_number}'
+            )
+        except Exception as e:
+            raise SendError(str(e)) from e
+
+    @property
+    def client(self):
+        """The shared Twilio client, created on first use"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build_client()
+        return self._client
+
+    def reset(self):
+        """Drop the client and its pooled connections"""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and client.http_client.session is not None:
+            client.http_client.session.close()
+
+    def _build_client(self):
+        from requests.adapters import HTTPAdapter
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        api_base_url = self.api_base_url
+
+        class PooledHttpClient(TwilioHttpClient):
+            def request(self, method, url, *args, **kwargs):
+                # Allows pointing the client at a local stub server
+                if api_base_url:
+                    url = url.replace('https://api.twilio.com', api_base_url.rstrip('/'), 1)
+                return super().request(method, url, *args, **kwargs)
+
+        http_client = PooledHttpClient(timeout=self.timeout)
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=self.max_retries
+        )
+        http_client.session.mount('https://', adapter)
+        http_client.session.mount('http://', adapter)
+
+        return Client(self.account_sid, self.auth_token, http_client=http_client)
+
+    @classmethod
+    def _reset_after_fork(cls):
+        for sender in list(cls._instances):
+            # The parent's lock may have been held at fork time
+            sender._lock = threading.Lock()
+            sender._client = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=TwilioSender._reset_after_fork)
+
+
+def build_sender(config):
+    """
+    Create the sender selected by NOTIFICATION_SENDER.
+
+    'auto' uses Twilio when its credentials are configured and falls back to
+    printing messages otherwise.
+    """
+    kind = config.get('NOTIFICATION_SENDER', 'auto')
+    twilio_configured = all([
+        config.get('TWILIO_ACCOUNT_SID'),
+        config.get('TWILIO_AUTH_TOKEN'),
+        config.get('TWILIO_WHATSAPP_NUMBER')
+    ])
+
+    if kind == 'fake':
+        return FakeSender()
+    if kind == 'console' or (kind == 'auto' and not twilio_configured):
+        return ConsoleSender()
+    if kind in ('twilio', 'auto'):
+        return TwilioSender(
+            config['TWILIO_ACCOUNT_SID'],
+            config['TWILIO_AUTH_TOKEN'],
+            config['TWILIO_WHATSAPP_NUMBER'],
+            pool_size=config['TWILIO_POOL_SIZE'],
+            timeout=config['TWILIO_TIMEOUT'],
+            max_retries=config['TWILIO_MAX_RETRIES'],
+            api_base_url=config.get('TWILIO_API_BASE_URL') or None
+        )
+    raise ValueError(f'Unknown NOTIFICATION_SENDER: {kind}')
@@ -0,0 +1,76 @@
+"""Set-based removal of shifts and their signups"""
+from datetime import date
+
+from sqlalchemy import case, delete, func, select
+
+from app import db
+from app.models import Shift, Signup, Volunteer
+from app.services.counters import CounterService
+from app.services.notifications import NotificationService
+from app.services.outbox import OutboxService
+
+# Shifts whose notice bodies go into one INSERT ... SELECT
+NOTICE_CHUNK_SIZE = 500
+
+
+class ShiftRemovalService:
+    """Service deleting shifts without loading their signups"""
+
+    @staticmethod
+    def remove(*conditions, notify=True):
+        """
+        Delete the shifts matching conditions together with their signups
+
+        Everything happens in a fixed number of statements whatever the
+        number of signups: cancellation notices are inserted straight from a
+        SELECT, the rule counters are adjusted per rule, and the signups go
+        with their shifts through ON DELETE CASCADE. Only shift IDs, dates
+        and types are read into Python. The caller commits.
+
+        Args:
+            conditions: SQL filters on Shift selecting the shifts to remove
+            notify: Queue a notice for each confirmed signup on an upcoming shift
+
+        Returns:
+            dict: Number of shifts and signups removed and notices queued
+        """
+        shift_ids = select(Shift.id).where(*conditions)
+
+        signups, confirmed = db.session.query(
+            func.count(Signup.id),
+            func.coalesce(func.sum(case((Signup.status == 'confirmed', 1), else_=0)), 0)
+        ).filter(Signup.shift_id.in_(shift_ids)).one()
+
+        notices = 0
+        if notify and confirmed:
+            upcoming = db.session.query(Shift.id, Shift.shift_type, Shift.date).filter(
+                *conditions, Shift.date >= date.today()
+            ).order_by(Shift.id).all()
+            for offset in range(0, len(upcoming), NOTICE_CHUNK_SIZE):
+                chunk = upcoming[offset:offset + NOTICE_CHUNK_SIZE]
+                bodies = {shift.id: NotificationService.shift_cancelled_message(shift) for shift in chunk}
+                notices += OutboxService.enqueue_select(
+                    select(
+                        Volunteer.phone,
+                        case(bodies, value=Signup.shift_id)
+                    ).join(
+                        Volunteer, Signup.volunteer_id == Volunteer.id
+                    ).where(
+                        Signup.shift_id.in_(bodies),
+                        Signup.status == 'confirmed'
+                    ),
+                    kind='cancellation'
+                )
+
+        if confirmed:
+            CounterService.release_quota_for_shifts(shift_ids)
+
+        result = db.session.execute(
+            delete(Shift).where(*conditions).execution_options(synchronize_session=False)
+        )
+
+        return {
+            'deleted_shifts': result.rowcount,
+            'deleted_signups': signups,
+            'notices_queued': notices
+        }
@@ -0,0 +1,104 @@
+"""In-process snapshot cache for coordinator read models"""
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Shift, Signup, Volunteer
+
+# Models whose changes make cached snapshots stale
+WATCHED_MODELS = (Shift, Signup, Volunteer)
+
+
+class SnapshotCache:
+    """
+    Cache computed snapshots until a relevant write is committed.
+
+    Every committed change to shifts, signups or volunteers bumps a
+    generation counter and drops all entries. A snapshot built while an
+    invalidation happened is not stored, so readers never see data older
+    than the last commit in this process. Entries also expire after `ttl`
+    seconds to bound staleness caused by writes in other worker processes.
+    """
+
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, builder):
+        """
+        Return the cached snapshot for key, building it if needed.
+
+        Args:
+            key: Hashable cache key
+            builder: Zero-argument callable computing the snapshot
+
+        Returns:
+            The cached or freshly built snapshot
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+            generation = self._generation
+
+        value = builder()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl)
+        return value
+
+    def invalidate(self):
+        """Drop every cached snapshot"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+def _touches_watched(objects):
+    return any(isinstance(obj, WATCHED_MODELS) for obj in objects)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_flush(session, flush_context):
+    if _touches_watched(session.new) or _touches_watched(session.dirty) or _touches_watched(session.deleted):
+        session.info['snapshot_stale'] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_bulk_write(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in WATCHED_MODELS:
+        orm_execute_state.session.info['snapshot_stale'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    if session.info.pop('snapshot_stale', False) and has_app_context():
+        cache = current_app.extensions.get('snapshot_cache')
+        if cache:
+            cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_on_rollback(session):
+    session.info.pop('snapshot_stale', None)
+
+
+def init_snapshot_cache(app):
+    """Attach the snapshot cache to the app"""
+    app.extensions['snapshot_cache'] = SnapshotCache(ttl=app.config['SNAPSHOT_CACHE_TTL'])
+
+
+def get_snapshot_cache():
+    """Return the current app's snapshot cache"""
+    return current_app.extensions['snapshot_cache']
@@ -0,0 +1,31 @@
+"""SQL helpers shared by services"""
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import db
+
+
+def insert_ignore(model):
+    """
+    Build an INSERT that silently skips rows violating a unique constraint.
+
+    Uses ON CONFLICT DO NOTHING, available on both SQLite and PostgreSQL,
+    the two databases supported by the configuration classes.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model).on_conflict_do_nothing()
+
+
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores foreign keys, and with them ON DELETE CASCADE, unless
+    # every connection turns them on
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
@@ -0,0 +1,260 @@
+"""Access tokens carrying role claims, revocable per user or per token"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, jsonify
+from flask_jwt_extended import create_access_token
+from sqlalchemy import delete, select
+
+from app import db
+from app.models import RevokedToken, User
+from app.services.sql import insert_ignore
+
+
+class TokenVersionCache:
+    """
+    In-process copy of the token versions of recently active users
+
+    A user's version is read the first time one of their tokens is checked.
+    At most once per `refresh_seconds` the versions of the users checked
+    since the previous refresh are re-read in one query, and users not seen
+    since are dropped, so the cache only ever holds the active users. A
+    version bumped by another process is honoured within `refresh_seconds`.
+    """
+
+    def __init__(self, refresh_seconds):
+        self.refresh_seconds = refresh_seconds
+        self._versions = {}
+        self._checked = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Current token version of a user, or None if the user is gone"""
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.refresh_seconds:
+            self.refresh()
+        versions = self._versions
+        if user_id in versions:
+            version = versions[user_id]
+        else:
+            version = db.session.execute(
+                select(User.token_version).where(User.id == user_id)
+            ).scalar()
+            with self._lock:
+                self._versions[user_id] = version
+        # A check racing a refresh may go unrecorded; the user is then read again
+        self._checked.add(user_id)
+        return version
+
+    def refresh(self):
+        """Reload the versions of the users checked since the last refresh"""
+        with self._lock:
+            user_ids, self._checked = self._checked, set()
+        rows = db.session.execute(
+            select(User.id, User.token_version).where(User.id.in_(user_ids))
+        ).all() if user_ids else []
+        with self._lock:
+            # Users checked but not found were deleted
+            self._versions = dict.fromkeys(user_ids)
+            self._versions.update(rows)
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Force a reload on the next check"""
+        with self._lock:
+            self._loaded_at = None
+
+
+class RevocationList:
+    """
+    In-process set of revoked token ids (jti) backed by revoked_tokens
+
+    Checking a token is a set lookup. Every `sync_seconds` the set picks up
+    tokens revoked by other processes since the last sync; rows are read
+    with some overlap so a revocation committed late is not skipped. Every
+    `reload_seconds` the set is rebuilt from the unexpired rows, dropping
+    tokens that have expired anyway. Checks only ever read the table; the
+    expired rows are deleted by the prune-revoked-tokens command.
+    """
+
+    SYNC_OVERLAP = timedelta(seconds=60)
+
+    def __init__(self, sync_seconds, reload_seconds):
+        self.sync_seconds = sync_seconds
+        self.reload_seconds = reload_seconds
+        self._revoked = {}
+        self._synced_at = None
+        self._reloaded_at = None
+        self._watermark = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti):
+        now = time.monotonic()
+        if self._synced_at is None or now - self._synced_at >= self.sync_seconds:
+            self.sync()
+        return jti in self._revoked
+
+    def add(self, jti, expires_at):
+        """Record a revocation made by this process"""
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def sync(self):
+        """Pick up revocations from the table, reloading when due"""
+        now = time.monotonic()
+        if self._reloaded_at is None or now - self._reloaded_at >= self.reload_seconds:
+            self.reload()
+            return
+
+        started = datetime.utcnow()
+        rows = db.session.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at)
+            .where(RevokedToken.revoked_at >= self._watermark - self.SYNC_OVERLAP)
+        ).all()
+        with self._lock:
+            self._revoked.update(rows)
+            self._watermark = started
+            self._synced_at = now
+
+    def reload(self):
+        """Rebuild the set from the revocations that have not expired"""
+        started = datetime.utcnow()
+        rows = db.session.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at)
+            .where(RevokedToken.expires_at >= started)
+        ).all()
+        with self._lock:
+            self._revoked = dict(rows)
+            self._watermark = started
+            self._synced_at = self._reloaded_at = time.monotonic()
+
+
+class TokenService:
+    """Service issuing and checking access tokens"""
+
+    @staticmethod
+    def claims_for(user):
+        """
+        Claims embedded in a user's access token
+
+        Args:
+            user: User the token is issued to
+
+        Returns:
+            dict: role, volunteer_id and token version (tv)
+        """
+        return {
+            'role': user.role,
+            'volunteer_id': user.volunteer_id,
+            'tv': user.token_version or 0
+        }
+
+    @staticmethod
+    def issue(user):
+        """Create an access token for a user"""
+        return create_access_token(
+            identity=str(user.id),
+            additional_claims=TokenService.claims_for(user)
+        )
+
+    @staticmethod
+    def bump_version(user):
+        """
+        Invalidate every token issued to a user so far
+
+        Call this whenever the user's role or volunteer link changes. The
+        caller commits.
+
+        Args:
+            user: User whose tokens should be re-issued
+        """
+        user.token_version = (user.token_version or 0) + 1
+        get_token_versions().invalidate()
+
+    @staticmethod
+    def revoke(jwt_payload):
+        """
+        Revoke a single token until it expires
+
+        Args:
+            jwt_payload: Decoded token to revoke
+
+        Returns:
+            datetime: When the revocation can be forgotten
+        """
+        expires_at = datetime.utcfromtimestamp(jwt_payload['exp'])
+        db.session.execute(insert_ignore(RevokedToken).values(
+            jti=jwt_payload['jti'],
+            user_id=int(jwt_payload['sub']),
+            expires_at=expires_at,
+            revoked_at=datetime.utcnow()
+        ))
+        db.session.commit()
+        get_revocation_list().add(jwt_payload['jti'], expires_at)
+        return expires_at
+
+    @staticmethod
+    def prune_revocations():
+        """
+        Delete revocations of tokens that have expired anyway
+
+        Returns:
+            int: Number of revocations deleted
+        """
+        result = db.session.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow())
+        )
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def is_revoked(jwt_payload):
+        """Whether a decoded token was revoked individually"""
+        return jwt_payload['jti'] in get_revocation_list()
+
+    @staticmethod
+    def has_claims(jwt_payload):
+        """Whether a decoded token carries every claim of claims_for"""
+        return all(claim in jwt_payload for claim in ('role', 'volunteer_id', 'tv'))
+
+    @staticmethod
+    def is_current(jwt_payload):
+        """Whether a decoded token was issued at the user's current version"""
+        version = get_token_versions().get(int(jwt_payload['sub']))
+        return version is not None and jwt_payload.get('tv') == version
+
+
+def init_tokens(app, jwt):
+    """Create the token caches and reject revoked or outdated tokens"""
+    app.extensions['token_versions'] = TokenVersionCache(
+        app.config['TOKEN_VERSION_REFRESH_SECONDS']
+    )
+    app.extensions['revoked_tokens'] = RevocationList(
+        app.config['TOKEN_REVOCATION_SYNC_SECONDS'],
+        app.config['TOKEN_REVOCATION_RELOAD_SECONDS']
+    )
+
+    @jwt.token_in_blocklist_loader
+    def _token_revoked(jwt_header, jwt_payload):
+        return TokenService.is_revoked(jwt_payload) or not TokenService.is_current(jwt_payload)
+
+    # Tokens issued without the role claims would pass as a plain volunteer
+    @jwt.token_verification_loader
+    def _token_complete(jwt_header, jwt_payload):
+        return TokenService.has_claims(jwt_payload)
+
+    @jwt.token_verification_failed_loader
+    def _token_incomplete(jwt_header, jwt_payload):
+        return jsonify({'msg': 'Token is missing claims, please log in again'}), 401
+
+
+def get_token_versions():
+    """Return the current app's token version cache"""
+    return current_app.extensions['token_versions']
+
+
+def get_revocation_list():
+    """Return the current app's revoked token set"""
+    return current_app.extensions['revoked_tokens']
@@ -1,6 +1,8 @@
 """Validation service for scheduling rules"""
-from app.models import Signup, Shift
-from sqlalchemy import and_
+from app import db
+from app.models import Signup, Shift, Volunteer, VolunteerRuleCount
+from app.services.rules import get_rule_set
+from sqlalchemy import case, func
 
 
 class ValidationService:
@@ -11,12 +13,11 @@ class ValidationService:
         """
         Validate if a volunteer can sign up for a shift.
 
-        Implements the following rules:
-        1. Maximum Kakad signups: 2 total per volunteer
-        2. Maximum total signups: 4 total per volunteer (Kakad + Robes)
-        3. Maximum Thursday signups: 2 total per volunteer (any day of week)
-        4. Shift capacity: cannot exceed shift's capacity
-        5. No duplicates: volunteer cannot sign up for same shift twice
+        Checks, in order:
+        1. The scheduling rules (by default: at most 2 Kakad, 4 total and
+           2 Thursday signups per volunteer)
+        2. Shift capacity: cannot exceed shift's capacity
+        3. No duplicates: volunteer cannot sign up for same shift twice
 
         Args:
             volunteer_id: ID of the volunteer
@@ -29,51 +30,155 @@ class ValidationService:
         if not shift:
             return False, "Shift not found"
 
-        # Get all current signups for this volunteer (confirmed only)
-        volunteer_signups = Signup.query.filter(
-            Signup.volunteer_id == volunteer_id,
-            Signup.status == 'confirmed'
-        ).all()
-
-        # Rule 1: Check total Kakad signups (max 2)
-        kakad_count = sum(1 for s in volunteer_signups if s.shift.shift_type == 'Kakad')
-        if shift.shift_type == 'Kakad' and kakad_count >= 2:
-            return False, "Maximum Kakad signups (2) reached"
-
-        # Rule 2: Check total signups (max 4)
-        total_signups = len(volunteer_signups)
-        if total_signups >= 4:
-            return False, "Maximum total signups (4) reached"
-
-        # Rule 3: Check Thursday-specific limit (max 2)
-        # Thursday shifts include any shift on any Thursday date
-        if shift.day_name == 'Thursday':
-            thursday_count = sum(1 for s in volunteer_signups if s.shift.day_name == 'Thursday')
-            if thursday_count >= 2:
-                return False, "Maximum Thursday signups (2) reached"
-
-        # Rule 4: Check shift capacity
-        current_signups = Signup.query.filter(
-            Signup.shift_id == shift_id,
-            Signup.status == 'confirmed'
-        ).count()
+        rule_set = get_rule_set()
+        counters = ValidationService.get_signup_counters([volunteer_id], rule_set).get(
+            volunteer_id, rule_set.empty()
+        )
+        duplicate = db.session.query(
+            Signup.query.filter_by(volunteer_id=volunteer_id, shift_id=shift_id).exists()
+        ).scalar()
+
+        return ValidationService.check_rules(
+            shift, counters, shift.confirmed_count, duplicate, rule_set
+        )
+
+    @staticmethod
+    def check_rules(shift, counters, current_signups, duplicate=False, rule_set=None):
+        """
+        Apply the scheduling rules to precomputed counters.
+
+        Rules are checked in the same order as validate_signup so that the
+        first failing rule determines the error message.
+
+        Args:
+            shift: Shift the volunteer wants to sign up for
+            counters: The volunteer's counter vector for rule_set
+            current_signups: Number of confirmed signups on the shift
+            duplicate: Whether the volunteer already signed up for the shift
+            rule_set: Compiled rules; defaults to the current rules
+
+        Returns:
+            tuple: (is_valid: bool, error_message: str or None)
+        """
+        rule_set = rule_set or get_rule_set()
+
+        error_msg = rule_set.check(shift, counters)
+        if error_msg:
+            return False, error_msg
 
         if current_signups >= shift.capacity:
             return False, f"Shift is at full capacity ({shift.capacity})"
 
-        # Rule 5: Prevent duplicate signup
-        duplicate = Signup.query.filter(
-            and_(
-                Signup.volunteer_id == volunteer_id,
-                Signup.shift_id == shift_id
-            )
-        ).first()
-
         if duplicate:
             return False, "Already signed up for this shift"
 
         return True, None
 
+    @staticmethod
+    def get_signup_counters(volunteer_ids, rule_set=None):
+        """
+        Read the counter vectors of many volunteers.
+
+        Counts come from the volunteer_rule_counts ledger in a single query
+        regardless of how many volunteers are requested. Volunteers without
+        ledger rows are absent from the result.
+
+        Args:
+            volunteer_ids: Iterable of volunteer IDs
+            rule_set: Compiled rules; defaults to the current rules
+
+        Returns:
+            dict: volunteer_id -> counter vector
+        """
+        volunteer_ids = list(volunteer_ids)
+        if not volunteer_ids:
+            return {}
+
+        rule_set = rule_set or get_rule_set()
+        rows = {}
+        for volunteer_id, rule_key, count in db.session.query(
+            VolunteerRuleCount.volunteer_id,
+            VolunteerRuleCount.rule_key,
+            VolunteerRuleCount.count
+        ).filter(VolunteerRuleCount.volunteer_id.in_(volunteer_ids)):
+            rows.setdefault(volunteer_id, []).append((rule_key, count))
+
+        return {
+            volunteer_id: rule_set.vector(counts)
+            for volunteer_id, counts in rows.items()
+        }
+
+    @staticmethod
+    def validate_signups_batch(pairs, cumulative=False):
+        """
+        Validate many (volunteer_id, shift_id) pairs.
+
+        By default each pair is judged exactly as validate_signup would judge
+        it on its own. With cumulative=True the pairs are treated as a batch
+        of signups created in order: every accepted pair counts towards the
+        limits, capacity and duplicates of the pairs after it, so a
+        volunteer's third Kakad in the same batch is rejected.
+
+        Shifts, volunteer counters, shift occupancy and existing signups are
+        prefetched in bulk, so the number of queries does not depend on the
+        number of pairs.
+
+        Args:
+            pairs: List of (volunteer_id, shift_id) tuples
+            cumulative: Whether accepted pairs affect later pairs
+
+        Returns:
+            tuple: (results, counters) where results is a list of
+                (is_valid, error_message) in input order and counters maps
+                volunteer_id -> counter vector
+        """
+        rule_set = get_rule_set()
+        volunteer_ids = {volunteer_id for volunteer_id, _ in pairs}
+        shift_ids = {shift_id for _, shift_id in pairs}
+
+        shifts = {
+            shift.id: shift
+            for shift in Shift.query.filter(Shift.id.in_(shift_ids)).all()
+        } if shift_ids else {}
+        counters = ValidationService.get_signup_counters(volunteer_ids, rule_set)
+        occupancy = {shift.id: shift.confirmed_count for shift in shifts.values()}
+        existing = set(db.session.query(Signup.volunteer_id, Signup.shift_id).filter(
+            Signup.volunteer_id.in_(volunteer_ids),
+            Signup.shift_id.in_(shifts.keys())
+        ).all()) if shifts else set()
+
+        results = []
+        for volunteer_id, shift_id in pairs:
+            shift = shifts.get(shift_id)
+            if not shift:
+                results.append((False, "Shift not found"))
+                continue
+
+            volunteer_counters = counters.setdefault(volunteer_id, rule_set.empty())
+            result = ValidationService.check_rules(
+                shift, volunteer_counters, occupancy.get(shift_id, 0),
+                (volunteer_id, shift_id) in existing, rule_set
+            )
+            results.append(result)
+
+            if cumulative and result[0]:
+                counters[volunteer_id] = [
+                    current + delta for current, delta in
+                    zip(volunteer_counters, rule_set.deltas(shift))
+                ]
+                occupancy[shift_id] = occupancy.get(shift_id, 0) + 1
+                existing.add((volunteer_id, shift_id))
+
+        return results, {
+            volunteer_id: counters.get(volunteer_id, rule_set.empty())
+            for volunteer_id in volunteer_ids
+        }
+
+    @staticmethod
+    def stats_from_counters(counters, rule_set=None):
+        """Build the volunteer stats payload from a counter vector"""
+        return (rule_set or get_rule_set()).stats(counters)
+
     @staticmethod
     def get_volunteer_stats(volunteer_id):
         """
@@ -87,54 +192,83 @@ class ValidationService:
         Returns:
             dict: Statistics about volunteer's signups and remaining capacity
         """
-        signups = Signup.query.filter(
-            Signup.volunteer_id == volunteer_id,
-            Signup.status == 'confirmed'
-        ).all()
-
-        kakad_count = sum(1 for s in signups if s.shift.shift_type == 'Kakad')
-        total_count = len(signups)
-        thursday_count = sum(1 for s in signups if s.shift.day_name == 'Thursday')
-
-        return {
-            'kakad_signups': kakad_count,
-            'kakad_remaining': 2 - kakad_count,
-            'total_signups': total_count,
-            'total_remaining': 4 - total_count,
-            'thursday_signups': thursday_count,
-            'thursday_remaining': 2 - thursday_count
-        }
+        rule_set = get_rule_set()
+        counters = ValidationService.get_signup_counters([volunteer_id], rule_set).get(
+            volunteer_id, rule_set.empty()
+        )
+        return rule_set.stats(counters)
 
     @staticmethod
-    def find_eligible_volunteers(shift_id, exclude_volunteer_id=None):
+    def find_eligible_candidates(shift_id, exclude_volunteer_id=None):
         """
-        Find all volunteers eligible to sign up for a specific shift.
+        Find eligible volunteers for a shift together with their counters.
 
-        Used by coordinators to find substitute candidates.
+        Every volunteer's counter vector (pivoted from the ledger with one
+        aggregate per rule) and duplicate status are read in one grouped
+        query, so the number of statements does not depend on the number of
+        volunteers.
 
         Args:
             shift_id: ID of the shift
             exclude_volunteer_id: Optional volunteer ID to exclude
 
         Returns:
-            list: List of volunteer IDs who are eligible for this shift
+            list: (volunteer, counter vector) tuples for eligible volunteers
         """
-        from app.models import Volunteer
-
         shift = Shift.query.get(shift_id)
         if not shift:
             return []
 
-        all_volunteers = Volunteer.query.all()
-        eligible = []
+        # Rule 4 is the same for every volunteer, so check it once up front
+        current_signups = shift.confirmed_count
+        if current_signups >= shift.capacity:
+            return []
+
+        rule_set = get_rule_set()
+        count_columns = [
+            func.coalesce(func.max(case(
+                (VolunteerRuleCount.rule_key == key, VolunteerRuleCount.count)
+            )), 0)
+            for key in rule_set.keys
+        ]
+        rows = db.session.query(
+            Volunteer,
+            func.max(Signup.id).label('duplicate_id'),
+            *count_columns
+        ).outerjoin(
+            VolunteerRuleCount, VolunteerRuleCount.volunteer_id == Volunteer.id
+        ).outerjoin(
+            Signup, (Signup.volunteer_id == Volunteer.id) & (Signup.shift_id == shift_id)
+        ).group_by(Volunteer.id).order_by(Volunteer.id).all()
 
-        for volunteer in all_volunteers:
+        eligible = []
+        for volunteer, duplicate_id, *counters in rows:
             if exclude_volunteer_id and volunteer.id == exclude_volunteer_id:
                 continue
 
-            # Check if volunteer can sign up
-            is_valid, _ = ValidationService.validate_signup(volunteer.id, shift_id)
+            is_valid, _ = ValidationService.check_rules(
+                shift, counters, current_signups, duplicate_id is not None, rule_set
+            )
             if is_valid:
-                eligible.append(volunteer)
+                eligible.append((volunteer, counters))
 
         return eligible
+
+    @staticmethod
+    def find_eligible_volunteers(shift_id, exclude_volunteer_id=None):
+        """
+        Find all volunteers eligible to sign up for a specific shift.
+
+        Used by coordinators to find substitute candidates.
+
+        Args:
+            shift_id: ID of the shift
+            exclude_volunteer_id: Optional volunteer ID to exclude
+
+        Returns:
+            list: List of volunteers who are eligible for this shift
+        """
+        return [
+            volunteer for volunteer, _ in
+            ValidationService.find_eligible_candidates(shift_id, exclude_volunteer_id)
+        ]
@@ -0,0 +1 @@
+"""Local benchmarks and concurrency harnesses for the backend"""
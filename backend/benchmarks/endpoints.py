@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+"""
+Time every API endpoint against a synthetic dataset.
+
+Seeds a fresh SQLite (WAL) database with app.services.seeding (10k
+volunteers, two years of Kakad/Robes shifts and 200k signups by default),
+then sends each endpoint `--iterations` requests through the Flask test
+client. Write endpoints get fresh inputs on every iteration (idle
+volunteers, open seats, dates past the seeded range), so each request does
+the same work. For every endpoint the script records latency percentiles,
+the number of SQL statements per request and the response statuses, and
+writes them to a JSON file. Given a baseline file from an earlier run it
+reports the endpoints that got slower or issue more statements, and exits
+with status 1 if there are any.
+
+Usage (from backend/):
+    python -m benchmarks.endpoints --output baseline.json
+    python -m benchmarks.endpoints --baseline baseline.json --output current.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+import sqlalchemy
+from sqlalchemy import event
+
+from app import db
+from app.models import Shift, Signup, User, Volunteer
+from app.serialization import ENCODER
+from app.services.seeding import SeedService
+from app.services.tokens import TokenService
+from benchmarks.signup_storm import build_app
+
+# Pairs per bulk signup and roster commit request
+BATCH_PAIRS = 5
+
+
+class Case:
+    """
+    One endpoint under test
+
+    `request(i)` returns the path and test client keyword arguments of
+    iteration i; `record(i, response)` sees each response, e.g. to keep the
+    IDs created for a later case.
+    """
+
+    def __init__(self, method, rule, request, record=None):
+        self.method = method
+        self.rule = rule
+        self.request = request
+        self.record = record
+
+    @property
+    def name(self):
+        return f'{self.method} {self.rule}'
+
+
+class Fixtures:
+    """IDs, tokens and input pools shared by the cases"""
+
+    def __init__(self, app, summary, iterations):
+        self.iterations = iterations
+        with app.app_context():
+            coordinator = User.query.filter_by(username=summary['coordinator']).one()
+            volunteer_user = User.query.filter_by(username='volunteer0').one()
+            self.coordinator = {'Authorization': f'Bearer {TokenService.issue(coordinator)}'}
+            self.volunteer = {'Authorization': f'Bearer {TokenService.issue(volunteer_user)}'}
+            # Logout revokes the token it is called with
+            self.logout_tokens = [
+                {'Authorization': f'Bearer {TokenService.issue(volunteer_user)}'}
+                for _ in range(iterations)
+            ]
+
+            volunteer_ids = [volunteer_id for volunteer_id, in db.session.query(Volunteer.id).order_by(Volunteer.id)]
+            active = volunteer_ids[:len(volunteer_ids) - summary['idle_volunteers']]
+            self.volunteers = active[::max(1, len(active) // iterations)][:iterations]
+            # Volunteers without signups, so scheduling rules never reject them
+            self.idle = volunteer_ids[len(active):]
+
+            today = date.today()
+            self.upcoming = [shift_id for shift_id, in db.session.query(Shift.id).filter(
+                Shift.date >= today
+            ).order_by(Shift.date, Shift.id)]
+            self.shifts = self.upcoming[::max(1, len(self.upcoming) // iterations)][:iterations]
+            self.open_seats = [
+                [shift_id, capacity - confirmed]
+                for shift_id, capacity, confirmed in db.session.query(
+                    Shift.id, Shift.capacity, Shift.confirmed_count
+                ).filter(
+                    Shift.date >= today, Shift.confirmed_count < Shift.capacity
+                ).order_by(Shift.date, Shift.id)
+            ]
+            self.signup_ids = [signup_id for signup_id, in db.session.query(Signup.id).order_by(
+                Signup.id.desc()
+            ).limit(iterations)]
+
+        self.month = (today.replace(day=1).isoformat(), (today.replace(day=1) + timedelta(days=31)).isoformat())
+        # First free day after the seeded shifts
+        self.free_day = date.fromisoformat(summary['end_date']) + timedelta(days=1)
+        self.created = {}
+
+    def pairs(self, count):
+        """Take `count` (idle volunteer, open shift) pairs, each using up both"""
+        if len(self.idle) < count:
+            raise SystemExit('Out of idle volunteers for write cases; raise --volunteers or lower --iterations')
+        pairs = []
+        while len(pairs) < count:
+            if not self.open_seats:
+                raise SystemExit('Out of open seats for write cases; raise --days or lower --iterations')
+            seat = self.open_seats[0]
+            pairs.append({'volunteer_id': self.idle.pop(), 'shift_id': seat[0]})
+            seat[1] -= 1
+            if not seat[1]:
+                self.open_seats.pop(0)
+        return pairs
+
+    def keep(self, key):
+        """record() hook storing the ID in each successful response"""
+        def record(i, response):
+            if response.status_code < 300:
+                body = response.get_json()
+                self.created.setdefault(key, []).append(_find_id(body))
+        return record
+
+    def take(self, key, i):
+        created = self.created.get(key, [])
+        return created[i] if i < len(created) else 0
+
+
+def _find_id(body):
+    for key in ('job_id', 'id'):
+        if key in body:
+            return body[key]
+    if 'signup' in body:
+        return body['signup']['id']
+    raise KeyError('No ID in response')
+
+
+def build_cases(f):
+    """Cases in run order; later cases use what earlier ones created"""
+    co, vol = f.coordinator, f.volunteer
+
+    def day(offset):
+        return (f.free_day + timedelta(days=offset)).isoformat()
+
+    # Shifts created one per iteration and generated a week per iteration, past the seeded range
+    generated = f.iterations
+
+    return [
+        # Auth
+        Case('POST', '/api/auth/register', lambda i: ('/api/auth/register', {'json': {
+            'username': f'bench{i}', 'password': 'password123',
+            'name': f'Bench {i}', 'phone': f'+1666{i:07d}'
+        }})),
+        Case('POST', '/api/auth/login', lambda i: ('/api/auth/login', {'json': {
+            'username': 'volunteer0', 'password': 'password123'
+        }})),
+        Case('GET', '/api/auth/me', lambda i: ('/api/auth/me', {'headers': vol})),
+        Case('POST', '/api/auth/logout', lambda i: ('/api/auth/logout', {'headers': f.logout_tokens[i]})),
+
+        # Volunteers
+        Case('GET', '/api/volunteers', lambda i: ('/api/volunteers', {'headers': co})),
+        Case('POST', '/api/volunteers', lambda i: ('/api/volunteers', {'headers': co, 'json': {
+            'name': f'Bench volunteer {i}', 'phone': f'+1777{i:07d}'
+        }})),
+        Case('GET', '/api/volunteers/<int:volunteer_id>', lambda i: (
+            f'/api/volunteers/{f.volunteers[i % len(f.volunteers)]}', {'headers': co}
+        )),
+        Case('PUT', '/api/volunteers/<int:volunteer_id>', lambda i: (
+            f'/api/volunteers/{f.volunteers[i % len(f.volunteers)]}', {'headers': co, 'json': {
+                'email': f'bench{i}@example.org'
+            }}
+        )),
+        Case('GET', '/api/volunteers/<int:volunteer_id>/stats', lambda i: (
+            f'/api/volunteers/{f.volunteers[i % len(f.volunteers)]}/stats', {'headers': co}
+        )),
+
+        # Shifts
+        Case('GET', '/api/shifts', lambda i: ('/api/shifts', {'headers': vol, 'query_string': {
+            'start_date': f.month[0], 'end_date': f.month[1]
+        }})),
+        Case('POST', '/api/shifts', lambda i: ('/api/shifts', {'headers': co, 'json': {
+            'date': day(i), 'shift_type': 'Kakad'
+        }}), f.keep('shift')),
+        Case('GET', '/api/shifts/<int:shift_id>', lambda i: (
+            f'/api/shifts/{f.shifts[i % len(f.shifts)]}', {'headers': vol}
+        )),
+        Case('PUT', '/api/shifts/<int:shift_id>', lambda i: (
+            f'/api/shifts/{f.take("shift", i)}', {'headers': co, 'json': {'capacity': 2}}
+        )),
+        Case('DELETE', '/api/shifts/<int:shift_id>', lambda i: (
+            f'/api/shifts/{f.take("shift", i)}', {'headers': co}
+        )),
+        Case('POST', '/api/shifts/generate', lambda i: ('/api/shifts/generate', {'headers': co, 'json': {
+            'start_date': day(generated + 7 * i), 'end_date': day(generated + 7 * i + 6)
+        }})),
+        Case('POST', '/api/shifts/delete-range', lambda i: ('/api/shifts/delete-range', {'headers': co, 'json': {
+            'start_date': day(generated + 7 * i), 'end_date': day(generated + 7 * i + 6)
+        }})),
+
+        # Signups
+        Case('GET', '/api/signups', lambda i: ('/api/signups', {'headers': co, 'query_string': {
+            'expand': 'volunteer,shift'
+        }})),
+        Case('GET', '/api/signups/export', lambda i: ('/api/signups/export', {'headers': vol})),
+        Case('POST', '/api/signups/validate', lambda i: ('/api/signups/validate', {'headers': co, 'json': {
+            'volunteer_id': f.volunteers[i % len(f.volunteers)], 'shift_id': f.shifts[i % len(f.shifts)]
+        }})),
+        Case('POST', '/api/signups/validate/batch', lambda i: ('/api/signups/validate/batch', {'headers': co, 'json': {
+            'pairs': [
+                {'volunteer_id': volunteer_id, 'shift_id': f.shifts[(i + offset) % len(f.shifts)]}
+                for offset, volunteer_id in enumerate(f.volunteers[:20])
+            ]
+        }})),
+        Case('POST', '/api/signups', lambda i: ('/api/signups', {
+            'headers': co, 'json': f.pairs(1)[0]
+        }), f.keep('signup')),
+        Case('PUT', '/api/signups/<int:signup_id>/status', lambda i: (
+            f'/api/signups/{f.signup_ids[i % len(f.signup_ids)]}/status', {'headers': co, 'json': {
+                'status': 'cancelled'
+            }}
+        )),
+        Case('DELETE', '/api/signups/<int:signup_id>', lambda i: (
+            f'/api/signups/{f.take("signup", i)}', {'headers': co}
+        )),
+        Case('POST', '/api/signups/bulk', lambda i: ('/api/signups/bulk', {'headers': co, 'json': {
+            'signups': f.pairs(BATCH_PAIRS), 'mode': 'atomic'
+        }})),
+
+        # Coordinator
+        Case('GET', '/api/coordinator/dashboard', lambda i: ('/api/coordinator/dashboard', {'headers': co})),
+        Case('GET', '/api/coordinator/shifts/fill-status', lambda i: ('/api/coordinator/shifts/fill-status', {
+            'headers': co
+        })),
+        Case('GET', '/api/coordinator/volunteers/reliability', lambda i: (
+            '/api/coordinator/volunteers/reliability', {'headers': co, 'query_string': {'min_score': 90}}
+        )),
+        Case('GET', '/api/coordinator/substitutes', lambda i: ('/api/coordinator/substitutes', {
+            'headers': co, 'query_string': {'shift_id': f.shifts[i % len(f.shifts)]}
+        })),
+        Case('POST', '/api/coordinator/notifications/send', lambda i: ('/api/coordinator/notifications/send', {
+            'headers': co, 'json': {'volunteer_ids': f.volunteers[:10], 'message': f'Benchmark notice {i}'}
+        }), f.keep('job')),
+        Case('GET', '/api/coordinator/notifications/jobs/<int:job_id>', lambda i: (
+            f'/api/coordinator/notifications/jobs/{f.take("job", i)}', {'headers': co}
+        )),
+        Case('POST', '/api/coordinator/roster/preview', lambda i: ('/api/coordinator/roster/preview', {
+            'headers': co, 'json': {'start_date': f.month[0], 'end_date': (
+                date.fromisoformat(f.month[0]) + timedelta(days=6)
+            ).isoformat()}
+        })),
+        Case('POST', '/api/coordinator/roster/commit', lambda i: ('/api/coordinator/roster/commit', {
+            'headers': co, 'json': {'assignments': f.pairs(BATCH_PAIRS)}
+        })),
+
+        # Metrics
+        Case('GET', '/metrics', lambda i: ('/metrics', {'headers': co})),
+    ]
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of sorted values"""
+    return values[max(0, math.ceil(share * len(values)) - 1)]
+
+
+def run_case(client, case, iterations, statements):
+    latencies = []
+    counts = []
+    statuses = Counter()
+    for i in range(iterations):
+        path, kwargs = case.request(i)
+        statements[0] = 0
+        started = time.perf_counter()
+        response = client.open(path, method=case.method, **kwargs)
+        # Reads streamed bodies to the end too
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        latencies.append(elapsed * 1000)
+        counts.append(statements[0])
+        statuses[response.status_code] += 1
+        if case.record:
+            case.record(i, response)
+        response.close()
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p90_ms': round(percentile(latencies, 0.90), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'max_ms': round(latencies[-1], 3),
+        'sql_mean': round(statistics.fmean(counts), 2),
+        'sql_max': max(counts),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Endpoints slower than the baseline or issuing more statements"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        slower = current['p50_ms'] - previous['p50_ms']
+        if slower > min_delta_ms and current['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append(
+                f'{name}: p50 {previous["p50_ms"]:.1f} -> {current["p50_ms"]:.1f} ms'
+            )
+        if current['sql_mean'] > previous['sql_mean']:
+            regressions.append(
+                f'{name}: {previous["sql_mean"]} -> {current["sql_mean"]} statements per request'
+            )
+        if current['statuses'] != previous['statuses']:
+            regressions.append(
+                f'{name}: statuses {previous["statuses"]} -> {current["statuses"]}'
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--volunteers', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--signups', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--only', help='Run only endpoints whose rule contains this text')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results from an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p50 slowdown (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='Ignore p50 slowdowns below this')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'endpoints.db'), False)
+        started = time.perf_counter()
+        with app.app_context():
+            summary = SeedService.generate(
+                volunteers=args.volunteers, days=args.days, signups=args.signups, seed=args.seed
+            )
+        print(f'seeded {summary["signups"]} signups in {time.perf_counter() - started:.1f} s')
+
+        fixtures = Fixtures(app, summary, args.iterations)
+        cases = build_cases(fixtures)
+
+        rules = {
+            f'{method} {rule.rule}'
+            for rule in app.url_map.iter_rules() if rule.endpoint != 'static'
+            for method in rule.methods - {'HEAD', 'OPTIONS'}
+        }
+        uncovered = sorted(rules - {case.name for case in cases})
+
+        statements = [0]
+        with app.app_context():
+            engine = db.engine
+
+        def count(*_):
+            statements[0] += 1
+
+        event.listen(engine, 'before_cursor_execute', count)
+        client = app.test_client()
+        # Load per-process caches (rules, token versions) before timing
+        for headers in (fixtures.coordinator, fixtures.volunteer):
+            client.get('/api/auth/me', headers=headers)
+        results = {}
+        try:
+            for case in cases:
+                if args.only and args.only not in case.rule:
+                    continue
+                results[case.name] = run_case(client, case, args.iterations, statements)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+            engine.dispose()
+
+    print(f'{"endpoint":<56} {"p50":>8} {"p90":>8} {"p99":>8} {"sql":>6}  statuses')
+    for name, result in results.items():
+        print(
+            f'{name:<56} {result["p50_ms"]:>8.1f} {result["p90_ms"]:>8.1f} '
+            f'{result["p99_ms"]:>8.1f} {result["sql_mean"]:>6.1f}  {result["statuses"]}'
+        )
+    if uncovered:
+        print(f'endpoints without a case: {", ".join(uncovered)}')
+
+    meta = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'json_encoder': ENCODER,
+        'iterations': args.iterations,
+        'dataset': {key: summary[key] for key in ('volunteers', 'shifts', 'signups', 'users')},
+        'seed': args.seed
+    }
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({'meta': meta, 'endpoints': results}, handle, indent=2)
+        print(f'results written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        if baseline['meta']['dataset'] != meta['dataset'] or baseline['meta']['iterations'] != meta['iterations']:
+            print('warning: the baseline was recorded with a different dataset or iteration count')
+        regressions = compare(results, baseline['endpoints'], args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f'regression: {line}')
+        print(f'{len(regressions)} regressions against {args.baseline}')
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
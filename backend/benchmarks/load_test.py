@@ -0,0 +1,453 @@
+#!/usr/bin/env python
+"""
+Replay the monthly sign-up rush against a locally running app over HTTP.
+
+When the next month opens, volunteers log in, list its shifts, check their
+counts, validate and sign up, and cancel some signups. Meanwhile
+coordinators poll the dashboard and fill status. This script runs one
+thread per virtual user for a fixed time and reports throughput, p50, p95
+and p99 latency, and error rates per action. It then checks the month in
+the database for oversubscribed shifts, volunteers over a scheduling rule
+limit, and shift counters that disagree with the signup rows.
+
+By default the app is served by `--server-processes` pre-forked processes
+sharing one listening socket. Each process runs a threaded server against
+a temporary SQLite (WAL) database, or against `--database-url`, e.g. a
+local PostgreSQL. Notifications go to the in-memory fake sender, so
+nothing reaches Twilio. To test a server started some other way, pass its
+`--url` together with the `--database-url` it uses, and start it with
+NOTIFICATION_SENDER=fake.
+
+An empty database is first seeded with a synthetic history. The month
+gets the default Kakad/Robes shifts, and every run creates its own
+volunteer accounts. Rule counts cover all of a volunteer's signups, so
+volunteers with a history could rarely sign up at all. Repeated runs
+against one database should each open a different `--month`.
+
+The load generator runs in this process, so compare runs with the same
+number of users. A single client process tops out at roughly a thousand
+requests per second.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --users 100 --server-processes 2 --duration 30
+    python -m benchmarks.load_test --database-url postgresql://localhost/volunsched_load --month 2027-03
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+import requests
+from sqlalchemy import and_, func, insert, text
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import create_app, db
+from app.models import Shift, Signup, User, Volunteer
+from app.services.recurrence import DEFAULT_SHIFT_TEMPLATE, RecurrenceService
+from app.services.rules import get_rule_set
+from app.services.seeding import SeedService
+from benchmarks.endpoints import percentile
+
+# Relative weight of each volunteer action
+DEFAULT_MIX = {
+    'list_shifts': 30,
+    'stats': 10,
+    'validate': 20,
+    'signup': 25,
+    'cancel': 5,
+    'login': 5
+}
+
+
+class QuietHandler(WSGIRequestHandler):
+    """Request handler without per-request logging"""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def app_config(database_url):
+    """Config overrides for the served app and the setup/check app"""
+    if database_url.startswith('postgresql://'):
+        database_url = database_url.replace('postgresql://', 'postgresql+psycopg2://', 1)
+    config = {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'NOTIFICATION_SENDER': 'fake'
+    }
+    if database_url.startswith('sqlite'):
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+    return config
+
+
+def serve(fd, database_url):
+    """Worker process: serve the app on the inherited listening socket"""
+    app = create_app('production', config_overrides=app_config(database_url))
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler, fd=fd)
+    server.serve_forever()
+
+
+def month_range(value):
+    """First day of the month and first day of the next one"""
+    if value:
+        start = date.fromisoformat(f'{value}-01')
+    else:
+        start = (date.today().replace(day=1) + timedelta(days=32)).replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def prepare(app, args, start, end):
+    """Seed an empty database, create the month's shifts and this run's accounts"""
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            with db.engine.connect() as conn:
+                conn.execute(text('PRAGMA journal_mode=WAL'))
+
+        if not db.session.query(Volunteer.id).first():
+            summary = SeedService.generate(
+                volunteers=args.history_volunteers,
+                days=args.history_days,
+                signups=args.history_signups,
+                start=date.today() - timedelta(days=args.history_days),
+                seed=args.seed,
+                users=0
+            )
+            print(f'seeded {summary["signups"]} past signups for {summary["volunteers"]} volunteers')
+
+        created, _ = RecurrenceService.generate(DEFAULT_SHIFT_TEMPLATE, start, end)
+
+        # Accounts are unique to this run so earlier runs' signups never count against them
+        tag = f'{int(time.time()) % 1000000:06d}'
+        template = User()
+        template.set_password(args.password)
+        db.session.execute(insert(Volunteer), [
+            {'name': f'Rush volunteer {index}', 'phone': f'+1888{tag}{index:05d}'}
+            for index in range(args.users)
+        ])
+        volunteer_ids = [volunteer_id for volunteer_id, in db.session.query(Volunteer.id).filter(
+            Volunteer.phone.like(f'+1888{tag}%')
+        ).order_by(Volunteer.id)]
+        db.session.execute(insert(User), [
+            {
+                'username': f'rush-{tag}-{index}',
+                'password_hash': template.password_hash,
+                'role': 'volunteer',
+                'volunteer_id': volunteer_id
+            }
+            for index, volunteer_id in enumerate(volunteer_ids)
+        ] + [
+            {
+                'username': f'rush-{tag}-coordinator-{index}',
+                'password_hash': template.password_hash,
+                'role': 'coordinator',
+                'volunteer_id': None
+            }
+            for index in range(args.coordinators)
+        ])
+        db.session.commit()
+        print(f'{start:%B %Y}: {created} shifts created, {args.users} volunteer accounts')
+
+        usernames = [f'rush-{tag}-{index}' for index in range(args.users)]
+        coordinators = [f'rush-{tag}-coordinator-{index}' for index in range(args.coordinators)]
+        return usernames, coordinators, volunteer_ids
+
+
+class Stats:
+    """Latencies and outcomes per action, shared by the client threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, action, elapsed, status):
+        with self.lock:
+            self.latencies[action].append(elapsed * 1000)
+            self.statuses[action][status] += 1
+
+
+class Client:
+    """One virtual user's HTTP session"""
+
+    def __init__(self, base_url, stats):
+        self.base_url = base_url
+        self.stats = stats
+        self.session = requests.Session()
+        self.headers = {}
+
+    def call(self, action, method, path, **kwargs):
+        """Send a request, record its outcome and return the response or None"""
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.base_url + path, headers=self.headers, timeout=60, **kwargs
+            )
+        except requests.RequestException as e:
+            self.stats.record(action, time.perf_counter() - started, type(e).__name__)
+            return None
+        self.stats.record(action, time.perf_counter() - started, response.status_code)
+        return response
+
+    def login(self, username, password):
+        """Log in, keeping the token for later calls; returns the user or None"""
+        response = self.call('login', 'POST', '/api/auth/login', json={
+            'username': username, 'password': password
+        })
+        if response is None or response.status_code != 200:
+            return None
+        body = response.json()
+        self.headers = {'Authorization': f'Bearer {body["access_token"]}'}
+        return body['user']
+
+
+def volunteer_user(client, username, args, month, deadline, seed):
+    """Run one volunteer's session until the deadline"""
+    rng = random.Random(seed)
+    actions, weights = zip(*args.mix.items())
+    user = client.login(username, args.password)
+    if user is None:
+        return
+    volunteer_id = user['volunteer_id']
+    shift_ids = []
+    signup_ids = []
+
+    while time.monotonic() < deadline:
+        action = rng.choices(actions, weights)[0]
+        if action in ('validate', 'signup') and not shift_ids or action == 'cancel' and not signup_ids:
+            action = 'list_shifts'
+
+        if action == 'list_shifts':
+            response = client.call(action, 'GET', '/api/shifts', params={
+                'start_date': month[0].isoformat(), 'end_date': month[1].isoformat(), 'limit': 500
+            })
+            if response is not None and response.status_code == 200:
+                shifts = response.json()
+                shift_ids = [
+                    shift['id'] for shift in shifts if shift['current_signups'] < shift['capacity']
+                ] or [shift['id'] for shift in shifts]
+        elif action == 'stats':
+            client.call(action, 'GET', f'/api/volunteers/{volunteer_id}/stats')
+        elif action == 'validate':
+            client.call(action, 'POST', '/api/signups/validate', json={
+                'volunteer_id': volunteer_id, 'shift_id': rng.choice(shift_ids)
+            })
+        elif action == 'signup':
+            response = client.call(action, 'POST', '/api/signups', json={
+                'volunteer_id': volunteer_id, 'shift_id': rng.choice(shift_ids)
+            })
+            if response is not None and response.status_code == 201:
+                signup_ids.append(response.json()['signup']['id'])
+        elif action == 'cancel':
+            signup_id = signup_ids.pop(rng.randrange(len(signup_ids)))
+            client.call(action, 'DELETE', f'/api/signups/{signup_id}')
+        elif action == 'login':
+            client.login(username, args.password)
+
+        if args.think_ms:
+            time.sleep(rng.expovariate(1000 / args.think_ms))
+
+
+def coordinator_user(client, username, args, month, deadline):
+    """Poll the dashboard and the month's fill status until the deadline"""
+    if client.login(username, args.password) is None:
+        return
+    while time.monotonic() < deadline:
+        client.call('dashboard', 'GET', '/api/coordinator/dashboard')
+        client.call('fill_status', 'GET', '/api/coordinator/shifts/fill-status', params={
+            'start_date': month[0].isoformat(), 'end_date': month[1].isoformat()
+        })
+        time.sleep(args.poll_seconds)
+
+
+def check_month(app, start, end, volunteer_ids):
+    """Capacity, rule limit and counter violations for the month and this run's volunteers"""
+    with app.app_context():
+        confirmed = Signup.status == 'confirmed'
+        shifts = db.session.query(
+            Shift.capacity, Shift.confirmed_count, func.count(Signup.id)
+        ).outerjoin(
+            Signup, and_(Signup.shift_id == Shift.id, confirmed)
+        ).filter(
+            Shift.date >= start, Shift.date < end
+        ).group_by(Shift.id, Shift.capacity, Shift.confirmed_count).all()
+
+        rule_set = get_rule_set()
+        over_quota = 0
+        for _, *counts in db.session.query(
+            Signup.volunteer_id, *rule_set.count_columns(Shift)
+        ).join(Shift, Signup.shift_id == Shift.id).filter(
+            confirmed, Signup.volunteer_id.in_(volunteer_ids)
+        ).group_by(Signup.volunteer_id):
+            if any(count > rule.limit for rule, count in zip(rule_set.rules, counts)):
+                over_quota += 1
+
+        return {
+            'seats': sum(capacity for capacity, _, _ in shifts),
+            'confirmed_signups': sum(actual for _, _, actual in shifts),
+            'oversubscribed_shifts': sum(1 for capacity, _, actual in shifts if actual > capacity),
+            'volunteers_over_quota': over_quota,
+            'counter_drift_shifts': sum(1 for _, counter, actual in shifts if counter != actual)
+        }
+
+
+def summarize(stats, duration):
+    """Per-action and total throughput, latency percentiles and outcome counts"""
+    rows = {}
+    actions = list(stats.latencies) + ['total']
+    for action in actions:
+        if action == 'total':
+            latencies = [value for values in stats.latencies.values() for value in values]
+            statuses = sum(stats.statuses.values(), Counter())
+        else:
+            latencies = stats.latencies[action]
+            statuses = stats.statuses[action]
+        latencies = sorted(latencies)
+        count = len(latencies)
+        if not count:
+            continue
+        # 4xx are business rejections (full shift, rule limit); 5xx and transport failures are errors
+        errors = sum(n for status, n in statuses.items() if not isinstance(status, int) or status >= 500)
+        rejected = sum(n for status, n in statuses.items() if isinstance(status, int) and 400 <= status < 500)
+        rows[action] = {
+            'requests': count,
+            'throughput_rps': round(count / duration, 1),
+            'p50_ms': round(percentile(latencies, 0.50), 1),
+            'p95_ms': round(percentile(latencies, 0.95), 1),
+            'p99_ms': round(percentile(latencies, 0.99), 1),
+            'ok': count - errors - rejected,
+            'rejected': rejected,
+            'errors': errors,
+            'error_rate': round(errors / count, 4),
+            'statuses': {str(status): n for status, n in sorted(statuses.items(), key=str)}
+        }
+    return rows
+
+
+def parse_mix(value):
+    mix = dict(DEFAULT_MIX)
+    for part in value.split(','):
+        action, _, weight = part.partition('=')
+        if action.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f'Unknown action {action!r}; known: {", ".join(DEFAULT_MIX)}')
+        mix[action.strip()] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Base URL of an already running app; needs --database-url')
+    parser.add_argument('--database-url', help='Database to seed, serve and check; default a temporary SQLite file')
+    parser.add_argument('--server-processes', type=int, default=2, help='Pre-forked server processes')
+    parser.add_argument('--month', help='Month that opens (YYYY-MM); defaults to next month')
+    parser.add_argument('--users', type=int, default=100, help='Concurrent volunteers')
+    parser.add_argument('--coordinators', type=int, default=2, help='Concurrent coordinators')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load')
+    parser.add_argument('--think-ms', type=float, default=0, help='Mean pause between a volunteer\'s requests')
+    parser.add_argument('--poll-seconds', type=float, default=1, help='Coordinator polling interval')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='Action weights, e.g. signup=50,cancel=0')
+    parser.add_argument('--history-volunteers', type=int, default=2000)
+    parser.add_argument('--history-days', type=int, default=365)
+    parser.add_argument('--history-signups', type=int, default=50000)
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the report to this JSON file')
+    args = parser.parse_args()
+
+    if args.url and not args.database_url:
+        parser.error('--url needs the --database-url of the running app')
+
+    month = month_range(args.month)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f'sqlite:///{os.path.join(tmp, "load.db")}'
+        app = create_app('production', config_overrides=app_config(database_url))
+        usernames, coordinators, volunteer_ids = prepare(app, args, *month)
+        with app.app_context():
+            db.engine.dispose()
+
+        workers = []
+        base_url = args.url
+        if not base_url:
+            listener = socket.create_server(('127.0.0.1', 0), backlog=1024)
+            base_url = f'http://127.0.0.1:{listener.getsockname()[1]}'
+            context = multiprocessing.get_context('fork')
+            workers = [
+                context.Process(target=serve, args=(listener.fileno(), database_url), daemon=True)
+                for _ in range(args.server_processes)
+            ]
+            for worker in workers:
+                worker.start()
+
+        stats = Stats()
+        deadline = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(target=volunteer_user, args=(
+                Client(base_url, stats), username, args, month, deadline, args.seed + index
+            ))
+            for index, username in enumerate(usernames)
+        ] + [
+            threading.Thread(target=coordinator_user, args=(
+                Client(base_url, stats), username, args, month, deadline
+            ))
+            for username in coordinators
+        ]
+        print(f'{len(threads)} users against {base_url} for {args.duration:g} s')
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - started
+
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+
+        report = {
+            'config': {
+                'users': args.users,
+                'coordinators': args.coordinators,
+                'server_processes': None if args.url else args.server_processes,
+                'database': database_url.split(':', 1)[0],
+                'month': f'{month[0]:%Y-%m}',
+                'duration_s': round(duration, 1),
+                'think_ms': args.think_ms,
+                'mix': args.mix
+            },
+            'actions': summarize(stats, duration),
+            'checks': check_month(app, *month, volunteer_ids)
+        }
+        with app.app_context():
+            db.engine.dispose()
+
+    print(f'\n{"action":<12} {"requests":>9} {"rps":>8} {"p50":>8} {"p95":>8} {"p99":>8} '
+          f'{"ok":>7} {"rejected":>9} {"errors":>7}')
+    for action, row in report['actions'].items():
+        print(
+            f'{action:<12} {row["requests"]:>9} {row["throughput_rps"]:>8.1f} {row["p50_ms"]:>8.1f} '
+            f'{row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f} {row["ok"]:>7} {row["rejected"]:>9} {row["errors"]:>7}'
+        )
+    print()
+    for key, value in report['checks'].items():
+        print(f'{key:>24}: {value}')
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f'report written to {args.output}')
+
+    checks = report['checks']
+    violations = checks['oversubscribed_shifts'] + checks['volunteers_over_quota'] + checks['counter_drift_shifts']
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Measure the per-request cost of the metrics instrumentation.
+
+Two apps share one seeded SQLite database, one with METRICS_ENABLED and
+one without. Both send the same requests through the test client, in
+alternating rounds so that drift affects both alike. The script reports
+the best round's time per request of each and the difference, which on
+a busy machine is within timing noise. The cost of the recording calls
+alone is timed separately, together with rendering /metrics once every
+endpoint has recorded values.
+
+Usage (from backend/):
+    python -m benchmarks.metrics_overhead --requests 200 --rounds 7
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from app import create_app, db
+from app.models import Shift, User
+from app.services.metrics import Metrics, RequestState, _request_state
+from app.services.seeding import SeedService
+from app.services.tokens import TokenService
+
+
+def build(path, enabled):
+    return create_app('testing', config_overrides={
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'METRICS_ENABLED': enabled
+    })
+
+
+def time_requests(client, method, path, kwargs, count):
+    """Mean seconds per request over `count` requests"""
+    started = time.perf_counter()
+    for _ in range(count):
+        response = client.open(path, method=method, **kwargs)
+        response.get_data()
+        # Metrics are recorded when the server closes the response
+        response.close()
+    return (time.perf_counter() - started) / count
+
+
+def time_recording(count):
+    """Seconds spent recording one request and one statement, without Flask or SQLAlchemy"""
+    metrics = Metrics()
+    started = time.perf_counter()
+    for _ in range(count):
+        state = RequestState()
+        _request_state.set(state)
+        metrics.finish_request(state, 'GET', '/api/shifts', 200)
+    per_request = (time.perf_counter() - started) / count
+
+    started = time.perf_counter()
+    for _ in range(count):
+        metrics.observe_statement(0.0001)
+    per_statement = (time.perf_counter() - started) / count
+    _request_state.set(None)
+    return per_request, per_statement
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint per round')
+    parser.add_argument('--rounds', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'metrics.db')
+        enabled = build(path, True)
+        with enabled.app_context():
+            summary = SeedService.generate(volunteers=1000, days=120, signups=10000, users=10)
+            coordinator = User.query.filter_by(username=summary['coordinator']).one()
+            volunteer = User.query.filter_by(username='volunteer0').one()
+            co = {'Authorization': f'Bearer {TokenService.issue(coordinator)}'}
+            vol = {'Authorization': f'Bearer {TokenService.issue(volunteer)}'}
+            shift_id = db.session.query(Shift.id).filter(Shift.date >= date.today()).order_by(Shift.date).first()[0]
+            volunteer_id = volunteer.volunteer_id
+        disabled = build(path, False)
+
+        start = date.today()
+        cases = [
+            ('GET /api/auth/me', 'GET', '/api/auth/me', {'headers': vol}),
+            ('GET /api/shifts', 'GET', '/api/shifts', {'headers': vol, 'query_string': {
+                'start_date': start.isoformat(), 'end_date': (start + timedelta(days=31)).isoformat()
+            }}),
+            ('GET /api/volunteers/<id>/stats', 'GET', f'/api/volunteers/{volunteer_id}/stats', {'headers': vol}),
+            ('POST /api/signups/validate', 'POST', '/api/signups/validate', {'headers': vol, 'json': {
+                'volunteer_id': volunteer_id, 'shift_id': shift_id
+            }}),
+            ('GET /api/coordinator/dashboard', 'GET', '/api/coordinator/dashboard', {'headers': co})
+        ]
+
+        clients = {'off': disabled.test_client(), 'on': enabled.test_client()}
+        # Fill per-app caches (token versions, rules, snapshots) before timing
+        for _, method, url, kwargs in cases:
+            for client in clients.values():
+                time_requests(client, method, url, kwargs, 5)
+        results = []
+        for label, method, url, kwargs in cases:
+            timings = {'off': [], 'on': []}
+            for _ in range(args.rounds):
+                for name, client in clients.items():
+                    timings[name].append(time_requests(client, method, url, kwargs, args.requests))
+            off = min(timings['off'])
+            on = min(timings['on'])
+            results.append((label, off, on))
+
+        client = clients['on']
+        started = time.perf_counter()
+        body = client.get('/metrics', headers=co).get_data()
+        render_ms = (time.perf_counter() - started) * 1000
+
+        for app in (enabled, disabled):
+            with app.app_context():
+                db.engine.dispose()
+
+    print(f'{"endpoint":<32} {"off us":>9} {"on us":>9} {"overhead us":>12} {"%":>6}')
+    for label, off, on in results:
+        print(f'{label:<32} {off * 1e6:>9.0f} {on * 1e6:>9.0f} {(on - off) * 1e6:>12.0f} {(on - off) / off * 100:>6.1f}')
+    print(f'GET /metrics: {render_ms:.1f} ms for {len(body)} bytes')
+    per_request, per_statement = time_recording(100000)
+    print(f'recording alone: {per_request * 1e6:.1f} us per request, {per_statement * 1e6:.1f} us per statement')
+
+
+if __name__ == '__main__':
+    main()
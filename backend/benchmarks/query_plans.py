@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""
+Check that the signup and shift hot paths are served by indexes.
+
+Seeds a fresh SQLite database with app.services.seeding, runs ANALYZE
+and then exercises each hot path: signup validation and creation,
+volunteer stats, filtered signup lists, shift listings and detail, the
+coordinator views, next-day reminders and the counter checks. Every
+statement they issue is captured and run again under EXPLAIN QUERY PLAN.
+A plan step that scans a whole table (`SCAN <table>` without an index) is
+reported unless the case expects it, e.g. totals over every shift, and
+the script exits with status 1 if there are any, so a change that drops
+an index or rewrites a query past one cannot go unnoticed.
+
+Usage (from backend/):
+    python -m benchmarks.query_plans
+    python -m benchmarks.query_plans --verbose
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import event, text
+
+from app import db
+from app.services.counters import CounterService
+from app.services.reminders import ReminderService
+from app.services.seeding import SeedService
+from benchmarks.endpoints import Fixtures
+from benchmarks.signup_storm import build_app
+
+# A plan step reading every row of a table; "SCAN t USING [COVERING] INDEX" is fine
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+# SQLite builds a throwaway index from a full scan when no index fits
+AUTOMATIC_INDEX = re.compile(r'^(?:SEARCH|SCAN) (\w+)(?: AS \w+)? USING AUTOMATIC')
+
+# Statements with a plan worth checking
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+
+class PlanCase:
+    """
+    One hot path
+
+    `run(client)` does the work, through the test client or a service call.
+    Full scans of the tables in `scans` are expected, e.g. aggregates over
+    every row; any other full scan is a violation.
+    """
+
+    def __init__(self, name, run, scans=()):
+        self.name = name
+        self.run = run
+        self.scans = set(scans)
+
+
+def build_cases(app, f):
+    co, vol = f.coordinator, f.volunteer
+    volunteer_id = f.volunteers[0]
+    shift_id = f.shifts[0]
+
+    def get(path, headers, **query):
+        def run(client):
+            response = client.get(path, headers=headers, query_string=query)
+            response.get_data()
+            response.close()
+        return run
+
+    def post(path, headers, json):
+        def run(client):
+            client.post(path, headers=headers, json=json).close()
+        return run
+
+    def service(call):
+        def run(client):
+            with app.app_context():
+                call()
+        return run
+
+    created = []
+
+    def create_signup(client):
+        response = client.post('/api/signups', headers=co, json=f.pairs(1)[0])
+        created.append(response.get_json()['signup']['id'])
+        response.close()
+
+    def cancel_signup(client):
+        client.delete(f'/api/signups/{created.pop()}', headers=co).close()
+
+    return [
+        PlanCase('validate signup', post('/api/signups/validate', co, {
+            'volunteer_id': volunteer_id, 'shift_id': shift_id
+        })),
+        PlanCase('validate signup batch', post('/api/signups/validate/batch', co, {
+            'pairs': [{'volunteer_id': v, 'shift_id': shift_id} for v in f.volunteers[:5]]
+        })),
+        PlanCase('create signup', create_signup),
+        PlanCase('cancel signup', cancel_signup),
+        PlanCase('volunteer stats', get(f'/api/volunteers/{volunteer_id}/stats', co)),
+        PlanCase('own signups', get('/api/signups', vol, status='confirmed')),
+        PlanCase('signups of a volunteer', get('/api/signups', co, volunteer_id=volunteer_id, status='confirmed')),
+        PlanCase('signups of a shift', get('/api/signups', co, shift_id=shift_id, status='confirmed', expand='volunteer')),
+        PlanCase('shift listing', get('/api/shifts', vol, start_date=f.month[0], end_date=f.month[1])),
+        PlanCase('shift detail', get(f'/api/shifts/{shift_id}', vol)),
+        # Headline totals count every volunteer and shift by design
+        PlanCase('dashboard', get('/api/coordinator/dashboard', co), scans=('volunteers', 'shifts')),
+        PlanCase('fill status', get('/api/coordinator/shifts/fill-status', co)),
+        # Every volunteer is a candidate
+        PlanCase('substitutes', get('/api/coordinator/substitutes', co, shift_id=shift_id), scans=('volunteers',)),
+        PlanCase('next-day reminders', service(
+            lambda: ReminderService.queue_reminders(date.today() + timedelta(days=1))
+        )),
+        # Checks every shift by design; each shift's signups must come from an index
+        PlanCase('shift counter check', service(
+            lambda: CounterService.rebuild_shift_counts(check_only=True)
+        ), scans=('shifts',)),
+        # Reads every confirmed signup by design, but from an index
+        PlanCase('quota ledger check', service(
+            lambda: CounterService.rebuild_volunteer_quotas(check_only=True)
+        ), scans=('volunteer_rule_counts',)),
+    ]
+
+
+def explain(conn, statement, parameters):
+    """Plan steps of a statement as EXPLAIN QUERY PLAN detail strings"""
+    return [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--volunteers', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--signups', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--verbose', action='store_true', help='Print every plan, not only violations')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'plans.db'), False)
+        with app.app_context():
+            summary = SeedService.generate(
+                volunteers=args.volunteers, days=args.days, signups=args.signups, seed=args.seed
+            )
+            # Plans as they would be on a database with statistics
+            with db.engine.begin() as conn:
+                conn.execute(text('ANALYZE'))
+            engine = db.engine
+
+        fixtures = Fixtures(app, summary, 1)
+        cases = build_cases(app, fixtures)
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().split(None, 1)[0].upper() in EXPLAINABLE:
+                captured.append((statement, parameters[0] if executemany else parameters))
+
+        client = app.test_client()
+        # Load per-process caches (rules, token versions) before capturing
+        for headers in (fixtures.coordinator, fixtures.volunteer):
+            client.get('/api/auth/me', headers=headers).close()
+        violations = []
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            for case in cases:
+                captured.clear()
+                case.run(client)
+                statements = list(captured)
+                captured.clear()
+
+                print(f'{case.name}: {len(statements)} statements')
+                with engine.connect() as conn:
+                    for statement, parameters in statements:
+                        plan = explain(conn, statement, parameters)
+                        scanned = [
+                            match.group(1) for match in (
+                                FULL_SCAN.match(line) or AUTOMATIC_INDEX.match(line) for line in plan
+                            )
+                            if match and match.group(1) not in case.scans
+                        ]
+                        if scanned:
+                            violations.append((case.name, scanned, statement, plan))
+                        if args.verbose or scanned:
+                            print(f'  {" ".join(statement.split())[:160]}')
+                            for line in plan:
+                                print(f'    {line}')
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+            engine.dispose()
+
+    for name, scanned, _, _ in violations:
+        print(f'full scan: {name} reads every row of {", ".join(scanned)}')
+    print(f'{len(violations)} statements with unexpected full table scans')
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Generate and commit a roster for a large synthetic month.
+
+Seeds volunteers with random reliability scores and some existing signups,
+then calls the roster preview endpoint, commits the proposal and checks
+that no shift or volunteer ends up over its limits. The preview's coverage
+is compared with a greedy fill that takes the most reliable eligible
+volunteer shift by shift, as a coordinator would with the substitutes tool.
+
+Usage (from backend/):
+    python -m benchmarks.roster --volunteers 5000 --days 60
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from app import db
+from app.models import Shift, Signup, Volunteer
+from app.services.counters import CounterService
+from app.services.rules import get_rule_set
+from benchmarks.signup_storm import build_app, check_limits, seed
+
+
+def add_existing_signups(app, share, rng):
+    """Give a share of the volunteers one or two confirmed signups"""
+    with app.app_context():
+        volunteer_ids = [volunteer_id for volunteer_id, in db.session.query(Volunteer.id)]
+        shift_ids = [shift_id for shift_id, in db.session.query(Shift.id)]
+        for volunteer_id in volunteer_ids:
+            db.session.query(Volunteer).filter_by(id=volunteer_id).update(
+                {'reliability_score': rng.randint(40, 100)}
+            )
+        rows = set()
+        for volunteer_id in rng.sample(volunteer_ids, int(len(volunteer_ids) * share)):
+            for shift_id in rng.sample(shift_ids, rng.randint(1, 2)):
+                rows.add((volunteer_id, shift_id))
+        db.session.add_all([
+            Signup(volunteer_id=volunteer_id, shift_id=shift_id)
+            for volunteer_id, shift_id in rows
+        ])
+        db.session.commit()
+
+        # Drop signups that overfill a shift, then count the rest
+        for shift in Shift.query.all():
+            extra = Signup.query.filter_by(shift_id=shift.id).order_by(Signup.id).offset(shift.capacity).all()
+            for signup in extra:
+                db.session.delete(signup)
+        db.session.commit()
+        CounterService.rebuild_shift_counts()
+        CounterService.rebuild_volunteer_quotas()
+        return Signup.query.count()
+
+
+def greedy_fill(app, start, end):
+    """Seats a shift-by-shift most-reliable-first fill would cover"""
+    with app.app_context():
+        rule_set = get_rule_set()
+        volunteers = db.session.query(Volunteer.id).order_by(
+            Volunteer.reliability_score.desc(), Volunteer.id
+        ).all()
+        from app.services.validation import ValidationService
+        counters = ValidationService.get_signup_counters([v.id for v in volunteers], rule_set)
+        taken = set(db.session.query(Signup.volunteer_id, Signup.shift_id))
+        filled = 0
+        for shift in Shift.query.filter(Shift.date >= start, Shift.date < end).order_by(Shift.date, Shift.shift_type):
+            seats = shift.capacity - shift.confirmed_count
+            for volunteer_id, in volunteers:
+                if not seats:
+                    break
+                vector = counters.setdefault(volunteer_id, rule_set.empty())
+                if (volunteer_id, shift.id) in taken or rule_set.check(shift, vector):
+                    continue
+                counters[volunteer_id] = [c + d for c, d in zip(vector, rule_set.deltas(shift))]
+                seats -= 1
+                filled += 1
+        return filled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--volunteers', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=60, help='Days of Kakad and Robes shifts')
+    parser.add_argument('--existing', type=float, default=0.02, help='Share of volunteers with signups')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'roster.db'), False)
+        token, _, _ = seed(app, args.volunteers, args.days)
+        existing = add_existing_signups(app, args.existing, rng)
+        headers = {'Authorization': f'Bearer {token}'}
+        start = date.today() + timedelta(days=1)
+        end = start + timedelta(days=args.days)
+        client = app.test_client()
+
+        greedy = greedy_fill(app, start, end)
+
+        started = time.perf_counter()
+        response = client.post('/api/coordinator/roster/preview', headers=headers, json={
+            'start_date': start.isoformat(),
+            'end_date': (end - timedelta(days=1)).isoformat()
+        })
+        preview_s = time.perf_counter() - started
+        roster = response.get_json()
+        if response.status_code != 200:
+            sys.exit(f'preview failed: {response.status_code} {roster}')
+
+        started = time.perf_counter()
+        response = client.post('/api/coordinator/roster/commit', headers=headers, json={
+            'assignments': roster['assignments'],
+            'mode': 'atomic'
+        })
+        commit_s = time.perf_counter() - started
+        committed = response.get_json()
+
+        oversubscribed, over_quota, confirmed_total = check_limits(app)
+        with app.app_context():
+            drift = CounterService.rebuild_volunteer_quotas(check_only=True)
+            db.engine.dispose()
+
+    stats = roster['stats']
+    summary = {
+        'volunteers': args.volunteers,
+        'existing_signups': existing,
+        'open_shifts': stats['open_shifts'],
+        'open_seats': stats['open_seats'],
+        'filled_seats': stats['filled_seats'],
+        'greedy_filled_seats': greedy,
+        'candidate_edges': stats['candidate_edges'],
+        'repair_rounds': stats['repair_rounds'],
+        'solve_ms': stats['solve_ms'],
+        'preview_s': round(preview_s, 3),
+        'commit_status': response.status_code,
+        'committed': committed.get('created'),
+        'commit_s': round(commit_s, 3),
+        'confirmed_signups': confirmed_total,
+        'oversubscribed_shifts': oversubscribed,
+        'volunteers_over_quota': over_quota,
+        'ledger_drift': drift
+    }
+    for key, value in summary.items():
+        print(f'{key:>22}: {value}')
+
+    sys.exit(1 if oversubscribed or over_quota or drift or response.status_code != 201 else 0)
+
+
+if __name__ == '__main__':
+    main()
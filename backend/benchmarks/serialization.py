@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+Compare response serialization paths on 10k-row payloads.
+
+Builds the signup listing (with volunteer and shift expanded) and the
+coordinator fill-status for 10k rows each, once the previous way (ORM
+objects, to_dict() and Flask's default JSON provider) and once through
+app.serialization (result tuples, RowSerializer and the fast encoder,
+with the standard library encoder as fallback). Each path is checked to
+produce the same JSON document. The streaming export is timed through the
+test client, with peak Python memory of the listed and streamed bodies.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --rows 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import Shift, Signup, Volunteer
+from app.routes.coordinator import _build_fill_status
+from app.serialization import ENCODERS, SHIFT_ROWS, SIGNUP_ROWS, VOLUNTEER_ROWS
+from benchmarks.signup_storm import build_app, seed
+
+
+def add_signups(app, count, rng):
+    """Insert `count` distinct signups in one statement"""
+    with app.app_context():
+        volunteer_ids = [volunteer_id for volunteer_id, in db.session.query(Volunteer.id)]
+        shift_ids = [shift_id for shift_id, in db.session.query(Shift.id)]
+        pairs = set()
+        while len(pairs) < count:
+            pairs.add((rng.choice(volunteer_ids), rng.choice(shift_ids)))
+        db.session.execute(insert(Signup), [
+            {'volunteer_id': volunteer_id, 'shift_id': shift_id}
+            for volunteer_id, shift_id in pairs
+        ])
+        db.session.commit()
+
+
+def best_of(repeat, fn):
+    """Best wall time of `repeat` calls and the last result"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def legacy_signups(provider):
+    signups = Signup.query.options(
+        joinedload(Signup.volunteer), joinedload(Signup.shift)
+    ).order_by(Signup.id.desc()).all()
+    return provider.dumps([s.to_dict() for s in signups]).encode()
+
+
+def tuple_signups(encode):
+    serializer = SIGNUP_ROWS.expand(volunteer=VOLUNTEER_ROWS, shift=SHIFT_ROWS)
+    rows = db.session.query(*serializer.select_columns()).select_from(Signup).join(
+        Volunteer, Signup.volunteer_id == Volunteer.id
+    ).join(
+        Shift, Signup.shift_id == Shift.id
+    ).order_by(Signup.id.desc())
+    return encode(serializer.rows(rows))
+
+
+def legacy_fill_status(provider, start, end):
+    shifts = Shift.query.filter(Shift.date >= start, Shift.date < end).order_by(Shift.date).all()
+    return provider.dumps([{
+        'shift': shift.to_dict(),
+        'current_signups': shift.confirmed_count,
+        'fill_percentage': round(shift.confirmed_count / shift.capacity * 100, 1),
+        'is_full': shift.confirmed_count >= shift.capacity,
+        'is_understaffed': shift.confirmed_count < shift.capacity
+    } for shift in shifts]).encode()
+
+
+def peak_memory(fn):
+    """Peak traced Python allocation while running fn, in KiB"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    results = []
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'serialization.db'), False)
+        # Two shifts per day, so rows / 2 days give `rows` shifts
+        token, _, _ = seed(app, max(args.rows // 5, 100), args.rows // 2)
+        add_signups(app, args.rows, rng)
+        start = date.today()
+        end = start + timedelta(days=args.rows // 2 + 2)
+
+        with app.app_context():
+            provider = DefaultJSONProvider(app)
+            cases = {
+                'signups': [('orm + to_dict + flask json', lambda: legacy_signups(provider))] + [
+                    (f'tuples + {name}', lambda encode=encode: tuple_signups(encode))
+                    for name, encode in ENCODERS.items()
+                ],
+                'fill-status': [('orm + to_dict + flask json', lambda: legacy_fill_status(provider, start, end))] + [
+                    (f'tuples + {name}', lambda encode=encode: encode(_build_fill_status(start, end)))
+                    for name, encode in ENCODERS.items()
+                ]
+            }
+            for payload, paths in cases.items():
+                reference = None
+                for label, fn in paths:
+                    elapsed, body = best_of(args.repeat, fn)
+                    document = json.loads(body)
+                    if reference is None:
+                        reference = document
+                    elif document != reference:
+                        mismatches += 1
+                    results.append((payload, label, len(document), elapsed, len(body)))
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        query = {'expand': 'volunteer,shift'}
+
+        def export():
+            response = client.get('/api/signups/export', headers=headers, query_string=query)
+            return b''.join(response.response)
+
+        elapsed, body = best_of(args.repeat, export)
+        results.append(('signups', 'streamed export (HTTP)', len(json.loads(body)), elapsed, len(body)))
+
+        with app.app_context():
+            encode = ENCODERS['orjson' if 'orjson' in ENCODERS else 'json']
+            listed_kib = peak_memory(lambda: tuple_signups(encode))
+        streamed_kib = peak_memory(export)
+        with app.app_context():
+            db.engine.dispose()
+
+    print(f'{"payload":<12} {"path":<28} {"rows":>6} {"ms":>8} {"bytes":>10}')
+    for payload, label, rows, elapsed, size in results:
+        print(f'{payload:<12} {label:<28} {rows:>6} {elapsed * 1000:>8.1f} {size:>10}')
+    print(f'peak memory: listed body {listed_kib} KiB, streamed export {streamed_kib} KiB')
+    print(f'documents differing from the ORM path: {mismatches}')
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+Simulate the sign-up opening storm against a local SQLite (WAL) database.
+
+Many threads post signups for a small set of shifts at the same time, once
+with direct writes and once through the per-shift admission queue. For each
+run the script reports throughput, the outcome of every request and whether
+any shift or volunteer ended up over its limits.
+
+Usage (from backend/):
+    python -m benchmarks.signup_storm --threads 32 --requests 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from sqlalchemy import func, text
+
+from app import create_app, db
+from app.models import Shift, Signup, User, Volunteer
+from app.services.tokens import TokenService
+from app.services.rules import get_rule_set
+
+
+def build_app(path, use_queue):
+    """Create an app bound to a fresh SQLite file in WAL mode"""
+    app = create_app('testing', config_overrides={
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}},
+        'SIGNUP_ADMISSION_QUEUE': use_queue
+    })
+    with app.app_context():
+        with db.engine.connect() as conn:
+            conn.execute(text('PRAGMA journal_mode=WAL'))
+    return app
+
+
+def seed(app, volunteers, days):
+    """Create volunteers, a coordinator and Kakad/Robes shifts"""
+    with app.app_context():
+        db.session.add_all([
+            Volunteer(name=f'Volunteer {i}', phone=f'+1555{i:07d}')
+            for i in range(volunteers)
+        ])
+        start = date.today() + timedelta(days=1)
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            for shift_type, capacity in (('Kakad', 1), ('Robes', 4)):
+                db.session.add(Shift(
+                    date=day,
+                    day_name=day.strftime('%A'),
+                    week_of_month=(day.day - 1) // 7 + 1,
+                    shift_type=shift_type,
+                    capacity=capacity
+                ))
+        coordinator = User(username='storm-coordinator', role='coordinator')
+        coordinator.set_password('storm')
+        db.session.add(coordinator)
+        db.session.commit()
+
+        return (
+            TokenService.issue(coordinator),
+            [volunteer_id for volunteer_id, in db.session.query(Volunteer.id)],
+            [shift_id for shift_id, in db.session.query(Shift.id)]
+        )
+
+
+def check_limits(app):
+    """Count shifts and volunteers whose confirmed signups exceed a limit"""
+    with app.app_context():
+        confirmed = Signup.status == 'confirmed'
+        oversubscribed = db.session.query(Shift.id).join(
+            Signup, Signup.shift_id == Shift.id
+        ).filter(confirmed).group_by(Shift.id, Shift.capacity).having(
+            func.count(Signup.id) > Shift.capacity
+        ).count()
+
+        rule_set = get_rule_set()
+        over_quota = 0
+        for volunteer_id, *counts in db.session.query(
+            Signup.volunteer_id, *rule_set.count_columns(Shift)
+        ).join(Shift, Signup.shift_id == Shift.id).filter(confirmed).group_by(Signup.volunteer_id):
+            if any(count > rule.limit for rule, count in zip(rule_set.rules, counts)):
+                over_quota += 1
+
+        confirmed_total = Signup.query.filter(confirmed).count()
+        return oversubscribed, over_quota, confirmed_total
+
+
+def run(use_queue, args):
+    """Run one storm and return its summary"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'storm.db'), use_queue)
+        token, volunteer_ids, shift_ids = seed(app, args.volunteers, args.days)
+        headers = {'Authorization': f'Bearer {token}'}
+
+        # Same request plan for both modes so results are comparable
+        rng = random.Random(args.seed)
+        plan = [
+            (rng.choice(volunteer_ids), rng.choice(shift_ids))
+            for _ in range(args.requests)
+        ]
+        chunks = [plan[i::args.threads] for i in range(args.threads)]
+        outcomes = Counter()
+        latencies = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(args.threads)
+
+        def worker(chunk):
+            client = app.test_client()
+            barrier.wait()
+            for volunteer_id, shift_id in chunk:
+                started = time.perf_counter()
+                response = client.post('/api/signups', headers=headers, json={
+                    'volunteer_id': volunteer_id,
+                    'shift_id': shift_id
+                })
+                elapsed = time.perf_counter() - started
+                with lock:
+                    outcomes[response.status_code] += 1
+                    latencies.append(elapsed)
+
+        threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        started = time.perf_counter()
+        # Confirmation messages are printed when Twilio is not configured
+        with contextlib.redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        duration = time.perf_counter() - started
+
+        oversubscribed, over_quota, confirmed_total = check_limits(app)
+        with app.app_context():
+            db.engine.dispose()
+
+    latencies.sort()
+    return {
+        'mode': 'admission queue' if use_queue else 'direct',
+        'requests': args.requests,
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(args.requests / duration, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+        'accepted': outcomes[201],
+        'rejected': outcomes[400],
+        'not_admitted': outcomes[503],
+        'errors': sum(n for code, n in outcomes.items() if code >= 500 and code != 503),
+        'confirmed_signups': confirmed_total,
+        'oversubscribed_shifts': oversubscribed,
+        'volunteers_over_quota': over_quota
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--volunteers', type=int, default=500)
+    parser.add_argument('--days', type=int, default=10, help='Days of Kakad and Robes shifts')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mode', choices=['direct', 'queue', 'both'], default='both')
+    args = parser.parse_args()
+
+    modes = {'direct': [False], 'queue': [True], 'both': [False, True]}[args.mode]
+    failed = False
+    for use_queue in modes:
+        summary = run(use_queue, args)
+        print(f"\n== {summary.pop('mode')} ==")
+        for key, value in summary.items():
+            print(f'{key:>24}: {value}')
+        failed = failed or summary['oversubscribed_shifts'] or summary['volunteers_over_quota']
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
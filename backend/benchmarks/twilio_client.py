@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Compare per-message overhead of the Twilio sender against a local stub server.
+
+"fresh" builds a new Twilio client (and so a new HTTP session and
+connection) for every message, as the sender used to. "shared" reuses one
+TwilioSender whose client keeps pooled keep-alive connections. Both send the
+same messages from the same number of threads to a stub that answers like
+the Messages endpoint, so the difference is client and connection setup.
+
+The stub speaks plain HTTP; against api.twilio.com each fresh connection
+also pays a TLS handshake, so real savings are larger than reported here.
+
+Usage (from backend/):
+    python -m benchmarks.twilio_client --messages 500 --threads 4
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.senders import TwilioSender
+
+ACCOUNT_SID = 'AC' + '0' * 32
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every POST like a successful Messages.create call"""
+
+    protocol_version = 'HTTP/1.1'
+    # Avoid delayed-ACK stalls on kept-alive connections
+    disable_nagle_algorithm = True
+    connections = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        with self.lock:
+            self.connections.add(self.client_address)
+        body = json.dumps({'sid': 'SM' + '0' * 32, 'status': 'queued'}).encode()
+        self.send_response(201)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def make_sender(base_url, pool_size):
+    return TwilioSender(
+        ACCOUNT_SID, 'token', 'whatsapp:+14155238886',
+        pool_size=pool_size, timeout=10, api_base_url=base_url
+    )
+
+
+def run(label, send_one, messages, threads):
+    """Send `messages` messages from `threads` threads and report latency"""
+    StubHandler.connections.clear()
+    latencies = []
+    lock = threading.Lock()
+
+    def task(i):
+        started = time.perf_counter()
+        send_one(f'+1555{i:07d}', f'Reminder {i}')
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(task, range(messages)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        'mode': label,
+        'messages': messages,
+        'throughput': round(messages / elapsed, 1),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        'connections': len(StubHandler.connections)
+    }
+    print(
+        f"{label:>7}: {result['throughput']:>8} msg/s  "
+        f"mean {result['mean_ms']:>7} ms  p50 {result['p50_ms']:>7} ms  "
+        f"p99 {result['p99_ms']:>7} ms  connections {result['connections']}"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--pool-size', type=int, default=10)
+    args = parser.parse_args()
+
+    server, base_url = start_stub()
+    try:
+        def send_fresh(phone, body):
+            sender = make_sender(base_url, args.pool_size)
+            try:
+                sender.send(phone, body)
+            finally:
+                sender.reset()
+
+        shared = make_sender(base_url, args.pool_size)
+        shared.send('+15550000000', 'warm-up')
+
+        fresh = run('fresh', send_fresh, args.messages, args.threads)
+        pooled = run('shared', shared.send, args.messages, args.threads)
+    finally:
+        server.shutdown()
+
+    saved = fresh['mean_ms'] - pooled['mean_ms']
+    print(f'per-message overhead removed: {saved:.3f} ms '
+          f'({fresh["mean_ms"] / pooled["mean_ms"]:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""create revoked_tokens
+
+Revision ID: 0a9d4e7f2b18
+Revises: f1c8a2d6b934
+Create Date: 2026-10-18 00:16:27.551094
+
+Logging out records the access token's jti in revoked_tokens until the
+token expires. The table is created with its expiry and revocation time
+indexes when missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9d4e7f2b18'
+down_revision = 'f1c8a2d6b934'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'revoked_tokens' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'])
+    op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'])
+
+
+def downgrade():
+    op.drop_index('ix_revoked_tokens_revoked_at', table_name='revoked_tokens')
+    op.drop_index('ix_revoked_tokens_expires_at', table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
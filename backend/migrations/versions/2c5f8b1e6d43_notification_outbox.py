@@ -0,0 +1,76 @@
+"""create notification_jobs, notification_outbox and notification_send_budget
+
+Revision ID: 2c5f8b1e6d43
+Revises: 0a9d4e7f2b18
+Create Date: 2026-10-18 00:18:53.140766
+
+Notifications are written to notification_outbox in the transaction of
+the change they report and sent by the outbox workers; bulk sends group
+their messages under a notification_jobs row, and notification_send_budget
+paces sends across processes. Each table is created when missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c5f8b1e6d43'
+down_revision = '0a9d4e7f2b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'notification_jobs' not in tables:
+        op.create_table(
+            'notification_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('created_by', sa.Integer(), nullable=True),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('total', sa.Integer(), nullable=False),
+            sa.Column('missing_volunteer_ids', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'notification_outbox' not in tables:
+        op.create_table(
+            'notification_outbox',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('phone', sa.String(length=20), nullable=False),
+            sa.Column('body', sa.Text(), nullable=False),
+            sa.Column('kind', sa.String(length=20), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+            sa.Column('claim_token', sa.String(length=32), nullable=True),
+            sa.Column('job_id', sa.Integer(), nullable=True),
+            sa.Column('dedupe_key', sa.String(length=64), nullable=True),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('sent_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['job_id'], ['notification_jobs.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('dedupe_key')
+        )
+        op.create_index('ix_notification_outbox_job_id', 'notification_outbox', ['job_id'])
+        op.create_index('ix_outbox_status_next_attempt', 'notification_outbox', ['status', 'next_attempt_at'])
+
+    if 'notification_send_budget' not in tables:
+        op.create_table(
+            'notification_send_budget',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('next_send_at', sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('notification_send_budget')
+    op.drop_index('ix_outbox_status_next_attempt', table_name='notification_outbox')
+    op.drop_index('ix_notification_outbox_job_id', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
+    op.drop_table('notification_jobs')
@@ -0,0 +1,56 @@
+"""cascade signup deletes from shifts
+
+Revision ID: 3660f507af07
+Revises: 91718a38a24e
+Create Date: 2026-10-17 22:18:14.069119
+
+Deleting shifts relies on ON DELETE CASCADE of signups.shift_id, and
+SQLite connections enforce foreign keys. Databases created before the
+cascade still have a plain foreign key there, which rejects deleting a
+shift that has signups. The constraint is recreated with the cascade; on
+SQLite that means rebuilding the signups table. Signups left pointing at
+missing shifts while foreign keys were not enforced are removed first,
+as the cascade would have removed them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3660f507af07'
+down_revision = '91718a38a24e'
+branch_labels = None
+depends_on = None
+
+# Name given to the unnamed foreign key SQLite reflects, so batch mode can drop it
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+DEFAULT_NAME = 'fk_signups_shift_id_shifts'
+
+
+def _shift_foreign_key():
+    for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys('signups'):
+        if foreign_key['referred_table'] == 'shifts' and foreign_key['constrained_columns'] == ['shift_id']:
+            return foreign_key
+    return None
+
+
+def _recreate(ondelete):
+    foreign_key = _shift_foreign_key()
+    name = (foreign_key or {}).get('name') or DEFAULT_NAME
+    with op.batch_alter_table('signups', naming_convention=NAMING_CONVENTION) as batch_op:
+        if foreign_key is not None:
+            batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.create_foreign_key(name, 'shifts', ['shift_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    foreign_key = _shift_foreign_key()
+    if foreign_key is not None and (foreign_key.get('options') or {}).get('ondelete', '').upper() == 'CASCADE':
+        return
+
+    op.execute('DELETE FROM signups WHERE shift_id NOT IN (SELECT id FROM shifts)')
+    _recreate('CASCADE')
+
+
+def downgrade():
+    _recreate(None)
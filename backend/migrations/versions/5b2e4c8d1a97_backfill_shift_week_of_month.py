@@ -0,0 +1,46 @@
+"""backfill shift week_of_month
+
+Revision ID: 5b2e4c8d1a97
+Revises: 3660f507af07
+Create Date: 2026-10-17 23:05:12.418230
+
+Shifts created before week_of_month was filled in have it NULL, so
+scheduling rules matching on a week of the month never count them. It is
+computed from each shift's date as app.services.recurrence.week_of_month
+does. Shifts that already have it are left alone.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e4c8d1a97'
+down_revision = '3660f507af07'
+branch_labels = None
+depends_on = None
+
+shifts = sa.table(
+    'shifts',
+    sa.column('id', sa.Integer),
+    sa.column('date', sa.Date),
+    sa.column('week_of_month', sa.Integer)
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    missing = bind.execute(
+        sa.select(shifts.c.id, shifts.c.date).where(shifts.c.week_of_month.is_(None))
+    ).all()
+    if not missing:
+        return
+
+    bind.execute(
+        shifts.update().where(shifts.c.id == sa.bindparam('shift_id')).values(week_of_month=sa.bindparam('week')),
+        [{'shift_id': shift_id, 'week': (day.day - 1) // 7 + 1} for shift_id, day in missing]
+    )
+
+
+def downgrade():
+    # The values are derived from the date and correct on every shift
+    pass
@@ -0,0 +1,54 @@
+"""make volunteers.reliability_score NOT NULL
+
+Revision ID: 8d3e5a0c7f21
+Revises: 2c5f8b1e6d43
+Create Date: 2026-10-18 00:41:09.227516
+
+The reliability list pages on (reliability_score, id), and a NULL score
+cannot be written into or read back from its cursor. Volunteers created
+with an explicit null get the score a new volunteer starts with, and the
+column becomes NOT NULL with that server default. Skipped when the column
+is already NOT NULL.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3e5a0c7f21'
+down_revision = '2c5f8b1e6d43'
+branch_labels = None
+depends_on = None
+
+DEFAULT_SCORE = 100
+
+
+def _nullable():
+    for column in sa.inspect(op.get_bind()).get_columns('volunteers'):
+        if column['name'] == 'reliability_score':
+            return column['nullable']
+    return False
+
+
+def upgrade():
+    if not _nullable():
+        return
+
+    op.execute(f'UPDATE volunteers SET reliability_score = {DEFAULT_SCORE} WHERE reliability_score IS NULL')
+    with op.batch_alter_table('volunteers') as batch_op:
+        batch_op.alter_column(
+            'reliability_score',
+            existing_type=sa.Integer(),
+            nullable=False,
+            server_default=str(DEFAULT_SCORE)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('volunteers') as batch_op:
+        batch_op.alter_column(
+            'reliability_score',
+            existing_type=sa.Integer(),
+            nullable=True,
+            server_default=None
+        )
@@ -0,0 +1,41 @@
+"""add shift confirmed_count
+
+Revision ID: 91718a38a24e
+Revises:
+Create Date: 2026-10-17 22:16:34.069126
+
+Databases created before the shift counter get the column with a server
+default, counted from the confirmed signups as
+CounterService.rebuild_shift_counts does. Databases built by
+db.create_all() already have it, so the step is skipped when the column
+exists.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '91718a38a24e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if 'confirmed_count' not in _columns('shifts'):
+        with op.batch_alter_table('shifts') as batch_op:
+            batch_op.add_column(sa.Column('confirmed_count', sa.Integer(), nullable=False, server_default='0'))
+        op.execute(
+            "UPDATE shifts SET confirmed_count = ("
+            "SELECT count(signups.id) FROM signups "
+            "WHERE signups.shift_id = shifts.id AND signups.status = 'confirmed')"
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('shifts') as batch_op:
+        batch_op.drop_column('confirmed_count')
@@ -0,0 +1,55 @@
+"""index signups, shifts and volunteers for the hot paths
+
+Revision ID: c41d7e9a2f60
+Revises: 5b2e4c8d1a97
+Create Date: 2026-10-17 23:31:47.905316
+
+db.create_all() builds indexes only together with their tables, so
+databases created earlier lack the indexes declared since on the models:
+- ix_signups_shift_status_volunteer: a shift's signups by status
+- ix_signups_confirmed_volunteer_shift: a volunteer's confirmed signups,
+  partial on status = 'confirmed' in SQLite and PostgreSQL
+- ix_shifts_date_id and ix_volunteers_reliability_id: keyset page orders
+Each is created only when missing, then planner statistics are refreshed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e9a2f60'
+down_revision = '5b2e4c8d1a97'
+branch_labels = None
+depends_on = None
+
+CONFIRMED = sa.text("status = 'confirmed'")
+
+INDEXES = [
+    ('ix_signups_shift_status_volunteer', 'signups', ['shift_id', 'status', 'volunteer_id'], {}),
+    ('ix_signups_confirmed_volunteer_shift', 'signups', ['volunteer_id', 'shift_id'], {
+        'postgresql_where': CONFIRMED,
+        'sqlite_where': CONFIRMED
+    }),
+    ('ix_shifts_date_id', 'shifts', ['date', 'id'], {}),
+    ('ix_volunteers_reliability_id', 'volunteers', ['reliability_score', 'id'], {}),
+]
+
+
+def _indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    created = 0
+    for name, table, columns, options in INDEXES:
+        if name not in _indexes(table):
+            op.create_index(name, table, columns, **options)
+            created += 1
+
+    if created:
+        op.execute('ANALYZE')
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
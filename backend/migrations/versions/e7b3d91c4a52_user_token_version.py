@@ -0,0 +1,36 @@
+"""add user token_version
+
+Revision ID: e7b3d91c4a52
+Revises: c41d7e9a2f60
+Create Date: 2026-10-18 00:12:05.316842
+
+Access tokens carry the user's token_version as their tv claim, and a
+token whose tv is behind the user's current version is rejected. Users of
+databases created before it get the column with a server default of 0,
+which matches the tv of tokens issued from then on. Databases built by
+db.create_all() already have it, so the step is skipped when it exists.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3d91c4a52'
+down_revision = 'c41d7e9a2f60'
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if 'token_version' not in _columns('users'):
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.add_column(sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,61 @@
+"""create scheduling_rules and volunteer_rule_counts
+
+Revision ID: f1c8a2d6b934
+Revises: e7b3d91c4a52
+Create Date: 2026-10-18 00:14:41.908213
+
+Scheduling rules are stored in scheduling_rules, seeded with the defaults
+when the table is empty, and every volunteer's confirmed signups matching
+each rule are counted in volunteer_rule_counts. Both tables are created
+when missing; the ledger is filled by the reconcile-counters command, as
+the empty ledger would otherwise let volunteers past their limits.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c8a2d6b934'
+down_revision = 'e7b3d91c4a52'
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    tables = _tables()
+
+    if 'scheduling_rules' not in tables:
+        op.create_table(
+            'scheduling_rules',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('key', sa.String(length=50), nullable=False),
+            sa.Column('position', sa.Integer(), nullable=False),
+            sa.Column('shift_type', sa.String(length=10), nullable=True),
+            sa.Column('day_name', sa.String(length=10), nullable=True),
+            sa.Column('week_of_month', sa.Integer(), nullable=True),
+            sa.Column('max_signups', sa.Integer(), nullable=False),
+            sa.Column('message', sa.String(length=255), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('key')
+        )
+
+    if 'volunteer_rule_counts' not in tables:
+        op.create_table(
+            'volunteer_rule_counts',
+            sa.Column('volunteer_id', sa.Integer(), nullable=False),
+            sa.Column('rule_key', sa.String(length=50), nullable=False),
+            sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['volunteer_id'], ['volunteers.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('volunteer_id', 'rule_key')
+        )
+
+
+def downgrade():
+    op.drop_table('volunteer_rule_counts')
+    op.drop_table('scheduling_rules')
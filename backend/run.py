@@ -2,10 +2,13 @@
 """Entry point for running the Flask application"""
 import os
 from app import create_app
+from app.services.outbox import start_workers
 
 # Determine environment
 env = os.getenv('FLASK_ENV', 'development')
 app = create_app(config_name=env)
 
 if __name__ == '__main__':
+    # Deliver notifications from the server process; CLI commands importing this module do not
+    start_workers(app)
     app.run(debug=env == 'development', port=5001, use_reloader=False)
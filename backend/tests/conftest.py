@@ -0,0 +1,197 @@
+"""Shared pytest fixtures: a fresh app on an in-memory SQLite database per test"""
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import Shift, Signup, User, Volunteer
+from app.routes.pagination import NEXT_CURSOR_HEADER
+from app.services.counters import CounterService
+from app.services.recurrence import SHIFT_TYPES, shift_fields
+from app.services.tokens import TokenService
+
+# One cheap hash for every fixture user; the default method is deliberately slow
+PASSWORD = 'password123'
+PASSWORD_HASH = generate_password_hash(PASSWORD, method='pbkdf2:sha256:1')
+
+# Test shifts fall on or after this Thursday, so they are all upcoming
+THURSDAY = date(2031, 1, 2)
+FRIDAY = THURSDAY + timedelta(days=1)
+
+
+def shift_day(offset):
+    """The date `offset` days after THURSDAY"""
+    return THURSDAY + timedelta(days=offset)
+
+
+def weekly(start, weeks):
+    """The same weekday in each of the `weeks` weeks after start"""
+    return [start + timedelta(days=7 * week) for week in range(1, weeks + 1)]
+
+
+def walk(client, headers, path, limit, **query):
+    """Follow the cursor header to the last page and return every item and the page count"""
+    items = []
+    pages = 0
+    cursor = None
+    while True:
+        params = dict(query, limit=limit, **({'cursor': cursor} if cursor else {}))
+        response = client.get(path, headers=headers, query_string=params)
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        assert len(page) <= limit
+        items.extend(page)
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return items, pages
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_statements(app):
+    """
+    Context manager counting the SQL statements executed inside it
+
+        with count_statements() as counter:
+            ...
+        assert counter.count == 1
+    """
+    @contextmanager
+    def counting():
+        counter = StatementCounter()
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', counter)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, 'before_cursor_execute', counter)
+
+    return counting
+
+
+class StatementCounter:
+    """before_cursor_execute listener keeping the statements it saw"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def factory(app):
+    return Factory(app)
+
+
+class Factory:
+    """
+    Rows for tests, each created in its own app context
+
+    Methods return IDs rather than instances, so tests never hold objects
+    of a closed session. Signups are added as rows and the counters are
+    rebuilt afterwards, so the counters always match the signups table.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._sequence = 0
+
+    def _next(self):
+        self._sequence += 1
+        return self._sequence
+
+    def volunteer(self, name=None, reliability_score=100):
+        number = self._next()
+        with self.app.app_context():
+            volunteer = Volunteer(
+                name=name or f'Volunteer {number}',
+                phone=f'+1555{number:07d}',
+                reliability_score=reliability_score
+            )
+            db.session.add(volunteer)
+            db.session.commit()
+            return volunteer.id
+
+    def shift(self, day, shift_type='Kakad', capacity=None):
+        with self.app.app_context():
+            shift = Shift(
+                date=day,
+                shift_type=shift_type,
+                capacity=SHIFT_TYPES[shift_type] if capacity is None else capacity,
+                **shift_fields(day)
+            )
+            db.session.add(shift)
+            db.session.commit()
+            return shift.id
+
+    def signups(self, pairs, status='confirmed'):
+        """Add (volunteer_id, shift_id) signups and bring the counters up to date"""
+        with self.app.app_context():
+            signups = [
+                Signup(volunteer_id=volunteer_id, shift_id=shift_id, status=status)
+                for volunteer_id, shift_id in pairs
+            ]
+            db.session.add_all(signups)
+            db.session.commit()
+            CounterService.rebuild_shift_counts()
+            CounterService.rebuild_volunteer_quotas()
+            return [signup.id for signup in signups]
+
+    def volunteer_with(self, shift_ids, status='confirmed', **fields):
+        """A new volunteer signed up for the given shifts"""
+        volunteer_id = self.volunteer(**fields)
+        self.signups([(volunteer_id, shift_id) for shift_id in shift_ids], status=status)
+        return volunteer_id
+
+    def drift(self):
+        """(shift, volunteer) counts whose counters disagree with the signups"""
+        with self.app.app_context():
+            return (
+                CounterService.rebuild_shift_counts(check_only=True),
+                CounterService.rebuild_volunteer_quotas(check_only=True)
+            )
+
+    def user(self, role='volunteer', volunteer_id=None, username=None):
+        with self.app.app_context():
+            user = User(
+                username=username or f'user{self._next()}',
+                password_hash=PASSWORD_HASH,
+                role=role,
+                volunteer_id=volunteer_id
+            )
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+
+    def headers(self, user_id):
+        """Authorization header with a fresh token for a user"""
+        with self.app.app_context():
+            token = TokenService.issue(db.session.get(User, user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+    def coordinator_headers(self):
+        return self.headers(self.user(role='coordinator'))
+
@@ -0,0 +1,129 @@
+"""Hot queries are served by the indexes declared on the models"""
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.services.counters import CounterService
+from tests.conftest import THURSDAY, shift_day
+
+
+# A plan step reading every row of a table, or building a throwaway index from one
+FULL_SCAN = re.compile(r'^(?:SCAN (\w+)(?: AS \w+)?|(?:SEARCH|SCAN) (\w+)(?: AS \w+)? USING AUTOMATIC .*)$')
+
+
+@pytest.fixture
+def populated(factory):
+    """A few shifts over two weeks, volunteers and their signups"""
+    shifts = [
+        factory.shift(shift_day(offset), shift_type)
+        for offset in range(14) for shift_type in ('Kakad', 'Robes')
+    ]
+    volunteers = [factory.volunteer(reliability_score=score) for score in (100, 90, 80, 70, 60)]
+    factory.signups([(volunteer_id, shifts[index * 3]) for index, volunteer_id in enumerate(volunteers)])
+    factory.signups([(volunteer_id, shifts[index * 3 + 1]) for index, volunteer_id in enumerate(volunteers)])
+    factory.signups([(volunteers[0], shifts[20])], status='cancelled')
+    return shifts, volunteers
+
+
+@pytest.fixture
+def coordinator(client, factory):
+    """Coordinator headers, with the per-process token caches already loaded"""
+    headers = factory.coordinator_headers()
+    client.get('/api/auth/me', headers=headers)
+    return headers
+
+
+@pytest.fixture
+def plans(app):
+    """Run a callable and return the EXPLAIN QUERY PLAN steps of each SELECT it issued"""
+    def explain(run):
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                captured.append((statement, parameters))
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            run()
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+
+        with app.app_context(), db.engine.connect() as conn:
+            return [
+                (statement, [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)])
+                for statement, parameters in captured
+            ]
+    return explain
+
+
+def full_scans(found):
+    return [
+        (' '.join(statement.split()), plan)
+        for statement, plan in found
+        if any(FULL_SCAN.match(step) for step in plan)
+    ]
+
+
+def uses(found, index):
+    return any(index in step for _, plan in found for step in plan)
+
+
+def test_shift_detail_reads_signups_by_shift(client, coordinator, populated, plans):
+    shifts, _ = populated
+    found = plans(lambda: client.get(f'/api/shifts/{shifts[0]}', headers=coordinator))
+    assert uses(found, 'ix_signups_shift_status_volunteer')
+    assert full_scans(found) == []
+
+
+def test_shift_signups_list_uses_shift_status_index(client, coordinator, populated, plans):
+    shifts, _ = populated
+    found = plans(lambda: client.get(
+        '/api/signups', headers=coordinator, query_string={'shift_id': shifts[0], 'status': 'confirmed'}
+    ))
+    assert uses(found, 'ix_signups_shift_status_volunteer')
+    assert full_scans(found) == []
+
+
+def test_volunteer_signups_use_confirmed_index(client, coordinator, populated, plans):
+    _, volunteers = populated
+    found = plans(lambda: client.get(
+        '/api/signups', headers=coordinator, query_string={'volunteer_id': volunteers[0], 'status': 'confirmed'}
+    ))
+    assert uses(found, 'ix_signups_confirmed_volunteer_shift')
+    assert full_scans(found) == []
+
+
+def test_shift_listing_pages_by_date_index(client, coordinator, populated, plans):
+    found = plans(lambda: client.get('/api/shifts', headers=coordinator, query_string={
+        'start_date': THURSDAY.isoformat(),
+        'end_date': shift_day(6).isoformat()
+    }))
+    assert uses(found, 'ix_shifts_date_id')
+    assert full_scans(found) == []
+
+
+def test_reliability_list_pages_by_reliability_index(client, coordinator, populated, plans):
+    found = plans(lambda: client.get('/api/coordinator/volunteers/reliability', headers=coordinator))
+    assert uses(found, 'ix_volunteers_reliability_id')
+    assert full_scans(found) == []
+
+
+def test_counter_checks_read_signups_from_indexes(app, populated, plans):
+    def check():
+        with app.app_context():
+            CounterService.rebuild_shift_counts(check_only=True)
+            CounterService.rebuild_volunteer_quotas(check_only=True)
+
+    found = plans(check)
+    assert uses(found, 'ix_signups_shift_status_volunteer')
+    assert uses(found, 'ix_signups_confirmed_volunteer_shift')
+    # Both checks visit every shift and every ledger row by design; the signups come from indexes
+    assert [
+        statement for statement, plan in full_scans(found)
+        if any(FULL_SCAN.match(step) and 'signups' in step for step in plan)
+    ] == []
@@ -0,0 +1,68 @@
+"""Bulk notification requests are validated and queued one message per recipient"""
+from datetime import date
+
+import pytest
+
+from app.models import NotificationJob, OutboxMessage
+
+
+@pytest.mark.parametrize('volunteer_ids', [
+    [[1]],
+    [{'id': 1}],
+    [1, [2]],
+    [True],
+    ['1'],
+    [1.5],
+    'not a list',
+])
+def test_bulk_send_rejects_non_integer_ids(app, client, factory, volunteer_ids):
+    factory.volunteer()
+    response = client.post('/api/coordinator/notifications/send', headers=factory.coordinator_headers(), json={
+        'volunteer_ids': volunteer_ids,
+        'message': 'Hello'
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'volunteer_ids must be a list of integers'
+
+    with app.app_context():
+        assert NotificationJob.query.count() == 0
+        assert OutboxMessage.query.count() == 0
+
+
+def test_bulk_send_queues_each_recipient_once(app, client, factory):
+    first, second = factory.volunteer(), factory.volunteer()
+    response = client.post('/api/coordinator/notifications/send', headers=factory.coordinator_headers(), json={
+        'volunteer_ids': [first, second, first, 999999],
+        'message': 'Hello'
+    })
+    assert response.status_code == 202, response.get_json()
+    body = response.get_json()
+    assert body['queued'] == 2
+    assert body['failed'] == [999999]
+
+    with app.app_context():
+        assert OutboxMessage.query.filter_by(job_id=body['job_id']).count() == 2
+
+
+def test_dashboard_is_served_from_cache_until_a_write(client, factory, count_statements):
+    headers = factory.coordinator_headers()
+    shift_id = factory.shift(date.today(), 'Robes')
+
+    def dashboard():
+        with count_statements() as counter:
+            response = client.get('/api/coordinator/dashboard', headers=headers)
+        assert response.status_code == 200
+        return response.get_json(), [s for s in counter.statements if 'shifts' in s]
+
+    body, statements = dashboard()
+    # The headline totals, then the understaffed shifts of the window
+    assert len(statements) == 2
+    assert body['understaffed_shifts'][0]['needed'] == 4
+
+    assert dashboard() == (body, [])
+
+    factory.signups([(factory.volunteer(), shift_id)])
+    body, statements = dashboard()
+    assert len(statements) == 2
+    assert body['total_signups'] == 1
+    assert body['understaffed_shifts'][0]['needed'] == 3
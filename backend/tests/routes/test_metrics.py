@@ -0,0 +1,114 @@
+"""/metrics reports requests, SQL statements and notification sends"""
+import re
+from datetime import date
+
+import pytest
+
+from app import create_app, db
+from app.services.outbox import OutboxDispatcher, OutboxService
+from app.services.senders import FakeSender
+from tests.conftest import Factory
+
+
+def get(client, path, headers=None):
+    """Status of a GET whose response is closed, as a server closes it once sent"""
+    response = client.get(path, headers=headers)
+    response.close()
+    return response.status_code
+
+
+def sample(text, name, **labels):
+    """Value of one sample in Prometheus text output, None when absent"""
+    rendered = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = '^' + re.escape(f'{name}{{{rendered}}}' if labels else name) + r' (\S+)$'
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+@pytest.fixture
+def scrape(client, factory):
+    headers = factory.coordinator_headers()
+
+    def get():
+        response = client.get('/metrics', headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        return response.get_data(as_text=True)
+    return get
+
+
+def test_requests_are_counted_by_route_template(client, factory, scrape):
+    headers = factory.coordinator_headers()
+    shift_id = factory.shift(date(2031, 1, 2))
+    for _ in range(3):
+        assert get(client, f'/api/shifts/{shift_id}', headers) == 200
+    assert get(client, '/api/shifts/999999', headers) == 404
+    assert get(client, '/no/such/path') == 404
+
+    text = scrape()
+    route = '/api/shifts/<int:shift_id>'
+    assert sample(text, 'http_request_duration_seconds_count', method='GET', endpoint=route, status='200') == 3
+    assert sample(text, 'http_request_duration_seconds_count', method='GET', endpoint=route, status='404') == 1
+    assert sample(text, 'http_request_duration_seconds_count', method='GET', endpoint='unmatched', status='404') == 1
+
+
+def test_statements_per_request_match_what_ran(client, factory, scrape, count_statements):
+    headers = factory.coordinator_headers()
+    shift_id = factory.shift(date(2031, 1, 2))
+    # Warm per-process caches (rules, token versions) first
+    get(client, f'/api/shifts/{shift_id}', headers)
+    before = scrape()
+
+    with count_statements() as counted:
+        assert get(client, f'/api/shifts/{shift_id}', headers) == 200
+    after = scrape()
+
+    route = '/api/shifts/<int:shift_id>'
+    added = (
+        sample(after, 'http_request_sql_statements_sum', endpoint=route)
+        - sample(before, 'http_request_sql_statements_sum', endpoint=route)
+    )
+    assert added == counted.count > 0
+    # The process-wide total includes the request and the first scrape's own statements
+    assert sample(after, 'db_statements_total') - sample(before, 'db_statements_total') >= counted.count
+
+
+def test_notification_sends_are_counted_by_outcome(app, scrape):
+    sender = FakeSender(failing_numbers={'+15550000009'})
+    dispatcher = OutboxDispatcher(app, sender=sender)
+    dispatcher.rate_limiter.rate = 0
+
+    with app.app_context():
+        OutboxService.enqueue_many([
+            ('+15550000001', 'One'), ('+15550000002', 'Two'), ('+15550000009', 'Lost')
+        ])
+        db.session.commit()
+        dispatcher.drain()
+
+    text = scrape()
+    assert sample(text, 'notification_send_seconds_count', sender='FakeSender', outcome='sent') == 2
+    assert sample(text, 'notification_send_seconds_count', sender='FakeSender', outcome='failed') == 1
+    assert len(sender.sent) == 2
+
+
+def test_volunteers_cannot_read_metrics(client, factory):
+    volunteer_id = factory.volunteer()
+    headers = factory.headers(factory.user(volunteer_id=volunteer_id))
+    assert client.get('/metrics', headers=headers).status_code == 403
+
+
+def test_disabled_metrics_record_nothing():
+    app = create_app('testing', config_overrides={'METRICS_ENABLED': False})
+    try:
+        assert 'metrics' not in app.extensions
+
+        factory = Factory(app)
+        client = app.test_client()
+        assert get(client, '/api/shifts', factory.coordinator_headers()) == 200
+        response = client.get('/metrics', headers=factory.coordinator_headers())
+        assert response.status_code == 404
+        assert response.get_json() == {'error': 'Metrics are disabled'}
+    finally:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
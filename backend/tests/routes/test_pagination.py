@@ -0,0 +1,71 @@
+"""Keyset pages walked through X-Next-Cursor match the unpaginated order"""
+from datetime import date
+
+import pytest
+
+from app.models import Shift, Signup, Volunteer
+from app.routes.pagination import NEXT_CURSOR_HEADER
+from tests.conftest import shift_day, walk
+
+
+@pytest.fixture
+def listed(factory):
+    """Shifts sharing dates and volunteers sharing scores, so later sort keys break ties"""
+    shifts = [
+        factory.shift(shift_day(offset), shift_type)
+        for offset in (3, 0, 2, 1, 4) for shift_type in ('Robes', 'Kakad')
+    ]
+    volunteers = [factory.volunteer(reliability_score=score) for score in (80, 95, 80, 60, 95, 80, 70)]
+    factory.signups([(volunteer_id, shifts[index]) for index, volunteer_id in enumerate(volunteers)])
+    factory.signups([(volunteer_id, shifts[-1 - index]) for index, volunteer_id in enumerate(volunteers[:3])])
+    return shifts, volunteers
+
+
+@pytest.mark.parametrize('path, query, expected', [
+    ('/api/shifts', {}, lambda: [s.id for s in Shift.query.order_by(Shift.date, Shift.id)]),
+    ('/api/shifts', {'shift_type': 'Kakad', 'start_date': '2031-01-03'}, lambda: [
+        s.id for s in Shift.query.filter(Shift.shift_type == 'Kakad', Shift.date >= date(2031, 1, 3)).order_by(
+            Shift.date, Shift.id
+        )
+    ]),
+    ('/api/volunteers', {}, lambda: [v.id for v in Volunteer.query.order_by(Volunteer.id)]),
+    ('/api/coordinator/volunteers/reliability', {}, lambda: [
+        v.id for v in Volunteer.query.order_by(Volunteer.reliability_score.desc(), Volunteer.id.desc())
+    ]),
+    ('/api/signups', {}, lambda: [s.id for s in Signup.query.order_by(Signup.id.desc())]),
+])
+@pytest.mark.parametrize('limit', [1, 3, 4])
+def test_pages_match_the_unpaginated_order(app, client, factory, listed, path, query, expected, limit):
+    headers = factory.coordinator_headers()
+
+    with app.app_context():
+        ids = expected()
+    items, pages = walk(client, headers, path, limit, **query)
+
+    assert [item['id'] for item in items] == ids
+    assert pages == max(-(-len(ids) // limit), 1)
+
+    # One page holding everything agrees too
+    single = client.get(path, headers=headers, query_string=dict(query, limit=500))
+    assert single.headers.get(NEXT_CURSOR_HEADER) is None
+    assert [item['id'] for item in single.get_json()] == ids
+
+
+def test_cursor_works_when_sort_keys_are_not_requested(client, factory, listed):
+    headers = factory.coordinator_headers()
+    everything, _ = walk(client, headers, '/api/shifts', 100)
+    items, _ = walk(client, headers, '/api/shifts', 3, fields='id,shift_type')
+
+    assert items == [{'id': item['id'], 'shift_type': item['shift_type']} for item in everything]
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-base64!',
+    'e30=',           # {}
+    'WzFd',           # [1]: one value for two sort keys
+    'WyJ4IiwgMV0=',   # ["x", 1]: not a date
+])
+def test_invalid_cursor_is_rejected(client, factory, listed, cursor):
+    response = client.get('/api/shifts', headers=factory.coordinator_headers(), query_string={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
@@ -0,0 +1,68 @@
+"""Deleting shift ranges removes their signups and keeps the counters in sync"""
+
+from app import db
+from app.cli import reconcile_counters_command
+from app.models import Shift, Signup, VolunteerRuleCount
+from tests.conftest import shift_day
+
+
+def test_range_delete_removes_signups_without_counter_drift(app, client, factory):
+    days = [shift_day(offset) for offset in range(14)]
+    kakad = [factory.shift(day, 'Kakad') for day in days]
+    robes = [factory.shift(day, 'Robes') for day in days]
+    volunteers = [factory.volunteer() for _ in range(4)]
+    # Each volunteer has one Kakad and one Robes signup in the first week, one of each in the second
+    factory.signups([(volunteer_id, kakad[index]) for index, volunteer_id in enumerate(volunteers)])
+    factory.signups([(volunteer_id, robes[index]) for index, volunteer_id in enumerate(volunteers)])
+    factory.signups([(volunteer_id, kakad[7 + index]) for index, volunteer_id in enumerate(volunteers)])
+    factory.signups([(volunteer_id, robes[7 + index]) for index, volunteer_id in enumerate(volunteers)])
+    factory.signups([(volunteers[0], robes[2])], status='cancelled')
+
+    response = client.post('/api/shifts/delete-range', headers=factory.coordinator_headers(), json={
+        'start_date': days[0].isoformat(),
+        'end_date': days[6].isoformat()
+    })
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['deleted_shifts'] == 14
+    assert body['deleted_signups'] == 9
+    assert body['notices_queued'] == 8
+
+    with app.app_context():
+        remaining = {shift_id for shift_id, in db.session.query(Signup.shift_id)}
+        assert remaining == set(kakad[7:11]) | set(robes[7:11])
+        assert Shift.query.filter(Shift.date <= days[6]).count() == 0
+        counts = {
+            (row.volunteer_id, row.rule_key): row.count
+            for row in VolunteerRuleCount.query if row.count
+        }
+        assert {volunteer_id for volunteer_id, _ in counts} == set(volunteers)
+
+    result = app.test_cli_runner().invoke(reconcile_counters_command, ['--check'])
+    assert result.exit_code == 0, result.output
+    assert 'out of sync: 0' in result.output
+
+
+def test_statement_counts_do_not_grow_with_shifts_or_signups(client, factory, count_statements):
+    headers = factory.headers(factory.user())
+    # Warm the token caches so only the routes' own statements are counted
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    def statements_for(path):
+        with count_statements() as counter:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.get_json()
+        return counter.count
+
+    first = factory.shift(shift_day(0), 'Robes')
+    factory.signups([(factory.volunteer(), first)])
+    few_shifts, few_signups = statements_for('/api/shifts'), statements_for(f'/api/shifts/{first}')
+
+    busy = factory.shift(shift_day(1), 'Robes')
+    factory.signups([(factory.volunteer(), busy) for _ in range(3)])
+    for offset in range(2, 6):
+        factory.signups([(factory.volunteer(), factory.shift(shift_day(offset)))])
+
+    assert statements_for('/api/shifts') == few_shifts == 1
+    # The shift, then its signups with their volunteers
+    assert statements_for(f'/api/shifts/{busy}') == few_signups == 2
@@ -0,0 +1,199 @@
+"""Signup routes: batch validation and creation, and the counters behind every change"""
+
+import pytest
+
+from app import db
+from app.models import Shift, Signup, VolunteerRuleCount
+from tests.conftest import THURSDAY, shift_day
+
+
+@pytest.mark.parametrize('bad, error', [
+    ({'volunteer_id': [1], 'shift_id': 1}, 'volunteer_id and shift_id must be integers'),
+    ({'volunteer_id': 1, 'shift_id': {'id': 1}}, 'volunteer_id and shift_id must be integers'),
+    ({'volunteer_id': True, 'shift_id': 1}, 'volunteer_id and shift_id must be integers'),
+    ({'volunteer_id': '1', 'shift_id': 1}, 'volunteer_id and shift_id must be integers'),
+    ({'volunteer_id': 1}, 'Missing volunteer_id or shift_id'),
+    ('not an object', 'Missing volunteer_id or shift_id'),
+])
+def test_validate_batch_rejects_the_bad_row_only(client, factory, bad, error):
+    volunteer_id = factory.volunteer()
+    shift_id = factory.shift(THURSDAY, 'Robes')
+    good = {'volunteer_id': volunteer_id, 'shift_id': shift_id}
+
+    response = client.post('/api/signups/validate/batch', headers=factory.coordinator_headers(), json={
+        'pairs': [good, bad, good]
+    })
+    assert response.status_code == 200, response.get_json()
+    results = response.get_json()['results']
+    assert [result['is_valid'] for result in results] == [True, False, True]
+    assert results[1]['error_message'] == error
+    assert results[1]['stats'] is None
+    assert results[0]['stats']['total_signups'] == 0
+
+
+def test_bulk_create_rejects_non_integer_ids(app, client, factory):
+    volunteer_id = factory.volunteer()
+    shift_id = factory.shift(THURSDAY, 'Robes')
+    headers = factory.coordinator_headers()
+    rows = [{'volunteer_id': volunteer_id, 'shift_id': shift_id}, {'volunteer_id': [volunteer_id], 'shift_id': shift_id}]
+
+    response = client.post('/api/signups/bulk', headers=headers, json={'signups': rows, 'mode': 'atomic'})
+    assert response.status_code == 400
+    assert [result['status'] for result in response.get_json()['results']] == ['not_created', 'rejected']
+
+    response = client.post('/api/signups/bulk', headers=headers, json={'signups': rows, 'mode': 'best_effort'})
+    assert response.status_code == 201, response.get_json()
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == ['created', 'rejected']
+    assert results[1]['error'] == 'volunteer_id and shift_id must be integers'
+
+    with app.app_context():
+        assert Signup.query.count() == 1
+
+
+def bulk(client, factory, pairs, mode):
+    return client.post('/api/signups/bulk', headers=factory.coordinator_headers(), json={
+        'signups': [{'volunteer_id': volunteer_id, 'shift_id': shift_id} for volunteer_id, shift_id in pairs],
+        'mode': mode
+    })
+
+
+@pytest.mark.parametrize('mode', ['atomic', 'best_effort'])
+def test_earlier_rows_count_towards_later_limits(app, client, factory, mode):
+    volunteer_id = factory.volunteer()
+    kakad = [factory.shift(shift_day(offset), 'Kakad') for offset in (1, 2, 3)]
+
+    response = bulk(client, factory, [(volunteer_id, shift_id) for shift_id in kakad], mode)
+    results = response.get_json()['results']
+    assert results[2]['status'] == 'rejected'
+    assert results[2]['error'] == 'Maximum Kakad signups (2) reached'
+
+    with app.app_context():
+        created = Signup.query.filter_by(volunteer_id=volunteer_id).count()
+    if mode == 'atomic':
+        assert response.status_code == 400
+        assert [result['status'] for result in results[:2]] == ['not_created', 'not_created']
+        assert created == 0
+    else:
+        assert response.status_code == 201
+        assert [result['status'] for result in results[:2]] == ['created', 'created']
+        assert created == 2
+    assert factory.drift() == (0, 0)
+
+
+def test_atomic_batch_is_all_or_nothing(app, client, factory):
+    full = factory.shift(THURSDAY, 'Kakad')
+    factory.volunteer_with([full])
+    volunteers = [factory.volunteer() for _ in range(3)]
+    robes = factory.shift(shift_day(1), 'Robes')
+    pairs = [(volunteers[0], robes), (volunteers[1], full), (volunteers[2], robes)]
+
+    response = bulk(client, factory, pairs, 'atomic')
+    assert response.status_code == 400
+    body = response.get_json()
+    assert (body['created'], body['rejected']) == (0, 1)
+
+    response = bulk(client, factory, pairs, 'best_effort')
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == ['created', 'rejected', 'created']
+    assert body['results'][1]['error'] == 'Shift is at full capacity (1)'
+    assert all(result['signup_id'] for result in body['results'] if result['status'] == 'created')
+
+    with app.app_context():
+        assert db.session.get(Shift, robes).confirmed_count == 2
+        assert Signup.query.filter_by(shift_id=full).count() == 1
+    assert factory.drift() == (0, 0)
+
+
+@pytest.fixture
+def volunteer(factory):
+    """A volunteer with a login, and their auth headers"""
+    volunteer_id = factory.volunteer()
+    return volunteer_id, factory.headers(factory.user(volunteer_id=volunteer_id))
+
+
+def test_create_and_cancel_keep_counters_in_sync(app, client, factory, volunteer):
+    volunteer_id, headers = volunteer
+    shift_id = factory.shift(THURSDAY, 'Robes')
+
+    response = client.post('/api/signups', headers=headers, json={'volunteer_id': volunteer_id, 'shift_id': shift_id})
+    assert response.status_code == 201, response.get_json()
+    signup_id = response.get_json()['signup']['id']
+    assert factory.drift() == (0, 0)
+    with app.app_context():
+        assert db.session.get(Shift, shift_id).confirmed_count == 1
+
+    response = client.delete(f'/api/signups/{signup_id}', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    assert factory.drift() == (0, 0)
+    with app.app_context():
+        assert db.session.get(Shift, shift_id).confirmed_count == 0
+        assert VolunteerRuleCount.query.filter(VolunteerRuleCount.count != 0).count() == 0
+
+
+def test_create_on_a_full_shift_is_rejected(app, client, factory, volunteer):
+    volunteer_id, headers = volunteer
+    shift_id = factory.shift(THURSDAY, 'Kakad')
+    factory.volunteer_with([shift_id])
+
+    response = client.post('/api/signups', headers=headers, json={'volunteer_id': volunteer_id, 'shift_id': shift_id})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Shift is at full capacity (1)'
+    assert factory.drift() == (0, 0)
+
+
+@pytest.mark.parametrize('status', ['cancelled', 'no-show'])
+def test_status_changes_keep_counters_in_sync(app, client, factory, status):
+    shift_id = factory.shift(THURSDAY, 'Robes')
+    volunteer_id = factory.volunteer()
+    [signup_id] = factory.signups([(volunteer_id, shift_id)])
+    headers = factory.coordinator_headers()
+
+    response = client.put(f'/api/signups/{signup_id}/status', headers=headers, json={'status': status})
+    assert response.status_code == 200, response.get_json()
+    assert factory.drift() == (0, 0)
+    with app.app_context():
+        assert db.session.get(Shift, shift_id).confirmed_count == 0
+
+    response = client.put(f'/api/signups/{signup_id}/status', headers=headers, json={'status': 'confirmed'})
+    assert response.status_code == 200, response.get_json()
+    assert factory.drift() == (0, 0)
+    with app.app_context():
+        assert db.session.get(Shift, shift_id).confirmed_count == 1
+
+
+def test_reconfirming_on_a_full_shift_is_rejected(app, client, factory):
+    shift_id = factory.shift(THURSDAY, 'Kakad')
+    [signup_id] = factory.signups([(factory.volunteer(), shift_id)], status='cancelled')
+    factory.volunteer_with([shift_id])
+
+    response = client.put(f'/api/signups/{signup_id}/status', headers=factory.coordinator_headers(), json={
+        'status': 'confirmed'
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Shift is at full capacity (1)'
+    assert factory.drift() == (0, 0)
+    with app.app_context():
+        assert db.session.get(Signup, signup_id).status == 'cancelled'
+        assert db.session.get(Shift, shift_id).confirmed_count == 1
+
+
+def test_create_statement_count_does_not_grow_with_history(client, factory, count_statements):
+    def statements_for_signup(history):
+        volunteer_id = factory.volunteer()
+        headers = factory.headers(factory.user(volunteer_id=volunteer_id))
+        factory.signups([(volunteer_id, factory.shift(shift_day(7 * week), 'Robes')) for week in range(1, history + 1)])
+        target = factory.shift(shift_day(history * 7 + 1), 'Robes')
+        # Warm the token caches so only the signup's own statements are counted
+        assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+        with count_statements() as counter:
+            response = client.post('/api/signups', headers=headers, json={'volunteer_id': volunteer_id, 'shift_id': target})
+        assert response.status_code == 201, response.get_json()
+        return counter.count
+
+    fresh, busy = statements_for_signup(0), statements_for_signup(3)
+    assert fresh == busy
+    # Lookups, validation, counter claims, the inserts and the response reads
+    assert fresh <= 14
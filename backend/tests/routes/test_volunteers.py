@@ -0,0 +1,22 @@
+"""Volunteer create and update reject scores that would break the reliability order"""
+import pytest
+
+from app import db
+from app.models import Volunteer
+
+
+@pytest.mark.parametrize('score', [None, '90', 90.5, True])
+def test_non_integer_scores_are_rejected(app, client, factory, score):
+    headers = factory.coordinator_headers()
+    response = client.post('/api/volunteers', headers=headers, json={
+        'name': 'New', 'phone': '+15559999999', 'reliability_score': score
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'reliability_score must be an integer'
+
+    volunteer_id = factory.volunteer(reliability_score=80)
+    response = client.put(f'/api/volunteers/{volunteer_id}', headers=headers, json={'reliability_score': score})
+    assert response.status_code == 400
+
+    with app.app_context():
+        assert db.session.get(Volunteer, volunteer_id).reliability_score == 80
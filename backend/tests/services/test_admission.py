@@ -0,0 +1,53 @@
+"""Concurrent signups for one shift never push it past its capacity"""
+import threading
+
+import pytest
+
+from app import create_app, db
+from app.models import Shift, Signup
+from tests.conftest import THURSDAY
+
+VOLUNTEERS = 12
+
+
+@pytest.fixture(params=[True, False], ids=['admission-queue', 'conditional-update'])
+def app(request, tmp_path):
+    """A file database, so every request thread gets its own connection"""
+    app = create_app('testing', config_overrides={
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'storm.db'}",
+        'SIGNUP_ADMISSION_QUEUE': request.param
+    })
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_simultaneous_signups_fill_the_shift_exactly(app, factory):
+    shift_id = factory.shift(THURSDAY, 'Robes', capacity=4)
+    volunteers = []
+    for _ in range(VOLUNTEERS):
+        volunteer_id = factory.volunteer()
+        volunteers.append((volunteer_id, factory.headers(factory.user(volunteer_id=volunteer_id))))
+
+    start = threading.Barrier(VOLUNTEERS)
+    statuses = []
+
+    def sign_up(volunteer_id, headers):
+        client = app.test_client()
+        start.wait()
+        response = client.post('/api/signups', headers=headers, json={'volunteer_id': volunteer_id, 'shift_id': shift_id})
+        statuses.append((response.status_code, response.get_json().get('error')))
+
+    threads = [threading.Thread(target=sign_up, args=volunteer) for volunteer in volunteers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [status for status, _ in statuses].count(201) == 4
+    assert {error for status, error in statuses if status != 201} == {'Shift is at full capacity (4)'}
+    with app.app_context():
+        assert Signup.query.filter_by(shift_id=shift_id).count() == 4
+        assert db.session.get(Shift, shift_id).confirmed_count == 4
+    assert factory.drift() == (0, 0)
@@ -0,0 +1,68 @@
+"""The conditional counter UPDATEs refuse to overfill a shift or a quota"""
+from app import db
+from app.models import Shift, VolunteerRuleCount
+from app.services.counters import CounterService, quota_deltas
+from tests.conftest import THURSDAY, shift_day
+
+
+def test_reserve_seats_stops_at_capacity(app, factory):
+    shift_id = factory.shift(THURSDAY, 'Robes', capacity=3)
+
+    with app.app_context():
+        assert CounterService.reserve_seats(shift_id, 2)
+        assert not CounterService.reserve_seats(shift_id, 2)
+        assert CounterService.reserve_seats(shift_id)
+        assert not CounterService.reserve_seats(shift_id)
+        assert db.session.get(Shift, shift_id).confirmed_count == 3
+        db.session.rollback()
+
+    assert factory.drift() == (0, 0)
+
+
+def test_claim_quota_stops_at_the_limit(app, factory):
+    shifts = [factory.shift(shift_day(offset), 'Kakad') for offset in (0, 1, 2)]
+    volunteer_id = factory.volunteer_with(shifts[:1])
+
+    with app.app_context():
+        kakad = quota_deltas(db.session.get(Shift, shifts[1]))
+        assert CounterService.claim_quota(volunteer_id, kakad)
+        assert not CounterService.claim_quota(volunteer_id, kakad)
+        counts = dict(db.session.query(VolunteerRuleCount.rule_key, VolunteerRuleCount.count).filter_by(
+            volunteer_id=volunteer_id
+        ))
+        assert counts['kakad'] == 2
+        db.session.rollback()
+
+    assert factory.drift() == (0, 0)
+
+
+def test_claim_quota_fails_when_any_rule_would_overflow(app, factory):
+    # Two Thursday signups already: a third Thursday shift breaks that limit only
+    volunteer_id = factory.volunteer_with([
+        factory.shift(THURSDAY, 'Robes'),
+        factory.shift(shift_day(7), 'Robes')
+    ])
+    target = factory.shift(shift_day(14), 'Kakad')
+
+    with app.app_context():
+        assert not CounterService.claim_quota(volunteer_id, quota_deltas(db.session.get(Shift, target)))
+        # The rules still under their limit were not incremented either
+        counts = dict(db.session.query(VolunteerRuleCount.rule_key, VolunteerRuleCount.count))
+        assert counts == {'kakad': 0, 'total': 2, 'thursday': 2}
+        db.session.rollback()
+
+    assert factory.drift() == (0, 0)
+
+
+def test_losing_the_race_reports_the_rule_that_filled_up(app, factory):
+    shifts = [factory.shift(shift_day(offset), 'Kakad') for offset in (1, 2, 3)]
+    volunteer_id = factory.volunteer_with(shifts[:1])
+
+    with app.app_context():
+        # A concurrent signup for shifts[1] commits between validation and the claim
+        assert CounterService.claim_quota(volunteer_id, quota_deltas(db.session.get(Shift, shifts[1])))
+        db.session.commit()
+
+        error = CounterService.confirm_signup(volunteer_id, db.session.get(Shift, shifts[2]))
+        assert error == 'Maximum Kakad signups (2) reached'
+        db.session.rollback()
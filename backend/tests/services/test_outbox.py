@@ -0,0 +1,161 @@
+"""Outbox dispatching: retries, leases, dead letters, worker startup and the send budget"""
+import time
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.models import NotificationSendBudget, OutboxMessage
+from app.services.outbox import OutboxDispatcher, OutboxService, RateLimiter
+from app.services.senders import FakeSender
+
+FAILING = '+15550009999'
+
+
+def queue(app, *phones):
+    with app.app_context():
+        OutboxService.enqueue_many((phone, 'Hello') for phone in phones)
+        db.session.commit()
+        return [message.id for message in OutboxMessage.query.order_by(OutboxMessage.id)]
+
+
+def message(app, message_id):
+    with app.app_context():
+        return db.session.get(OutboxMessage, message_id)
+
+
+def make_due(app, message_id):
+    with app.app_context():
+        db.session.get(OutboxMessage, message_id).next_attempt_at = datetime.utcnow()
+        db.session.commit()
+
+
+def dispatcher(app, **settings):
+    result = OutboxDispatcher(app, sender=FakeSender(failing_numbers=[FAILING]))
+    result.rate_limiter = RateLimiter(0)
+    for name, value in settings.items():
+        setattr(result, name, value)
+    return result
+
+
+def test_failed_sends_back_off_exponentially(app):
+    [message_id] = queue(app, FAILING)
+    outbox = dispatcher(app, backoff_seconds=10, max_attempts=5)
+
+    for attempt, delay in ((1, 10), (2, 20), (3, 40)):
+        with app.app_context():
+            started = datetime.utcnow()
+            assert outbox.drain() == 1
+            # Not due again until the backoff has passed
+            assert outbox.drain() == 0
+        retried = message(app, message_id)
+        assert retried.status == 'pending'
+        assert retried.attempts == attempt
+        assert retried.claim_token is None
+        assert 'Fake delivery failure' in retried.last_error
+        wait = (retried.next_attempt_at - started).total_seconds()
+        assert delay - 1 <= wait <= delay + 1
+        make_due(app, message_id)
+
+
+def test_messages_are_dead_lettered_after_max_attempts(app):
+    dead_id, sent_id = queue(app, FAILING, '+15550000001')
+    outbox = dispatcher(app, backoff_seconds=0, max_attempts=3)
+
+    with app.app_context():
+        for _ in range(3):
+            outbox.drain()
+        # Dead letters are never claimed again
+        assert outbox.drain() == 0
+
+    dead = message(app, dead_id)
+    assert (dead.status, dead.attempts) == ('dead', 3)
+    assert message(app, sent_id).status == 'sent'
+    assert outbox.sender.sent == [('+15550000001', 'Hello')]
+
+
+def test_expired_lease_is_claimed_again(app):
+    [message_id] = queue(app, '+15550000001')
+    crashed = dispatcher(app, lease_seconds=300)
+    other = dispatcher(app)
+
+    # A worker claims the message and dies before sending it
+    with app.app_context():
+        [(claimed_id, *_)] = crashed._claim_batch()
+        assert claimed_id == message_id
+        assert other._claim_batch() == []
+
+    make_due(app, message_id)
+    with app.app_context():
+        assert other.drain() == 1
+
+    delivered = message(app, message_id)
+    assert (delivered.status, delivered.attempts) == ('sent', 1)
+    assert other.sender.sent == [('+15550000001', 'Hello')]
+
+
+def test_workers_start_only_when_configured(app):
+    assert app.extensions['outbox_dispatcher']._threads == []
+
+    started = create_app('testing', config_overrides={
+        'NOTIFICATION_START_WORKERS': True,
+        'NOTIFICATION_WORKERS': 1
+    })
+    outbox = started.extensions['outbox_dispatcher']
+    try:
+        assert len(outbox._threads) == 1
+    finally:
+        outbox.stop(timeout=5)
+        with started.app_context():
+            db.engine.dispose()
+
+
+def test_rate_limit_is_shared_by_dispatchers(app):
+    rate = 20
+    app.config['NOTIFICATION_RATE_LIMIT'] = rate
+    # Two dispatchers stand in for two processes, each with its own limiter
+    dispatchers = [OutboxDispatcher(app, sender=FakeSender()) for _ in range(2)]
+
+    with app.app_context():
+        started = time.monotonic()
+        for index in range(6):
+            dispatchers[index % 2].rate_limiter.acquire()
+        elapsed = time.monotonic() - started
+
+        # The first send goes at once, each later one waits a full interval
+        assert elapsed >= 5 / rate * 0.9
+        assert db.session.get(NotificationSendBudget, 1).next_send_at > 0
+
+
+def test_batch_reserves_its_sends_with_one_update(app, count_statements):
+    queue(app, *[f'+1555000{index:04d}' for index in range(10)])
+    outbox = dispatcher(app, batch_size=10)
+    outbox.rate_limiter = RateLimiter(1000)
+
+    with app.app_context():
+        with count_statements() as counter:
+            assert outbox.drain() == 10
+        budget = [statement for statement in counter.statements if 'notification_send_budget' in statement]
+        # One reservation covers the whole batch
+        assert len([statement for statement in budget if statement.startswith('UPDATE')]) == 1
+        assert db.session.get(NotificationSendBudget, 1).next_send_at > 0
+
+
+def test_confirmations_are_claimed_before_broadcasts(app):
+    with app.app_context():
+        OutboxService.enqueue_many((f'+1555000{index:04d}', 'News') for index in range(5))
+        db.session.commit()
+        OutboxService.enqueue('+15550009000', 'You are confirmed', kind='confirmation')
+        db.session.commit()
+    outbox = dispatcher(app, batch_size=3)
+
+    with app.app_context():
+        first = outbox._claim_batch()
+    assert [phone for _, phone, *_ in first][0] == '+15550009000'
+    assert len(first) == 3
+
+
+def test_rate_limit_of_zero_is_unlimited(app):
+    with app.app_context():
+        limiter = RateLimiter(0)
+        for _ in range(100):
+            limiter.acquire()
+        assert NotificationSendBudget.query.count() == 0
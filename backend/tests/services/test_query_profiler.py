@@ -0,0 +1,55 @@
+"""Slow statements are logged with their plan without disturbing the request's transaction"""
+import json
+
+import pytest
+
+from app import create_app, db
+from app.models import Volunteer
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    """An app logging every statement as slow, and its log path"""
+    path = tmp_path / 'slow.jsonl'
+    app = create_app('testing', config_overrides={
+        'SLOW_QUERY_LOG': True,
+        'SLOW_QUERY_THRESHOLD_MS': 0,
+        'SLOW_QUERY_LOG_FILE': str(path)
+    })
+    yield app, path
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def entries(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_plans_are_logged_and_the_transaction_is_kept(profiled):
+    app, path = profiled
+    with app.app_context():
+        db.session.add(Volunteer(name='Pending', phone='+15550000001'))
+        db.session.flush()
+        assert Volunteer.query.filter_by(phone='+15550000001').count() == 1
+        db.session.rollback()
+        assert Volunteer.query.count() == 0
+
+    logged = [entry for entry in entries(path) if entry['shape'].startswith('SELECT count(*)')]
+    assert logged and logged[0]['plan'] and not logged[0]['plan'][0].startswith('EXPLAIN failed')
+
+
+def test_failed_explain_is_logged_and_swallowed(profiled):
+    app, path = profiled
+    profiler = app.extensions['query_profiler']
+    with app.app_context():
+        db.session.add(Volunteer(name='Pending', phone='+15550000001'))
+        db.session.flush()
+        connection = db.session.connection().connection.dbapi_connection
+        cursor = connection.cursor()
+        plan = profiler._plan(db.engine, cursor, 'SELECT * FROM missing_table', ())
+        assert plan[0].startswith('EXPLAIN failed')
+
+        # The pending insert survived and the transaction still works
+        db.session.commit()
+        assert Volunteer.query.count() == 1
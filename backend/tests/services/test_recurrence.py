@@ -0,0 +1,82 @@
+"""Recurrence templates: validation and generated shifts"""
+import pytest
+
+from app import db
+from app.models import Shift
+from app.services.recurrence import RecurrenceService
+from tests.conftest import THURSDAY, shift_day
+
+DAYS_ERROR = 'days must be a list of day names'
+WEEKS_ERROR = 'weeks must be a list of weeks of the month (1-5)'
+
+
+@pytest.mark.parametrize('entry, error', [
+    ({'shift_type': 'Kakad', 'days': [['Thursday']]}, DAYS_ERROR),
+    ({'shift_type': 'Kakad', 'days': [{'day': 'Thursday'}]}, DAYS_ERROR),
+    ({'shift_type': 'Kakad', 'days': ['Thursday', 'Funday']}, DAYS_ERROR),
+    ({'shift_type': 'Kakad', 'days': 'Thursday'}, DAYS_ERROR),
+    ({'shift_type': 'Kakad', 'weeks': [[1]]}, WEEKS_ERROR),
+    ({'shift_type': 'Kakad', 'weeks': [True]}, WEEKS_ERROR),
+    ({'shift_type': 'Kakad', 'weeks': [1.0]}, WEEKS_ERROR),
+    ({'shift_type': 'Kakad', 'weeks': ['1']}, WEEKS_ERROR),
+    ({'shift_type': 'Kakad', 'weeks': [0]}, WEEKS_ERROR),
+    ({'shift_type': 'Kakad', 'weeks': [6]}, WEEKS_ERROR),
+])
+def test_invalid_days_and_weeks_are_rejected(entry, error):
+    assert RecurrenceService.validate_template([entry]).startswith(error)
+
+
+def test_valid_template():
+    assert RecurrenceService.validate_template([
+        {'shift_type': 'Kakad', 'days': ['Thursday'], 'weeks': [1, 3]},
+        {'shift_type': 'Robes', 'capacity': 2, 'days': [], 'weeks': [5]}
+    ]) is None
+
+
+def test_generate_rejects_nested_lists_with_400(app, client, factory):
+    response = client.post('/api/shifts/generate', headers=factory.coordinator_headers(), json={
+        'start_date': '2031-01-01',
+        'end_date': '2031-01-31',
+        'template': [{'shift_type': 'Kakad', 'days': [['Thursday']], 'weeks': [True]}]
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith(DAYS_ERROR)
+
+    with app.app_context():
+        assert Shift.query.count() == 0
+
+
+def test_generate_fills_calendar_fields(app, client, factory):
+    response = client.post('/api/shifts/generate', headers=factory.coordinator_headers(), json={
+        'start_date': '2031-01-01',
+        'end_date': '2031-01-31',
+        'template': [{'shift_type': 'Kakad', 'days': ['Thursday'], 'weeks': [1, 2]}]
+    })
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()['created'] == 2
+
+    with app.app_context():
+        shifts = db.session.query(Shift.date, Shift.day_name, Shift.week_of_month).order_by(Shift.date).all()
+    assert [(day.isoformat(), day_name, week) for day, day_name, week in shifts] == [
+        ('2031-01-02', 'Thursday', 1),
+        ('2031-01-09', 'Thursday', 2)
+    ]
+
+
+def test_overlapping_entries_create_and_count_one_shift(app, factory):
+    template = [
+        {'shift_type': 'Robes', 'capacity': 6, 'days': ['Thursday']},
+        {'shift_type': 'Robes', 'capacity': 4},
+        {'shift_type': 'Kakad', 'days': ['Thursday', 'Friday']}
+    ]
+    factory.shift(THURSDAY, 'Kakad')
+
+    with app.app_context():
+        created, skipped = RecurrenceService.generate(template, THURSDAY, shift_day(7))
+        db.session.commit()
+        # Seven Robes shifts and one new Kakad; Thursday's Kakad already existed
+        assert (created, skipped) == (8, 1)
+        assert Shift.query.count() == 9
+        capacities = dict(db.session.query(Shift.date, Shift.capacity).filter_by(shift_type='Robes'))
+    assert capacities[THURSDAY] == 6
+    assert capacities[shift_day(1)] == 4
@@ -0,0 +1,40 @@
+"""Reminders go out once per confirmed signup, however often the job runs"""
+from app import db
+from app.cli import send_reminders_command
+from app.models import OutboxMessage
+from app.services.reminders import ReminderService
+from tests.conftest import THURSDAY, shift_day
+
+
+def test_second_run_sends_nothing(app, factory):
+    kakad = factory.shift(THURSDAY, 'Kakad')
+    robes = factory.shift(THURSDAY, 'Robes')
+    factory.volunteer_with([kakad])
+    factory.volunteer_with([robes])
+    factory.volunteer_with([robes], status='cancelled')
+    factory.volunteer_with([factory.shift(shift_day(1), 'Robes')])
+    sender = app.extensions['outbox_dispatcher'].sender
+
+    runner = app.test_cli_runner()
+    first = runner.invoke(send_reminders_command, ['--date', THURSDAY.isoformat()])
+    assert first.exit_code == 0, first.output
+    assert 'Reminders queued: 2 (already queued: 0)' in first.output
+    assert len(sender.sent) == 2
+
+    second = runner.invoke(send_reminders_command, ['--date', THURSDAY.isoformat()])
+    assert second.exit_code == 0, second.output
+    assert 'Reminders queued: 0 (already queued: 2)' in second.output
+    assert len(sender.sent) == 2
+
+
+def test_signups_confirmed_after_a_run_are_reminded_next_time(app, factory):
+    robes = factory.shift(THURSDAY, 'Robes')
+    factory.volunteer_with([robes])
+
+    with app.app_context():
+        assert ReminderService.queue_reminders(THURSDAY) == (1, 1)
+    factory.volunteer_with([robes])
+    with app.app_context():
+        assert ReminderService.queue_reminders(THURSDAY) == (1, 2)
+        assert OutboxMessage.query.filter_by(kind='reminder').count() == 2
+        assert db.session.query(OutboxMessage.dedupe_key).distinct().count() == 2
@@ -0,0 +1,117 @@
+"""Generated rosters stay within the scheduling rules and shift capacities"""
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+
+from app import db
+from app.models import Shift, Signup
+from app.services.counters import CounterService
+from app.services.roster import RosterService
+from app.services.rules import get_rule_set
+from app.services.validation import ValidationService
+from tests.conftest import THURSDAY, shift_day
+
+END = shift_day(14)
+
+
+@pytest.fixture
+def fortnight(factory):
+    """Two weeks of Kakad and Robes shifts, six volunteers, a few existing signups"""
+    shifts = {
+        (day, shift_type): factory.shift(day, shift_type)
+        for day in (shift_day(offset) for offset in range(14))
+        for shift_type in ('Kakad', 'Robes')
+    }
+    volunteers = [factory.volunteer(reliability_score=score) for score in (95, 90, 80, 70, 60, 50)]
+    factory.signups([
+        (volunteers[0], shifts[THURSDAY, 'Kakad']),
+        (volunteers[0], shifts[shift_day(1), 'Kakad']),
+        (volunteers[1], shifts[THURSDAY, 'Robes']),
+        (volunteers[2], shifts[shift_day(3), 'Robes']),
+    ])
+    factory.signups([(volunteers[3], shifts[shift_day(7), 'Robes'])], status='cancelled')
+    return shifts, volunteers
+
+
+def test_roster_respects_rules_and_capacity(app, fortnight):
+    _, volunteers = fortnight
+
+    with app.app_context():
+        roster = RosterService.generate(THURSDAY, END)
+        rule_set = get_rule_set()
+        pairs = [(row['volunteer_id'], row['shift_id']) for row in roster['assignments']]
+        shifts = {shift.id: shift for shift in Shift.query}
+        existing = set(db.session.query(Signup.volunteer_id, Signup.shift_id))
+        counters = ValidationService.get_signup_counters(volunteers, rule_set)
+
+        assert len(set(pairs)) == len(pairs)
+        assert not set(pairs) & existing
+
+        for shift_id, assigned in Counter(shift_id for _, shift_id in pairs).items():
+            assert shifts[shift_id].confirmed_count + assigned <= shifts[shift_id].capacity
+
+        for volunteer_id in volunteers:
+            vector = counters.get(volunteer_id, rule_set.empty())
+            for assigned_volunteer, shift_id in pairs:
+                if assigned_volunteer == volunteer_id:
+                    vector = [current + delta for current, delta in zip(vector, rule_set.deltas(shifts[shift_id]))]
+            for rule, count in zip(rule_set.rules, vector):
+                assert count <= rule.limit, (volunteer_id, rule.key)
+
+        # Seats are plentiful, so every volunteer reaches the total limit
+        total = rule_set.keys.index('total')
+        remaining = sum(
+            rule_set.rules[total].limit - counters.get(volunteer_id, rule_set.empty())[total]
+            for volunteer_id in volunteers
+        )
+        assert roster['stats']['filled_seats'] == len(pairs) == remaining
+        assert roster['stats']['open_seats'] == sum(
+            shift.capacity - shift.confirmed_count for shift in shifts.values()
+        )
+
+
+def test_scarce_seats_go_to_the_most_reliable(app, factory):
+    shift_id = factory.shift(THURSDAY, 'Kakad')
+    volunteers = [factory.volunteer(reliability_score=score) for score in (40, 90, 70)]
+
+    with app.app_context():
+        roster = RosterService.generate(THURSDAY, shift_day(1))
+
+    assert [(row['volunteer_id'], row['shift_id']) for row in roster['assignments']] == [(volunteers[1], shift_id)]
+    assert roster['unfilled'] == []
+
+
+def test_full_shifts_are_left_out(app, factory):
+    full = factory.shift(THURSDAY, 'Kakad')
+    factory.signups([(factory.volunteer(), full)])
+    factory.volunteer()
+
+    with app.app_context():
+        roster = RosterService.generate(THURSDAY, shift_day(1))
+
+    assert roster['assignments'] == []
+    assert roster['stats']['open_shifts'] == 0
+
+
+def test_preview_commits_without_rejections_or_drift(app, client, factory, fortnight):
+    headers = factory.coordinator_headers()
+    window = {'start_date': THURSDAY.isoformat(), 'end_date': (END - timedelta(days=1)).isoformat()}
+
+    preview = client.post('/api/coordinator/roster/preview', headers=headers, json=window)
+    assert preview.status_code == 200, preview.get_json()
+    assignments = preview.get_json()['assignments']
+
+    commit = client.post('/api/coordinator/roster/commit', headers=headers, json={
+        'assignments': assignments, 'mode': 'atomic'
+    })
+    assert commit.status_code == 201, commit.get_json()
+    assert commit.get_json()['created'] == len(assignments)
+
+    with app.app_context():
+        assert CounterService.rebuild_shift_counts(check_only=True) == 0
+        assert CounterService.rebuild_volunteer_quotas(check_only=True) == 0
+
+    # Every volunteer is at the total limit now
+    again = client.post('/api/coordinator/roster/preview', headers=headers, json=window)
+    assert again.get_json()['assignments'] == []
@@ -0,0 +1,138 @@
+"""Scheduling rules: default limits, messages, stats and recompiling"""
+
+import pytest
+
+from app import db
+from app.services.rules import DEFAULT_SCHEDULING_RULES, RuleService, get_rule_set
+from app.services.validation import ValidationService
+from tests.conftest import THURSDAY, FRIDAY, shift_day, weekly
+
+# Thursdays and Fridays of later weeks, so background signups never collide
+THURSDAYS = weekly(THURSDAY, 4)
+FRIDAYS = weekly(FRIDAY, 4)
+
+KAKAD_LIMIT = 'Maximum Kakad signups (2) reached'
+TOTAL_LIMIT = 'Maximum total signups (4) reached'
+THURSDAY_LIMIT = 'Maximum Thursday signups (2) reached'
+
+
+@pytest.fixture
+def shifts(factory):
+    """Background shifts keyed by name, and the target shifts being validated"""
+    return {
+        'friday_kakad': [factory.shift(day, 'Kakad') for day in FRIDAYS],
+        'friday_robes': [factory.shift(day, 'Robes') for day in FRIDAYS],
+        'thursday_robes': [factory.shift(day, 'Robes') for day in THURSDAYS],
+        'target_kakad': factory.shift(shift_day(2), 'Kakad'),
+        'target_robes': factory.shift(shift_day(2), 'Robes'),
+        'target_thursday': factory.shift(THURSDAY, 'Robes'),
+        'thursday_kakad': factory.shift(THURSDAY, 'Kakad')
+    }
+
+
+def validate(app, volunteer_id, shift_id):
+    with app.app_context():
+        return ValidationService.validate_signup(volunteer_id, shift_id)
+
+
+@pytest.mark.parametrize('background, target, error', [
+    ('friday_kakad', 'target_kakad', KAKAD_LIMIT),
+    ('thursday_robes', 'target_thursday', THURSDAY_LIMIT),
+])
+def test_limit_of_two_blocks_the_third_signup(app, factory, shifts, background, target, error):
+    below = factory.volunteer_with(shifts[background][:1])
+    at = factory.volunteer_with(shifts[background][:2])
+
+    assert validate(app, below, shifts[target]) == (True, None)
+    assert validate(app, at, shifts[target]) == (False, error)
+
+
+def test_total_limit_blocks_the_fifth_signup(app, factory, shifts):
+    below = factory.volunteer_with(shifts['friday_robes'][:3])
+    at = factory.volunteer_with(shifts['friday_robes'])
+
+    assert validate(app, below, shifts['target_robes']) == (True, None)
+    assert validate(app, at, shifts['target_robes']) == (False, TOTAL_LIMIT)
+
+
+def test_limits_only_count_matching_shifts(app, factory, shifts):
+    # Two Thursday Robes shifts do not count towards Kakad, nor Friday Kakad towards Thursday
+    volunteer_id = factory.volunteer_with(shifts['thursday_robes'][:2])
+    assert validate(app, volunteer_id, shifts['target_kakad']) == (True, None)
+
+    volunteer_id = factory.volunteer_with(shifts['friday_kakad'][:2])
+    assert validate(app, volunteer_id, shifts['target_thursday']) == (True, None)
+
+
+def test_cancelled_signups_do_not_count(app, factory, shifts):
+    volunteer_id = factory.volunteer()
+    factory.signups([(volunteer_id, shift_id) for shift_id in shifts['friday_kakad'][:2]], status='cancelled')
+    assert validate(app, volunteer_id, shifts['target_kakad']) == (True, None)
+
+
+def test_first_failing_check_gives_the_message(app, factory, shifts):
+    # Over every limit at once: Kakad is reported first
+    volunteer_id = factory.volunteer_with(shifts['friday_kakad'][:2] + shifts['thursday_robes'][:2])
+    assert validate(app, volunteer_id, shifts['thursday_kakad']) == (False, KAKAD_LIMIT)
+
+    # Total before Thursday
+    volunteer_id = factory.volunteer_with(shifts['thursday_robes'][:2] + shifts['friday_robes'][:2])
+    assert validate(app, volunteer_id, shifts['thursday_kakad']) == (False, TOTAL_LIMIT)
+
+    # Capacity before duplicate: the volunteer holds the only Kakad place
+    volunteer_id = factory.volunteer_with([shifts['target_kakad']])
+    assert validate(app, volunteer_id, shifts['target_kakad']) == (False, 'Shift is at full capacity (1)')
+
+    # A cancelled signup still counts as signed up
+    volunteer_id = factory.volunteer()
+    factory.signups([(volunteer_id, shifts['target_robes'])], status='cancelled')
+    assert validate(app, volunteer_id, shifts['target_robes']) == (False, 'Already signed up for this shift')
+
+    with app.app_context():
+        assert ValidationService.validate_signup(volunteer_id, 999999) == (False, 'Shift not found')
+
+
+def test_stats_keys_and_values(app, client, factory, shifts):
+    volunteer_id = factory.volunteer_with(shifts['friday_kakad'][:1] + shifts['thursday_robes'][:2])
+
+    with app.app_context():
+        stats = ValidationService.get_volunteer_stats(volunteer_id)
+    assert stats == {
+        'kakad_signups': 1,
+        'kakad_remaining': 1,
+        'total_signups': 3,
+        'total_remaining': 1,
+        'thursday_signups': 2,
+        'thursday_remaining': 0
+    }
+    assert list(stats) == [
+        'kakad_signups', 'kakad_remaining',
+        'total_signups', 'total_remaining',
+        'thursday_signups', 'thursday_remaining'
+    ]
+
+    response = client.get(f'/api/volunteers/{volunteer_id}/stats', headers=factory.coordinator_headers())
+    assert response.status_code == 200
+    assert response.get_json()['stats'] == stats
+
+
+def test_replace_rules_recompiles_the_cache(app, factory, shifts):
+    volunteer_id = factory.volunteer_with(shifts['friday_kakad'][:1])
+    assert validate(app, volunteer_id, shifts['target_kakad']) == (True, None)
+
+    with app.app_context():
+        before = get_rule_set()
+        assert before.keys == ('kakad', 'total', 'thursday')
+
+        rules = [dict(rule) for rule in DEFAULT_SCHEDULING_RULES]
+        rules[0]['max_signups'] = 1
+        rules.append({'key': 'week_one', 'week_of_month': 1, 'max_signups': 3})
+        RuleService.replace_rules(rules)
+        db.session.commit()
+
+        after = get_rule_set()
+        assert after is not before
+        assert after.keys == ('kakad', 'total', 'thursday', 'week_one')
+        assert ValidationService.get_volunteer_stats(volunteer_id)['week_one_remaining'] == 3
+
+    assert validate(app, volunteer_id, shifts['target_kakad']) == (False, 'Maximum Kakad signups (1) reached')
@@ -0,0 +1,93 @@
+"""Twilio sender: one pooled client per process"""
+import os
+
+import pytest
+
+from app.services.senders import SendError, TwilioSender, build_sender
+from benchmarks.twilio_client import StubHandler, make_sender, start_stub
+
+
+@pytest.fixture
+def stub():
+    server, base_url = start_stub()
+    StubHandler.connections.clear()
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_and_connection_are_reused(stub):
+    sender = make_sender(stub, pool_size=2)
+    sender.send('+15550000001', 'First')
+    client = sender.client
+
+    for index in range(5):
+        sender.send(f'+1555000000{index}', 'Again')
+
+    assert sender.client is client
+    # Every request went over the same kept-alive connection
+    assert len(StubHandler.connections) == 1
+    sender.reset()
+
+
+def test_reset_drops_the_client(stub):
+    sender = make_sender(stub, pool_size=2)
+    sender.send('+15550000001', 'First')
+    client = sender.client
+
+    sender.reset()
+    sender.send('+15550000001', 'Second')
+    assert sender.client is not client
+    assert len(StubHandler.connections) == 2
+    sender.reset()
+
+
+def test_failures_raise_send_error():
+    # Nothing listens on port 9, so the request fails without retries
+    sender = make_sender('http://127.0.0.1:9', pool_size=1)
+    with pytest.raises(SendError):
+        sender.send('+15550000001', 'Lost')
+    sender.reset()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_builds_its_own_client(stub):
+    sender = make_sender(stub, pool_size=2)
+    sender.send('+15550000001', 'Parent')
+    parent_client = sender.client
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            dropped = sender._client is None
+            sender.send('+15550000002', 'Child')
+            rebuilt = sender.client is not parent_client
+            os.write(write, b'ok' if dropped and rebuilt else b'shared')
+        finally:
+            os._exit(0)
+
+    os.close(write)
+    _, status = os.waitpid(pid, 0)
+    result = os.read(read, 16)
+    os.close(read)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert result == b'ok'
+    # The parent keeps its client
+    assert sender.client is parent_client
+    sender.reset()
+
+
+def test_build_sender_uses_twilio_settings():
+    sender = build_sender({
+        'NOTIFICATION_SENDER': 'auto',
+        'TWILIO_ACCOUNT_SID': 'AC' + '0' * 32,
+        'TWILIO_AUTH_TOKEN': 'token',
+        'TWILIO_WHATSAPP_NUMBER': 'whatsapp:+14155238886',
+        'TWILIO_POOL_SIZE': 3,
+        'TWILIO_TIMEOUT': 5,
+        'TWILIO_MAX_RETRIES': 0
+    })
+    assert isinstance(sender, TwilioSender)
+    assert (sender.pool_size, sender.timeout) == (3, 5)
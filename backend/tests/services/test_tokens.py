@@ -0,0 +1,137 @@
+"""Access tokens are rejected once revoked, outdated or incomplete, and checking them never writes"""
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+
+from app import db
+from app.cli import prune_revoked_tokens_command
+from app.models import RevokedToken, User
+from app.services.tokens import TokenService
+
+
+def me(client, headers):
+    return client.get('/api/auth/me', headers=headers)
+
+
+def test_logout_revokes_the_token(client, factory):
+    headers = factory.headers(factory.user())
+    other = factory.headers(factory.user())
+    assert me(client, headers).status_code == 200
+
+    response = client.post('/api/auth/logout', headers=headers)
+    assert response.status_code == 200, response.get_json()
+
+    response = me(client, headers)
+    assert response.status_code == 401
+    assert response.get_json()['msg'] == 'Token has been revoked'
+    assert me(client, other).status_code == 200
+
+
+def test_revocations_by_other_processes_are_picked_up(app, client, factory):
+    user_id = factory.user()
+    headers = factory.headers(user_id)
+    assert me(client, headers).status_code == 200
+
+    # A revocation another process wrote, seen at this process's next sync
+    with app.app_context():
+        payload = decode_token(headers['Authorization'].split()[1])
+        db.session.add(RevokedToken(
+            jti=payload['jti'], user_id=user_id, expires_at=datetime.utcfromtimestamp(payload['exp'])
+        ))
+        db.session.commit()
+        app.extensions['revoked_tokens'].sync_seconds = 0
+
+    assert me(client, headers).status_code == 401
+
+
+def test_checking_tokens_only_reads(app, client, factory, count_statements):
+    with app.app_context():
+        db.session.add(RevokedToken(jti='expired', expires_at=datetime.utcnow() - timedelta(days=1)))
+        db.session.commit()
+        revoked = app.extensions['revoked_tokens']
+        revoked.sync_seconds = revoked.reload_seconds = 0
+    headers = factory.headers(factory.user())
+
+    with count_statements() as counter:
+        assert me(client, headers).status_code == 200
+    assert not [
+        statement for statement in counter.statements
+        if statement.lstrip().upper().startswith(('DELETE', 'INSERT', 'UPDATE'))
+    ]
+    with app.app_context():
+        assert RevokedToken.query.count() == 1
+        assert 'expired' not in app.extensions['revoked_tokens']
+
+
+def test_prune_deletes_only_expired_revocations(app):
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add_all([
+            RevokedToken(jti='expired', expires_at=now - timedelta(minutes=1)),
+            RevokedToken(jti='live', expires_at=now + timedelta(days=1))
+        ])
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(prune_revoked_tokens_command)
+    assert result.exit_code == 0, result.output
+    assert 'Expired revocations deleted: 1' in result.output
+
+    with app.app_context():
+        assert [token.jti for token in RevokedToken.query] == ['live']
+
+
+def test_token_is_rejected_after_a_version_bump(app, client, factory):
+    user_id = factory.user()
+    headers = factory.headers(user_id)
+    assert me(client, headers).status_code == 200
+
+    with app.app_context():
+        TokenService.bump_version(db.session.get(User, user_id))
+        db.session.commit()
+
+    response = me(client, headers)
+    assert response.status_code == 401
+    assert me(client, factory.headers(user_id)).status_code == 200
+
+
+def test_version_bumps_elsewhere_are_seen_at_the_next_refresh(app, client, factory):
+    user_id = factory.user()
+    headers = factory.headers(user_id)
+    assert me(client, headers).status_code == 200
+
+    # Another process bumps the version; this one has not been told
+    with app.app_context():
+        db.session.execute(db.update(User).where(User.id == user_id).values(token_version=User.token_version + 1))
+        db.session.commit()
+    assert me(client, headers).status_code == 200
+
+    app.extensions['token_versions'].refresh_seconds = 0
+    assert me(client, headers).status_code == 401
+
+
+def test_refresh_reads_only_the_users_checked(app, client, factory, count_statements):
+    active, idle = factory.user(), factory.user()
+    headers = factory.headers(active)
+    assert me(client, headers).status_code == 200
+
+    versions = app.extensions['token_versions']
+    versions.refresh_seconds = 0
+    with count_statements() as counter:
+        assert me(client, headers).status_code == 200
+    refreshes = [statement for statement in counter.statements if statement.startswith('SELECT users.id, users.token_version')]
+    assert len(refreshes) == 1
+    assert 'WHERE users.id IN (?)' in refreshes[0]
+    assert idle not in versions._versions
+
+
+@pytest.mark.parametrize('missing', ['role', 'volunteer_id', 'tv'])
+def test_tokens_missing_a_claim_are_rejected(app, client, factory, missing):
+    user_id = factory.user()
+    with app.app_context():
+        claims = TokenService.claims_for(db.session.get(User, user_id))
+        del claims[missing]
+        token = create_access_token(identity=str(user_id), additional_claims=claims)
+
+    response = me(client, {'Authorization': f'Bearer {token}'})
+    assert response.status_code == 401
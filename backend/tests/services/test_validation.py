@@ -0,0 +1,128 @@
+"""Substitute eligibility: one grouped query, same candidates as the per-volunteer rules"""
+
+import pytest
+
+from app import db
+from app.models import Shift, Signup, Volunteer
+from app.services.validation import ValidationService
+from tests.conftest import THURSDAY, FRIDAY, weekly
+
+
+def reference_eligible(shift_id):
+    """The five rules as validate_signup applied them to one volunteer at a time"""
+    shift = db.session.get(Shift, shift_id)
+    confirmed_on_shift = Signup.query.filter_by(shift_id=shift_id, status='confirmed').count()
+    eligible = []
+    for volunteer in Volunteer.query.order_by(Volunteer.id):
+        confirmed = [signup for signup in volunteer.signups if signup.status == 'confirmed']
+        kakad = sum(1 for signup in confirmed if signup.shift.shift_type == 'Kakad')
+        thursday = sum(1 for signup in confirmed if signup.shift.day_name == 'Thursday')
+        if shift.shift_type == 'Kakad' and kakad >= 2:
+            continue
+        if len(confirmed) >= 4:
+            continue
+        if shift.day_name == 'Thursday' and thursday >= 2:
+            continue
+        if confirmed_on_shift >= shift.capacity:
+            continue
+        if any(signup.shift_id == shift_id for signup in volunteer.signups):
+            continue
+        eligible.append(volunteer.id)
+    return eligible
+
+
+class Roster:
+    """Background shifts and volunteers whose signups hit each rule"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        week = weekly(THURSDAY, 4)
+        other = weekly(FRIDAY, 4)
+        self.thursday_robes = [factory.shift(day, 'Robes', capacity=1000) for day in week]
+        self.other_robes = [factory.shift(day, 'Robes', capacity=1000) for day in other]
+        self.other_kakad = [factory.shift(day, 'Kakad', capacity=1000) for day in other[:2]]
+        self.thursday_kakad = factory.shift(THURSDAY, 'Kakad', capacity=1000)
+        self.friday_robes = factory.shift(FRIDAY, 'Robes', capacity=1000)
+        self.full = factory.shift(THURSDAY, 'Robes', capacity=1)
+        factory.signups([(factory.volunteer(), self.full)])
+        self.patterns = [
+            [],
+            self.other_kakad,                              # Kakad limit
+            self.thursday_robes[:2],                       # Thursday limit
+            self.other_robes,                              # total limit
+            self.other_kakad[:1] + self.thursday_robes[:1],
+            self.other_robes[:3],
+            [self.thursday_kakad],                         # duplicate
+            [self.friday_robes],                           # duplicate
+        ]
+
+    def add_volunteers(self, count):
+        confirmed = []
+        cancelled = []
+        for index in range(count):
+            volunteer_id = self.factory.volunteer()
+            pattern = self.patterns[index % len(self.patterns)]
+            confirmed.extend((volunteer_id, shift_id) for shift_id in pattern)
+            if index % 5 == 4 and self.friday_robes not in pattern:
+                # Cancelled signups still count as duplicates, never towards limits
+                cancelled.append((volunteer_id, self.friday_robes))
+        self.factory.signups(confirmed)
+        if cancelled:
+            self.factory.signups(cancelled, status='cancelled')
+
+
+@pytest.fixture
+def roster(factory):
+    return Roster(factory)
+
+
+def test_candidates_match_the_per_volunteer_rules(app, roster):
+    roster.add_volunteers(40)
+
+    with app.app_context():
+        for shift_id in (roster.thursday_kakad, roster.friday_robes, roster.full, *roster.other_robes):
+            expected = reference_eligible(shift_id)
+            found = [volunteer.id for volunteer in ValidationService.find_eligible_volunteers(shift_id)]
+            assert found == expected
+
+        # Every rule rejects someone, so the comparison covers all five
+        everyone = Volunteer.query.count()
+        assert 0 < len(reference_eligible(roster.thursday_kakad)) < everyone
+        assert reference_eligible(roster.full) == []
+
+
+def test_exclude_volunteer(app, roster):
+    roster.add_volunteers(8)
+
+    with app.app_context():
+        expected = reference_eligible(roster.friday_robes)
+        found = ValidationService.find_eligible_volunteers(roster.friday_robes, exclude_volunteer_id=expected[0])
+        assert [volunteer.id for volunteer in found] == expected[1:]
+
+
+def test_statement_count_does_not_grow_with_volunteers(app, client, factory, roster, count_statements):
+    headers = factory.coordinator_headers()
+    path = f'/api/coordinator/substitutes?shift_id={roster.thursday_kakad}'
+
+    def measure():
+        # Warm per-process caches (rules, token versions) first
+        with app.app_context():
+            ValidationService.find_eligible_candidates(roster.thursday_kakad)
+        client.get(path, headers=headers)
+
+        with app.app_context():
+            with count_statements() as service:
+                candidates = ValidationService.find_eligible_candidates(roster.thursday_kakad)
+        with count_statements() as route:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()['available_substitutes']) == len(candidates)
+        return service.count, route.count, len(candidates)
+
+    roster.add_volunteers(8)
+    small = measure()
+    roster.add_volunteers(72)
+    large = measure()
+
+    assert large[2] > small[2] * 5
+    assert large[:2] == small[:2]
@@ -0,0 +1,202 @@
+"""Alembic revisions bring databases created by the original schema up to date"""
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+from flask_migrate import upgrade
+
+from app import create_app, db
+from app.models import Shift
+from tests.conftest import PASSWORD, PASSWORD_HASH, walk
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Tables as db.create_all() built them before any of the later columns, indexes and tables
+BASELINE_SCHEMA = [
+    '''CREATE TABLE volunteers (
+        id INTEGER NOT NULL, name VARCHAR(255) NOT NULL, phone VARCHAR(20) NOT NULL,
+        email VARCHAR(255), reliability_score INTEGER, created_at DATETIME, updated_at DATETIME,
+        PRIMARY KEY (id), UNIQUE (phone), UNIQUE (email)
+    )''',
+    '''CREATE TABLE shifts (
+        id INTEGER NOT NULL, date DATE NOT NULL, day_name VARCHAR(10) NOT NULL,
+        week_of_month INTEGER, shift_type VARCHAR(10) NOT NULL, capacity INTEGER NOT NULL,
+        created_at DATETIME,
+        PRIMARY KEY (id), CONSTRAINT unique_date_shifttype UNIQUE (date, shift_type)
+    )''',
+    '''CREATE TABLE signups (
+        id INTEGER NOT NULL, volunteer_id INTEGER NOT NULL, shift_id INTEGER NOT NULL,
+        status VARCHAR(20), created_at DATETIME,
+        PRIMARY KEY (id), CONSTRAINT unique_volunteer_shift UNIQUE (volunteer_id, shift_id),
+        FOREIGN KEY(volunteer_id) REFERENCES volunteers (id),
+        FOREIGN KEY(shift_id) REFERENCES shifts (id)
+    )''',
+    '''CREATE TABLE users (
+        id INTEGER NOT NULL, volunteer_id INTEGER, username VARCHAR(100) NOT NULL,
+        password_hash VARCHAR(255) NOT NULL, role VARCHAR(20), created_at DATETIME,
+        PRIMARY KEY (id), UNIQUE (volunteer_id), FOREIGN KEY(volunteer_id) REFERENCES volunteers (id),
+        UNIQUE (username)
+    )'''
+]
+
+CREATED = '2026-01-15 01:58:49.289415'
+
+
+@pytest.fixture
+def legacy_path(tmp_path):
+    """A SQLite file with the original schema, two volunteers, shifts and signups"""
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    for statement in BASELINE_SCHEMA:
+        conn.execute(statement)
+    conn.executemany(
+        'INSERT INTO volunteers (id, name, phone, reliability_score, created_at, updated_at) '
+        'VALUES (?, ?, ?, ?, ?, ?)', [
+            (1, 'Coordinator', '+15550000001', 100, CREATED, CREATED),
+            (2, 'Volunteer', '+15550000002', 90, CREATED, CREATED),
+            (3, 'Unscored', '+15550000003', None, CREATED, CREATED)
+        ]
+    )
+    conn.executemany(
+        'INSERT INTO shifts (id, date, day_name, shift_type, capacity, created_at) VALUES (?, ?, ?, ?, ?, ?)', [
+            (1, '2031-01-02', 'Thursday', 'Kakad', 1, CREATED),
+            (2, '2031-01-02', 'Thursday', 'Robes', 4, CREATED),
+            (3, '2031-01-10', 'Friday', 'Robes', 4, CREATED)
+        ]
+    )
+    conn.executemany('INSERT INTO signups (volunteer_id, shift_id, status, created_at) VALUES (?, ?, ?, ?)', [
+        (2, 1, 'confirmed', CREATED), (2, 2, 'confirmed', CREATED),
+        (1, 2, 'cancelled', CREATED), (2, 3, 'confirmed', CREATED)
+    ])
+    conn.executemany('INSERT INTO users (volunteer_id, username, password_hash, role, created_at) VALUES (?, ?, ?, ?, ?)', [
+        (1, 'coordinator', PASSWORD_HASH, 'coordinator', CREATED),
+        (2, 'volunteer', PASSWORD_HASH, 'volunteer', CREATED)
+    ])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def migrated_app(path):
+    app = create_app('testing', config_overrides={'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        db.session.remove()
+    return app
+
+
+def login(client, username):
+    response = client.post('/api/auth/login', json={'username': username, 'password': PASSWORD})
+    assert response.status_code == 200, response.get_json()
+    return {'Authorization': f'Bearer {response.get_json()["access_token"]}'}
+
+
+def test_upgrade_adds_columns_and_counts_signups(legacy_path):
+    app = migrated_app(legacy_path)
+    client = app.test_client()
+
+    headers = login(client, 'coordinator')
+    assert client.get('/api/shifts', headers=headers).status_code == 200
+
+    with app.app_context():
+        counts = dict(db.session.query(Shift.id, Shift.confirmed_count))
+    assert counts == {1: 1, 2: 1, 3: 1}
+
+    response = client.get('/api/auth/me', headers=login(client, 'volunteer'))
+    assert response.status_code == 200
+
+
+def test_upgrade_is_a_no_op_on_a_current_database(tmp_path):
+    path = str(tmp_path / 'current.db')
+    app = migrated_app(path)
+    with app.app_context():
+        version = db.session.execute(db.text('SELECT version_num FROM alembic_version')).scalar()
+        # Running it again finds nothing to do
+        upgrade(directory=MIGRATIONS)
+    assert version is not None
+
+
+def test_shift_queries_work_after_upgrade(legacy_path):
+    app = migrated_app(legacy_path)
+    with app.app_context():
+        shift = db.session.get(Shift, 1)
+        assert shift.date == date(2031, 1, 2)
+        assert shift.confirmed_count == 1
+
+
+def test_deleting_a_shift_cascades_to_its_signups(legacy_path):
+    app = migrated_app(legacy_path)
+    client = app.test_client()
+
+    response = client.delete('/api/shifts/2', headers=login(client, 'coordinator'))
+    assert response.status_code == 200, response.get_json()
+
+    with app.app_context():
+        remaining = db.session.execute(db.text('SELECT shift_id FROM signups ORDER BY shift_id')).scalars().all()
+        foreign_keys = db.inspect(db.engine).get_foreign_keys('signups')
+    assert remaining == [1, 3]
+    cascade = [fk for fk in foreign_keys if fk['referred_table'] == 'shifts']
+    assert cascade[0]['options'].get('ondelete') == 'CASCADE'
+
+
+def test_upgrade_backfills_week_of_month(legacy_path):
+    app = migrated_app(legacy_path)
+    with app.app_context():
+        weeks = dict(db.session.query(Shift.id, Shift.week_of_month))
+    assert weeks == {1: 1, 2: 1, 3: 2}
+
+
+def test_upgrade_creates_hot_path_indexes(legacy_path):
+    app = migrated_app(legacy_path)
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        indexes = {
+            table: {index['name'] for index in inspector.get_indexes(table)}
+            for table in ('signups', 'shifts', 'volunteers')
+        }
+        partial = db.session.execute(db.text(
+            "SELECT sql FROM sqlite_master WHERE name = 'ix_signups_confirmed_volunteer_shift'"
+        )).scalar()
+    assert {'ix_signups_shift_status_volunteer', 'ix_signups_confirmed_volunteer_shift'} <= indexes['signups']
+    assert 'ix_shifts_date_id' in indexes['shifts']
+    assert 'ix_volunteers_reliability_id' in indexes['volunteers']
+    assert "WHERE status = 'confirmed'" in partial
+
+
+def test_upgrade_creates_tables_and_columns_missing_from_create_all(legacy_path):
+    # Rewind a migrated database to before the tables and token_version existed
+    app = migrated_app(legacy_path)
+    tables = [
+        'volunteer_rule_counts', 'scheduling_rules', 'revoked_tokens',
+        'notification_outbox', 'notification_jobs', 'notification_send_budget'
+    ]
+    with app.app_context():
+        for table in tables:
+            db.session.execute(db.text(f'DROP TABLE {table}'))
+        db.session.execute(db.text('ALTER TABLE users DROP COLUMN token_version'))
+        db.session.execute(db.text("UPDATE alembic_version SET version_num = 'c41d7e9a2f60'"))
+        db.session.commit()
+
+        upgrade(directory=MIGRATIONS)
+        inspector = db.inspect(db.engine)
+        assert set(tables) <= set(inspector.get_table_names())
+        assert 'token_version' in {column['name'] for column in inspector.get_columns('users')}
+        assert {index['name'] for index in inspector.get_indexes('notification_outbox')} == {
+            'ix_notification_outbox_job_id', 'ix_outbox_status_next_attempt'
+        }
+
+
+def test_upgrade_fills_null_scores_so_reliability_pages_work(legacy_path):
+    app = migrated_app(legacy_path)
+    client = app.test_client()
+    headers = login(client, 'coordinator')
+
+    volunteers, pages = walk(client, headers, '/api/coordinator/volunteers/reliability', 1)
+    assert pages == 3
+    seen = [(volunteer['id'], volunteer['reliability_score']) for volunteer in volunteers]
+    assert seen == [(3, 100), (1, 100), (2, 90)]
+
+    with app.app_context():
+        columns = {column['name']: column for column in db.inspect(db.engine).get_columns('volunteers')}
+    assert columns['reliability_score']['nullable'] is False
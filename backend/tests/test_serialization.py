@@ -0,0 +1,95 @@
+"""Row serializers produce what the models' to_dict() produced, with either encoder"""
+import json
+from datetime import datetime
+
+import pytest
+
+from app import db, serialization
+from app.models import Shift, Signup, Volunteer
+from app.serialization import ENCODERS, SHIFT_ROWS, SIGNUP_ROWS, VOLUNTEER_ROWS
+from tests.conftest import THURSDAY
+
+encoders = pytest.mark.parametrize('encoder', [
+    'json',
+    pytest.param('orjson', marks=pytest.mark.skipif('orjson' not in ENCODERS, reason='orjson not installed'))
+])
+
+
+@pytest.fixture
+def records(app, factory):
+    """Volunteers, shifts and signups with a non-ASCII name, a NULL email and whole-second timestamps"""
+    volunteers = [factory.volunteer(name='Zoë Ångström'), factory.volunteer()]
+    shifts = [factory.shift(THURSDAY, 'Kakad'), factory.shift(THURSDAY, 'Robes')]
+    factory.signups([(volunteers[0], shifts[0]), (volunteers[1], shifts[1])])
+    factory.signups([(volunteers[0], shifts[1])], status='cancelled')
+
+    with app.app_context():
+        # isoformat() drops zero microseconds; the encoders must do the same
+        whole = datetime(2031, 1, 1, 8, 30)
+        db.session.get(Volunteer, volunteers[0]).email = 'zoe@example.com'
+        db.session.get(Volunteer, volunteers[1]).created_at = whole
+        db.session.get(Shift, shifts[0]).created_at = whole
+        db.session.execute(db.update(Signup).where(Signup.volunteer_id == volunteers[1]).values(created_at=whole))
+        db.session.commit()
+
+
+def decoded(encoder, payload):
+    return json.loads(ENCODERS[encoder](payload))
+
+
+@encoders
+@pytest.mark.parametrize('serializer, model, options', [
+    (VOLUNTEER_ROWS, Volunteer, {}),
+    (SHIFT_ROWS, Shift, {}),
+    (SIGNUP_ROWS, Signup, {'include_shift': False, 'include_volunteer': False}),
+])
+def test_rows_match_to_dict(app, records, encoder, serializer, model, options):
+    with app.app_context():
+        rows = db.session.query(*serializer.select_columns()).select_from(model).order_by(model.id).all()
+        expected = [item.to_dict(**options) for item in model.query.order_by(model.id)]
+
+    assert decoded(encoder, serializer.rows(rows)) == json.loads(json.dumps(expected))
+
+
+@encoders
+def test_nested_rows_match_to_dict(app, records, encoder):
+    serializer = SIGNUP_ROWS.expand(volunteer=VOLUNTEER_ROWS, shift=SHIFT_ROWS)
+    with app.app_context():
+        rows = db.session.query(*serializer.select_columns()).select_from(Signup).join(
+            Volunteer, Signup.volunteer_id == Volunteer.id
+        ).join(
+            Shift, Signup.shift_id == Shift.id
+        ).order_by(Signup.id).all()
+        expected = [signup.to_dict() for signup in Signup.query.order_by(Signup.id)]
+
+    assert decoded(encoder, serializer.rows(rows)) == json.loads(json.dumps(expected))
+
+
+@encoders
+@pytest.mark.parametrize('path', ['/api/signups', '/api/signups/export'])
+def test_signup_responses_match_to_dict(app, client, factory, records, monkeypatch, encoder, path):
+    monkeypatch.setattr(serialization, 'dumps', ENCODERS[encoder])
+
+    response = client.get(path, headers=factory.coordinator_headers(), query_string={'expand': 'volunteer,shift'})
+    assert response.status_code == 200
+
+    with app.app_context():
+        expected = [signup.to_dict() for signup in Signup.query.order_by(Signup.id.desc())]
+    assert json.loads(response.get_data()) == json.loads(json.dumps(expected))
+
+
+@encoders
+def test_list_responses_match_to_dict(app, client, factory, records, monkeypatch, encoder):
+    monkeypatch.setattr(serialization, 'dumps', ENCODERS[encoder])
+    headers = factory.coordinator_headers()
+
+    shifts = client.get('/api/shifts', headers=headers).get_json()
+    volunteers = client.get('/api/volunteers', headers=headers).get_json()
+
+    with app.app_context():
+        assert shifts == json.loads(json.dumps([
+            shift.to_dict() for shift in Shift.query.order_by(Shift.date, Shift.id)
+        ]))
+        assert volunteers == json.loads(json.dumps([
+            volunteer.to_dict() for volunteer in Volunteer.query.order_by(Volunteer.id)
+        ]))
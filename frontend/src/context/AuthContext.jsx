@@ -79,6 +79,12 @@ export function AuthProvider({ children }) {
   }
 
   const logout = () => {
+    // Revoke the token server-side; the local session ends either way
+    const token = localStorage.getItem('access_token')
+    if (token) {
+      api.post('/auth/logout', null, { headers: { Authorization: `Bearer ${token}` } })
+        .catch(() => {})
+    }
     localStorage.removeItem('access_token')
     setUser(null)
     setVolunteer(null)
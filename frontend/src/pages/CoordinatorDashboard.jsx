@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react'
 import { useAuth } from '../context/AuthContext'
-import api from '../services/api'
+import api, { fetchAllPages } from '../services/api'
 import ShiftCalendar from '../components/common/ShiftCalendar'
 import Button from '../components/common/Button'
 import Card from '../components/common/Card'
@@ -33,12 +33,10 @@ export default function CoordinatorDashboard() {
       const shiftsRes = await api.get('/coordinator/shifts/fill-status')
       setShiftStatus(shiftsRes.data)
 
-      // Fetch all shifts and signups for calendar view
-      const shiftsListRes = await api.get('/shifts')
-      setShifts(shiftsListRes.data)
+      // Fetch all shifts and signups for calendar view; the calendar only needs shift IDs
+      setShifts(await fetchAllPages('/shifts'))
 
-      const signupsRes = await api.get('/signups')
-      setAllSignups(signupsRes.data)
+      setAllSignups(await fetchAllPages('/signups', { fields: 'id,shift_id,status' }))
     } catch (err) {
       setError('Failed to load dashboard')
       console.error(err)
@@ -31,4 +31,16 @@ api.interceptors.response.use(
   }
 )
 
+// List endpoints return one page at a time; follow X-Next-Cursor to the last page
+export const fetchAllPages = async (path, params = {}) => {
+  const items = []
+  let cursor
+  do {
+    const response = await api.get(path, { params: { limit: 500, ...params, cursor } })
+    items.push(...response.data)
+    cursor = response.headers['x-next-cursor']
+  } while (cursor)
+  return items
+}
+
 export default api
@@ -1,11 +1,10 @@
-import api from './api'
+import api, { fetchAllPages } from './api'
 
 export const shiftService = {
   // Get all shifts with optional filters
   getShifts: async (filters = {}) => {
     try {
-      const response = await api.get('/shifts', { params: filters })
-      return response.data
+      return await fetchAllPages('/shifts', filters)
     } catch (error) {
       throw error.response?.data || error
     }
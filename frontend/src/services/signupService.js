@@ -1,4 +1,4 @@
-import api from './api'
+import api, { fetchAllPages } from './api'
 
 export const signupService = {
   // Validate a signup before creating it
@@ -14,6 +14,21 @@ export const signupService = {
     }
   },
 
+  // Validate many (volunteerId, shiftId) pairs in one request
+  validateSignupsBatch: async (pairs) => {
+    try {
+      const response = await api.post('/signups/validate/batch', {
+        pairs: pairs.map(([volunteerId, shiftId]) => ({
+          volunteer_id: volunteerId,
+          shift_id: shiftId
+        }))
+      })
+      return response.data
+    } catch (error) {
+      throw error.response?.data || error
+    }
+  },
+
   // Create a new signup
   createSignup: async (volunteerId, shiftId) => {
     try {
@@ -27,11 +42,10 @@ export const signupService = {
     }
   },
 
-  // Get all signups for current user or specific volunteer
+  // Get all signups for current user or specific volunteer, with their shifts
   getSignups: async (filters = {}) => {
     try {
-      const response = await api.get('/signups', { params: filters })
-      return response.data
+      return await fetchAllPages('/signups', { expand: 'shift', ...filters })
     } catch (error) {
       throw error.response?.data || error
     }
@@ -1,11 +1,10 @@
-import api from './api'
+import api, { fetchAllPages } from './api'
 
 export const volunteerService = {
   // Get all volunteers (coordinator only)
   getVolunteers: async () => {
     try {
-      const response = await api.get('/volunteers')
-      return response.data
+      return await fetchAllPages('/volunteers')
     } catch (error) {
       throw error.response?.data || error
     }